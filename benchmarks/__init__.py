@@ -0,0 +1,4 @@
+"""
+Performance benchmarks. Not part of the installed package; run from the
+repository root, e.g. ``python -m benchmarks.render``.
+"""
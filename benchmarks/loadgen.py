@@ -0,0 +1,286 @@
+"""
+End-to-end load generator for the public-mode path.
+
+Drives ``/api/v1/update`` and ``/now-playing.svg`` concurrently for a fixed
+duration and reports p50/p95/p99 latency and throughput per endpoint, plus
+the KV commands the server issued (read from the emulator's ``/stats``).
+
+By default it starts its own Upstash emulator and a public-mode server
+wired to it, so nothing external is needed::
+
+    python -m benchmarks.loadgen --duration 30 --concurrency 32 \\
+        --kv-latency-ms 15 --kv-error-rate 0.01
+
+To drive an already running deployment instead, pass ``--server`` (and
+``--kv`` for an emulator whose counters should be reported).
+
+Requires ``httpx`` (installed with the dev dependencies).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Optional
+
+try:
+    import httpx
+
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+ROOT = Path(__file__).parent.parent
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``samples`` (which need not be sorted)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(
+    latencies: dict[str, list[float]], errors: Counter, elapsed: float
+) -> dict[str, dict]:
+    """Per-endpoint request count, errors, throughput and latency percentiles."""
+    report = {}
+    for endpoint in sorted(set(latencies) | set(errors)):
+        samples = latencies.get(endpoint, [])
+        report[endpoint] = {
+            "requests": len(samples) + errors[endpoint],
+            "errors": errors[endpoint],
+            "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+        }
+    return report
+
+
+async def drive(
+    server: str,
+    api_key: str,
+    duration: float,
+    concurrency: int,
+    users: int,
+    update_ratio: float,
+    templates: list[str],
+    seed: Optional[int] = None,
+) -> tuple[dict[str, list[float]], Counter, float]:
+    """Run the workers and collect raw latencies and error counts."""
+    rng = random.Random(seed)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: Counter = Counter()
+    sequence = 0
+
+    async def worker(client: "httpx.AsyncClient", deadline: float) -> None:
+        nonlocal sequence
+        while time.perf_counter() < deadline:
+            user_id = f"load-{rng.randrange(users)}"
+            if rng.random() < update_ratio:
+                sequence += 1
+                endpoint = "update"
+                request = client.post(
+                    "/api/v1/update",
+                    params={"api_key": api_key, "user_id": user_id},
+                    json={
+                        "media_info": {
+                            "title": f"Track {sequence}",
+                            "artist": "Load Generator",
+                            "album": "Benchmarks",
+                            "is_playing": True,
+                        }
+                    },
+                )
+            else:
+                endpoint = "svg"
+                request = client.get(
+                    "/now-playing.svg",
+                    params={"user_id": user_id, "template": rng.choice(templates)},
+                )
+
+            start = time.perf_counter()
+            try:
+                response = await request
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies[endpoint].append(time.perf_counter() - start)
+            else:
+                errors[endpoint] += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=server, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(worker(client, deadline) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(url: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+class LocalStack:
+    """Emulator plus a public-mode server using it, as subprocesses."""
+
+    def __init__(self, kv_latency_ms: float, kv_jitter_ms: float, kv_error_rate: float):
+        self.token = "loadgen"
+        self.api_key = "loadgen-key"
+        self.kv_url = f"http://127.0.0.1:{_free_port()}"
+        self.server_url = f"http://127.0.0.1:{_free_port()}"
+        self.options = [
+            "--latency-ms", str(kv_latency_ms),
+            "--jitter-ms", str(kv_jitter_ms),
+            "--error-rate", str(kv_error_rate),
+        ]
+        self.processes: list[subprocess.Popen] = []
+
+    def __enter__(self) -> "LocalStack":
+        kv_port = self.kv_url.rsplit(":", 1)[1]
+        self.processes.append(
+            subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.upstash_emulator",
+                 "--port", kv_port, "--token", self.token, *self.options],
+                cwd=ROOT,
+            )
+        )
+        _wait_until_up(f"{self.kv_url}/stats")
+
+        env = dict(
+            os.environ,
+            PUBLIC_MODE="true",
+            NOW_PLAYING_API_KEY=self.api_key,
+            KV_REST_API_URL=self.kv_url,
+            KV_REST_API_TOKEN=self.token,
+            LOG_LEVEL="WARNING",
+        )
+        server_port = self.server_url.rsplit(":", 1)[1]
+        self.processes.append(
+            subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "client.main:app",
+                 "--port", server_port, "--log-level", "warning"],
+                cwd=ROOT,
+                env=env,
+            )
+        )
+        _wait_until_up(f"{self.server_url}/health/live")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.wait(timeout=10)
+
+
+def kv_stats(kv_url: Optional[str]) -> Optional[dict]:
+    if not kv_url:
+        return None
+    return httpx.get(f"{kv_url}/stats", timeout=5).json()
+
+
+def kv_delta(before: Optional[dict], after: Optional[dict]) -> Optional[dict]:
+    if before is None or after is None:
+        return None
+    commands = Counter(after["commands"])
+    commands.subtract(before["commands"])
+    return {
+        "requests": after["requests"] - before["requests"],
+        "commands": {name: count for name, count in sorted(commands.items()) if count},
+        "injected_errors": after["injected_errors"] - before["injected_errors"],
+    }
+
+
+def print_report(report: dict[str, dict], kv: Optional[dict]) -> None:
+    print(f"{'endpoint':<8} {'requests':>9} {'errors':>7} {'rps':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, stats in report.items():
+        print(
+            f"{endpoint:<8} {stats['requests']:>9} {stats['errors']:>7} "
+            f"{stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+        )
+    if kv:
+        print(f"\nKV requests: {kv['requests']} "
+              f"(injected errors: {kv['injected_errors']})")
+        for name, count in kv["commands"].items():
+            print(f"  {name:<8} {count}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Public-mode load generator")
+    parser.add_argument("--server", help="Existing server URL (default: start one)")
+    parser.add_argument("--api-key", default=os.getenv("NOW_PLAYING_API_KEY"))
+    parser.add_argument("--kv", help="Emulator URL whose /stats to report")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--update-ratio", type=float, default=0.1)
+    parser.add_argument("--template", action="append", dest="templates")
+    parser.add_argument("--kv-latency-ms", type=float, default=0.0)
+    parser.add_argument("--kv-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--kv-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", type=Path, help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not HTTPX_AVAILABLE:
+        print("httpx is required: uv sync --dev")
+        return 1
+
+    templates = args.templates or ["turntable", "minimalist"]
+
+    def run(server: str, api_key: str, kv_url: Optional[str]) -> dict:
+        before = kv_stats(kv_url)
+        latencies, errors, elapsed = asyncio.run(
+            drive(server, api_key, args.duration, args.concurrency, args.users,
+                  args.update_ratio, templates, args.seed)
+        )
+        return {
+            "endpoints": summarize(latencies, errors, elapsed),
+            "kv": kv_delta(before, kv_stats(kv_url)),
+            "duration": round(elapsed, 2),
+            "concurrency": args.concurrency,
+        }
+
+    if args.server:
+        report = run(args.server, args.api_key or "", args.kv)
+    else:
+        stack = LocalStack(args.kv_latency_ms, args.kv_jitter_ms, args.kv_error_rate)
+        with stack:
+            report = run(stack.server_url, stack.api_key, stack.kv_url)
+
+    print_report(report["endpoints"], report["kv"])
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Render throughput benchmark across every template and artwork shape.
+
+Each template is rendered against synthetic states (no media, paused, small
+artwork, and 512 px / 2000 px artwork as PNG, JPEG and WebP). For every pair
+the run reports ops/sec, p50/p99 latency, peak traced memory of one render
+and the output size. Results are saved as JSON; ``--compare`` checks a run
+against a saved baseline and exits non-zero on regressions.
+
+Usage::
+
+    python -m benchmarks.render --save benchmarks/results/baseline.json
+    python -m benchmarks.render --compare benchmarks/results/baseline.json
+
+Artwork cases need Pillow (``uv sync --extra imaging``); without it only the
+cases without artwork run.
+"""
+
+import argparse
+import functools
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from client.models import MediaSnapshot  # noqa: E402
+from client.renderer.engine import Renderer  # noqa: E402
+
+try:
+    from PIL import Image
+
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+ART_FORMATS = ("PNG", "JPEG", "WEBP")
+ART_SIZES = (512, 2000)
+
+# Relative drop in ops/sec (or growth in output bytes) flagged by --compare
+DEFAULT_TOLERANCE = 0.2
+
+
+def synthetic_artwork(size: int, image_format: str) -> bytes:
+    """Photo-like artwork: a colour gradient with noise, so it compresses
+    roughly like real cover art rather than a flat fill."""
+    gradient = Image.linear_gradient("L").resize((size, size))
+    noise = Image.effect_noise((size, size), 48)
+    image = Image.merge(
+        "RGB",
+        (gradient, noise, gradient.transpose(Image.Transpose.ROTATE_90)),
+    )
+    output = io.BytesIO()
+    options = {"quality": 85} if image_format in ("JPEG", "WEBP") else {}
+    image.save(output, format=image_format, **options)
+    return output.getvalue()
+
+
+def build_cases(
+    names: Optional[list[str]] = None,
+) -> dict[str, Optional[MediaSnapshot]]:
+    """Synthetic states keyed by case name, optionally only ``names``."""
+    track = {"title": "Benchmark Track", "artist": "Benchmark Artist", "album": "Album"}
+
+    def with_art(size: int, image_format: str) -> Callable[[], MediaSnapshot]:
+        return lambda: MediaSnapshot(
+            **track, is_playing=True, album_art=synthetic_artwork(size, image_format)
+        )
+
+    factories: dict[str, Callable[[], Optional[MediaSnapshot]]] = {
+        "no-media": lambda: None,
+        "paused": lambda: MediaSnapshot(**track, is_playing=False),
+    }
+    if PIL_AVAILABLE:
+        factories["small-art"] = with_art(64, "PNG")
+        for size in ART_SIZES:
+            for image_format in ART_FORMATS:
+                name = f"{image_format.lower()}-{size}"
+                factories[name] = with_art(size, image_format)
+
+    return {
+        name: factory()
+        for name, factory in factories.items()
+        if not names or name in names
+    }
+
+
+def measure(
+    render: Callable[[Any], str],
+    make_input: Callable[[], Any],
+    iterations: int,
+    warmup: int = 5,
+) -> dict:
+    """
+    Time ``render`` and trace the peak memory of a single call.
+
+    Every call gets its own input from ``make_input``, all built before the
+    clock starts so their cost isn't counted as rendering.
+    """
+    inputs = [make_input() for _ in range(warmup + iterations + 1)]
+    for _ in range(warmup):
+        output = render(inputs.pop())
+
+    samples = []
+    elapsed = 0.0
+    for _ in range(iterations):
+        # Popped so inputs (and the artwork fields they cache) are freed as used
+        value = inputs.pop()
+        start = time.perf_counter()
+        output = render(value)
+        sample = time.perf_counter() - start
+        samples.append(sample)
+        elapsed += sample
+
+    value = inputs.pop()
+    tracemalloc.start()
+    render(value)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return {
+        "ops_per_sec": round(iterations / elapsed, 1),
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "peak_memory_bytes": peak,
+        "output_bytes": len(output.encode("utf-8")),
+    }
+
+
+def _fresh_snapshot(media_info: Optional[MediaSnapshot]) -> Optional[MediaSnapshot]:
+    return media_info and media_info.replace()
+
+
+def run(
+    templates: Optional[list[str]] = None,
+    case_names: Optional[list[str]] = None,
+    iterations: int = 100,
+) -> list[dict]:
+    """Benchmark each template against each case."""
+    renderer = Renderer()
+    cases = build_cases(case_names)
+    results = []
+    for template in sorted(templates or renderer.list_templates()):
+        for name, media_info in cases.items():
+            # A fresh snapshot per render, since each request decodes its own
+            # and derived artwork fields are cached per snapshot
+            stats = measure(
+                functools.partial(renderer.render_svg, template_name=template),
+                functools.partial(_fresh_snapshot, media_info),
+                iterations,
+            )
+            results.append({"template": template, "case": name, **stats})
+    return results
+
+
+def compare(
+    results: list[dict], baseline: list[dict], tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """Describe every template/case that got slower or larger than baseline."""
+    previous = {(entry["template"], entry["case"]): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry["template"], entry["case"]))
+        if before is None:
+            continue
+        label = f"{entry['template']}/{entry['case']}"
+        if entry["ops_per_sec"] < before["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{label}: {entry['ops_per_sec']} ops/s (was {before['ops_per_sec']})"
+            )
+        if entry["output_bytes"] > before["output_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{label}: {entry['output_bytes']} bytes (was {before['output_bytes']})"
+            )
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_table(results: list[dict]) -> None:
+    header = (
+        f"{'template':<12} {'case':<10} {'ops/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'peak KB':>8} {'out KB':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for entry in results:
+        print(
+            f"{entry['template']:<12} {entry['case']:<10} "
+            f"{entry['ops_per_sec']:>9.1f} {entry['p50_ms']:>8.3f} "
+            f"{entry['p99_ms']:>8.3f} {entry['peak_memory_bytes'] / 1024:>8.1f} "
+            f"{entry['output_bytes'] / 1024:>8.1f}"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--template", action="append", help="Only this template")
+    parser.add_argument("--case", action="append", help="Only this case")
+    parser.add_argument("--save", type=Path, help="Write results as JSON")
+    parser.add_argument(
+        "--compare", type=Path, help="Baseline JSON to compare against"
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if not PIL_AVAILABLE:
+        print("Pillow not installed; running only the cases without artwork")
+
+    results = run(args.template, args.case, args.iterations)
+    _print_table(results)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "results": results,
+        }
+        args.save.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved results to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Local emulator of the Upstash Redis REST API, for load tests.
+
+Speaks the protocol ``RedisStore`` uses: a command as a JSON array POSTed to
+``/`` (or a list of commands to ``/pipeline``) with ``Authorization: Bearer
+<token>``, answered with ``{"result": ...}`` or ``{"error": ...}``. Only the
+commands the service needs are implemented. Latency and failures can be
+injected, and ``GET /stats`` reports how many commands were served.
+
+Usage::
+
+    python -m benchmarks.upstash_emulator --port 8079 --token dev \\
+        --latency-ms 20 --jitter-ms 10 --error-rate 0.01
+
+Then point the server at it with ``KV_REST_API_URL=http://127.0.0.1:8079``
+and ``KV_REST_API_TOKEN=dev``.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import random
+import time
+from collections import Counter
+from typing import Any, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class CommandError(Exception):
+    """A Redis-style error returned to the caller as ``{"error": ...}``."""
+
+
+class UpstashEmulator:
+    """In-memory key-value store behind an Upstash-compatible REST app."""
+
+    def __init__(
+        self,
+        token: str = "dev",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the emulator.
+
+        Args:
+            token: Bearer token clients must send
+            latency: Seconds added to every request
+            jitter: Extra random delay of up to this many seconds
+            error_rate: Fraction of requests answered with HTTP 500
+            seed: Seed for the jitter and error injection
+        """
+        self.token = token
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        # Strings are stored as str, hashes as dict and lists as list
+        self.data: dict[str, tuple[Any, Optional[float]]] = {}
+        self.commands: Counter[str] = Counter()
+        self.requests = 0
+        self.injected_errors = 0
+        self.app = self._build_app()
+
+    def execute(self, command: list[Any]) -> Any:
+        """Run one command and return its result."""
+        if not command:
+            raise CommandError("ERR empty command")
+        name, args = str(command[0]).upper(), [str(arg) for arg in command[1:]]
+        handler = getattr(self, f"_cmd_{name.lower()}", None)
+        if handler is None:
+            raise CommandError(f"ERR unknown command '{name}'")
+        self.commands[name] += 1
+        return handler(*args)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "commands": dict(self.commands),
+            "injected_errors": self.injected_errors,
+            "keys": len(self.data),
+        }
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Upstash REST emulator")
+
+        @app.get("/stats")
+        async def stats():
+            return self.stats()
+
+        @app.post("/")
+        async def command(request: Request):
+            failure = await self._admit(request)
+            if failure is not None:
+                return failure
+            body = await request.json()
+            if not isinstance(body, list):
+                return JSONResponse({"error": "ERR expected a JSON array"}, 400)
+            try:
+                return {"result": self.execute(body)}
+            except CommandError as exc:
+                return JSONResponse({"error": str(exc)}, 400)
+
+        @app.post("/pipeline")
+        async def pipeline(request: Request):
+            failure = await self._admit(request)
+            if failure is not None:
+                return failure
+            replies = []
+            for item in await request.json():
+                try:
+                    replies.append({"result": self.execute(item)})
+                except CommandError as exc:
+                    replies.append({"error": str(exc)})
+            return replies
+
+        return app
+
+    async def _admit(self, request: Request) -> Optional[JSONResponse]:
+        """Apply auth, latency and error injection to a request."""
+        self.requests += 1
+        if request.headers.get("authorization") != f"Bearer {self.token}":
+            return JSONResponse({"error": "Unauthorized"}, 401)
+
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.injected_errors += 1
+            return JSONResponse({"error": "ERR injected failure"}, 500)
+        return None
+
+    def _get(self, key: str) -> Any:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _hash(self, key: str, create: bool = False) -> Optional[dict[str, str]]:
+        value = self._get(key)
+        if value is None and create:
+            value = {}
+            self.data[key] = (value, None)
+        if value is not None and not isinstance(value, dict):
+            raise CommandError(
+                "WRONGTYPE Operation against a key holding the wrong kind of value"
+            )
+        return value
+
+    def _list(self, key: str, create: bool = False) -> Optional[list[str]]:
+        value = self._get(key)
+        if value is None and create:
+            value = []
+            self.data[key] = (value, None)
+        if value is not None and not isinstance(value, list):
+            raise CommandError(
+                "WRONGTYPE Operation against a key holding the wrong kind of value"
+            )
+        return value
+
+    def _cmd_ping(self, *args: str) -> str:
+        return args[0] if args else "PONG"
+
+    def _cmd_get(self, key: str) -> Optional[str]:
+        return self._get(key)
+
+    def _cmd_mget(self, *keys: str) -> list[Optional[str]]:
+        return [self._get(key) for key in keys]
+
+    def _cmd_set(self, key: str, value: str, *options: str) -> Optional[str]:
+        expires_at = None
+        only_new = only_existing = False
+        options_iter = iter(options)
+        for option in options_iter:
+            option = option.upper()
+            if option in ("EX", "PX"):
+                try:
+                    amount = float(next(options_iter))
+                except (StopIteration, ValueError):
+                    raise CommandError("ERR syntax error") from None
+                seconds = amount if option == "EX" else amount / 1000
+                expires_at = time.monotonic() + seconds
+            elif option == "NX":
+                only_new = True
+            elif option == "XX":
+                only_existing = True
+            else:
+                raise CommandError("ERR syntax error")
+
+        exists = self._get(key) is not None
+        if (only_new and exists) or (only_existing and not exists):
+            return None
+        self.data[key] = (value, expires_at)
+        return "OK"
+
+    def _cmd_del(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def _cmd_exists(self, *keys: str) -> int:
+        return sum(self._get(key) is not None for key in keys)
+
+    def _cmd_keys(self, pattern: str) -> list[str]:
+        return [
+            key
+            for key in list(self.data)
+            if fnmatch.fnmatchcase(key, pattern) and self._get(key) is not None
+        ]
+
+    def _cmd_expire(self, key: str, seconds: str) -> int:
+        value = self._get(key)
+        if value is None:
+            return 0
+        self.data[key] = (value, time.monotonic() + float(seconds))
+        return 1
+
+    def _cmd_hget(self, key: str, field: str) -> Optional[str]:
+        fields = self._hash(key)
+        return fields.get(field) if fields else None
+
+    def _cmd_hset(self, key: str, *pairs: str) -> int:
+        if not pairs or len(pairs) % 2:
+            raise CommandError("ERR wrong number of arguments for 'hset' command")
+        fields = self._hash(key, create=True)
+        added = sum(field not in fields for field in pairs[::2])
+        fields.update(zip(pairs[::2], pairs[1::2]))
+        return added
+
+    def _cmd_hdel(self, key: str, *fields: str) -> int:
+        existing = self._hash(key)
+        if not existing:
+            return 0
+        removed = sum(existing.pop(field, None) is not None for field in fields)
+        if not existing:
+            del self.data[key]
+        return removed
+
+    def _cmd_hkeys(self, key: str) -> list[str]:
+        return list(self._hash(key) or {})
+
+    def _cmd_lpush(self, key: str, *values: str) -> int:
+        if not values:
+            raise CommandError("ERR wrong number of arguments for 'lpush' command")
+        items = self._list(key, create=True)
+        items[:0] = reversed(values)
+        return len(items)
+
+    def _cmd_lrange(self, key: str, start: str, stop: str) -> list[str]:
+        items = self._list(key) or []
+        start, stop = int(start), int(stop)
+        if start < 0:
+            start = max(start + len(items), 0)
+        if stop < 0:
+            stop += len(items)
+        return items[start : stop + 1]
+
+    def _cmd_ltrim(self, key: str, start: str, stop: str) -> str:
+        items = self._list(key)
+        if items is not None:
+            kept = self._cmd_lrange(key, start, stop)
+            if kept:
+                items[:] = kept
+            else:
+                del self.data[key]
+        return "OK"
+
+    def _cmd_ttl(self, key: str) -> int:
+        if self._get(key) is None:
+            return -2
+        expires_at = self.data[key][1]
+        if expires_at is None:
+            return -1
+        return int(expires_at - time.monotonic())
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Upstash REST emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8079)
+    parser.add_argument("--token", default="dev")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    emulator = UpstashEmulator(
+        token=args.token,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(emulator.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Fan-out of media-state changes to live subscribers (Server-Sent Events).
+
+Every subscriber of a user key gets a one-slot, latest-wins queue, so a slow
+client only ever skips to the newest state instead of backing up. A single
+watcher task per key re-reads the store or poller while anyone is listening,
+and each event renders a given template at most once no matter how many
+subscribers asked for it. Cards of a playing track with a known length
+animate their progress from the moment they were rendered, so those renders
+are only shared for ``PROGRESS_RENDER_TTL`` seconds.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+from collections.abc import Awaitable
+from typing import Callable, Optional
+
+from .models import MediaSnapshot
+
+logger = logging.getLogger(__name__)
+
+Fetcher = Callable[[str], Awaitable[Optional[MediaSnapshot]]]
+RenderFunc = Callable[[Optional[MediaSnapshot], str, Optional[str]], str]
+
+NO_MEDIA_FINGERPRINT = "none"
+
+# Seconds a render with a running progress bar is shared with new subscribers
+PROGRESS_RENDER_TTL = 1.0
+
+
+def state_fingerprint(media_info: Optional[MediaSnapshot]) -> str:
+    """Fingerprint a state, including the "nothing playing" state."""
+    return media_info.fingerprint if media_info else NO_MEDIA_FINGERPRINT
+
+
+class StateEvent:
+    """One observed state, shared by every subscriber it is delivered to."""
+
+    def __init__(self, key: str, media_info: Optional[MediaSnapshot]):
+        self.key = key
+        self.media_info = media_info
+        self.fingerprint = state_fingerprint(media_info)
+        # (template, css) -> (render future, loop time the render started)
+        self._renders: dict[tuple, tuple[asyncio.Future, float]] = {}
+        self._progressing = bool(
+            media_info and media_info.is_playing and media_info.progress()
+        )
+
+    def payload(self) -> dict:
+        """Event data without the (large) artwork bytes."""
+        media = None
+        if self.media_info:
+            media = {
+                "title": self.media_info.title,
+                "artist": self.media_info.artist,
+                "album": self.media_info.album,
+                "is_playing": self.media_info.is_playing,
+                "has_album_art": bool(self.media_info.album_art),
+                "position": self.media_info.position,
+                "duration": self.media_info.duration,
+                "position_timestamp": self.media_info.position_timestamp,
+            }
+        return {
+            "user_id": self.key,
+            "fingerprint": self.fingerprint,
+            "media_info": media,
+        }
+
+    async def svg(
+        self, render: RenderFunc, template: str, custom_css: Optional[str] = None
+    ) -> str:
+        """Render this state once per template and share the result."""
+        render_key = (template, custom_css)
+        loop = asyncio.get_running_loop()
+        entry = self._renders.get(render_key)
+        if entry is None or (
+            self._progressing and loop.time() - entry[1] > PROGRESS_RENDER_TTL
+        ):
+            future = loop.run_in_executor(
+                None,
+                functools.partial(render, self.media_info, template, custom_css),
+            )
+            entry = self._renders[render_key] = (future, loop.time())
+        return await entry[0]
+
+    def format(self, svg: Optional[str] = None) -> str:
+        """Serialise as a ``text/event-stream`` message."""
+        data = self.payload()
+        if svg is not None:
+            data["svg"] = svg
+        return f"event: state\nid: {self.fingerprint}\ndata: {json.dumps(data)}\n\n"
+
+
+class StateBroadcaster:
+    """Publishes state changes per user key to stream subscribers."""
+
+    def __init__(self, fetch: Optional[Fetcher] = None, interval: float = 5.0):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            fetch: Reads the current state for a key (store or poller)
+            interval: Seconds between watcher reads while a key has subscribers
+        """
+        self.fetch = fetch
+        self.interval = interval
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._latest: dict[str, StateEvent] = {}
+        self._watchers: dict[str, asyncio.Task] = {}
+
+    def has_subscribers(self, key: str) -> bool:
+        return bool(self._subscribers.get(key))
+
+    def subscriber_count(self, key: Optional[str] = None) -> int:
+        if key is not None:
+            return len(self._subscribers.get(key, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, key: str) -> asyncio.Queue:
+        """Register a subscriber; the current state is delivered first."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.setdefault(key, set()).add(queue)
+
+        latest = self._latest.get(key)
+        if latest is not None:
+            queue.put_nowait(latest)
+
+        if self.fetch is not None and key not in self._watchers:
+            self._watchers[key] = asyncio.ensure_future(self._watch(key))
+        return queue
+
+    def unsubscribe(self, key: str, queue: asyncio.Queue) -> None:
+        """Remove a subscriber and stop watching keys nobody listens to."""
+        queues = self._subscribers.get(key)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if queues:
+            return
+
+        del self._subscribers[key]
+        self._latest.pop(key, None)
+        watcher = self._watchers.pop(key, None)
+        if watcher is not None:
+            watcher.cancel()
+
+    def publish(
+        self, key: str, media_info: Optional[MediaSnapshot]
+    ) -> Optional[StateEvent]:
+        """
+        Deliver a state to the key's subscribers if it changed.
+
+        Returns:
+            The delivered event, or None if unchanged or nobody is listening.
+        """
+        queues = self._subscribers.get(key)
+        if not queues:
+            return None
+
+        latest = self._latest.get(key)
+        if latest is not None and latest.fingerprint == state_fingerprint(media_info):
+            return None
+
+        event = StateEvent(key, media_info)
+        self._latest[key] = event
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+        return event
+
+    async def close(self) -> None:
+        """Cancel all watcher tasks."""
+        watchers = list(self._watchers.values())
+        self._watchers.clear()
+        for watcher in watchers:
+            watcher.cancel()
+        await asyncio.gather(*watchers, return_exceptions=True)
+
+    async def _watch(self, key: str) -> None:
+        while True:
+            try:
+                self.publish(key, await self.fetch(key))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("State watch for %s failed: %s", key, exc)
+            await asyncio.sleep(self.interval)
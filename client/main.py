@@ -1,21 +1,44 @@
+import asyncio
+import base64
+import hashlib
+import html
+import json
 import logging
 import os
+import re
 import sys
 import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, Response
+from fastapi import (
+    APIRouter,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from fastapi.concurrency import run_in_threadpool
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 
-from .models import MediaInfo
+from . import metrics
+from .events import StateBroadcaster, state_fingerprint
+from .models import MediaInfo, MediaSnapshot, artwork_hash, as_snapshot
 from .poller.base import BasePoller
-from .poller.factory import create_poller
+from .renderer.catalogue import uses_progress
+from .renderer.catalogue import watch as watch_templates
 from .renderer.engine import Renderer
+from .renderer.preview import PreviewError, PreviewLimitExceeded, PreviewRenderer
 from .store import MediaStore, create_store
+from .utils import timing
+from .utils.lru import LRUCache
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import get_config
@@ -28,6 +51,38 @@ logger = logging.getLogger(__name__)
 
 PUBLIC_MODE = config.get("server.public_mode", False)
 
+# Seconds between keep-alive comments on idle event streams
+STREAM_KEEPALIVE = 15.0
+
+# Largest artwork blob accepted from clients
+MAX_ARTWORK_BYTES = 2 * 1024 * 1024
+
+# Largest template source accepted for previews and saved templates
+MAX_TEMPLATE_SOURCE_BYTES = 256 * 1024
+
+# ``template=user:<name>`` selects a template saved through /api/v1/user-templates
+USER_TEMPLATE_PREFIX = "user:"
+USER_TEMPLATE_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Seconds an instance reuses a saved template before re-reading the store
+USER_TEMPLATE_TTL = 30.0
+
+# Seconds within which an upload identical to the last one counts as a repeat
+UPDATE_REPEAT_WINDOW = 30.0
+
+# Most users one /group.svg card shows
+GROUP_MAX_MEMBERS = 12
+
+# Plays kept per user, and how many a recently-played card shows by default
+HISTORY_SIZE = config.get("server.history_size", 50)
+RECENT_CARD_ENTRIES = 5
+
+# Zoom /now-playing.png renders at when the request doesn't pass ``scale``
+PNG_SCALE = config.get("server.png_scale", 2.0)
+
+# Seconds of playback between re-rasterizations of a card with a progress bar
+PNG_PROGRESS_STEP = 5.0
+
 
 class AppState:
     def __init__(self):
@@ -35,10 +90,251 @@ class AppState:
         self.renderer: Optional[Renderer] = None
         self.store: MediaStore = create_store()
         self.start_time: float = 0
+        self.broadcaster = StateBroadcaster(
+            fetch=_fetch_state, interval=config.get("server.poll_interval", 5)
+        )
+        # Artwork blobs are immutable, so each instance caches them locally
+        self.artwork_blobs: LRUCache[bytes] = LRUCache(
+            max_entries=256, max_bytes=32 * 1024 * 1024
+        )
+        # Last state written per user, used to count repeated uploads
+        self.last_updates: LRUCache[tuple[MediaStore, Optional[dict], float]] = (
+            LRUCache(max_entries=1024)
+        )
+        # Rendered group cards keyed by template, CSS and member fingerprints
+        self.group_cards: LRUCache[str] = LRUCache(
+            max_entries=256, max_bytes=8 * 1024 * 1024
+        )
+        # PNG rasterizer and its cache, created by the first PNG request
+        self.rasterizer = None
+        # Track last appended to each user's history, so only changes append
+        self.history_heads: LRUCache[tuple[MediaStore, tuple]] = LRUCache(
+            max_entries=1024
+        )
+        self.profiling = False
+        # Sandboxed renderer for editor drafts and saved user templates;
+        # compiled templates are shared by source hash
+        self.previews = PreviewRenderer()
+        # Saved templates per (user, name), reused for USER_TEMPLATE_TTL
+        self.user_templates: LRUCache[tuple[MediaStore, Optional[dict], float]] = (
+            LRUCache(max_entries=512)
+        )
+        # Outcome of the most recent poller fetch, for readiness probes
+        self.last_poll: Optional[dict] = None
         self.debug_info: list[str] = []  # 添加调试信息存储
 
 
+async def _fetch_state(cache_key: str) -> Optional[MediaSnapshot]:
+    """Read the current state from the store (public) or poller (local)."""
+    if PUBLIC_MODE:
+        cached_data = await _store_op(app_state.store, "get", cache_key)
+        return await _resolve_media_info(cached_data, app_state.store)
+    if not app_state.poller:
+        return None
+    return await _poll_media(app_state.poller)
+
+
+async def _store_op(store: MediaStore, operation: str, *args):
+    """Run a blocking store call in the threadpool, recording its latency."""
+    with timing.span("store"), metrics.STORE_SECONDS.labels(
+        store.backend, operation
+    ).time():
+        return await run_in_threadpool(getattr(store, operation), *args)
+
+
+async def _poll_media(poller: BasePoller) -> Optional[MediaSnapshot]:
+    """Fetch media info from the poller, recording latency and failures."""
+    name = type(poller).__name__
+    try:
+        with timing.span("poll"), metrics.POLLER_SECONDS.labels(name).time():
+            media_info = as_snapshot(await poller.get_media_info())
+    except Exception as exc:
+        metrics.POLLER_ERRORS.labels(name).inc()
+        app_state.last_poll = {"at": time.time(), "ok": False, "error": str(exc)}
+        raise
+
+    app_state.last_poll = {
+        "at": time.time(),
+        "ok": True,
+        "has_media": media_info is not None,
+    }
+    if media_info is not None:
+        await _record_history(
+            "default", media_info.to_dict(include_album_art=False), app_state.store
+        )
+    return media_info
+
+
+def _track_identity(data: dict) -> tuple:
+    return data.get("title"), data.get("artist"), data.get("album")
+
+
+async def _record_history(
+    cache_key: str, media_data: Optional[dict], store: MediaStore
+) -> None:
+    """Append a play to the user's history when a different track starts.
+
+    Best effort: a failed history write never fails the update itself.
+    """
+    if not (media_data and media_data.get("is_playing") and media_data.get("title")):
+        return
+
+    track = _track_identity(media_data)
+    try:
+        head = app_state.history_heads.get(cache_key)
+        if head is not None and head[0] is store:
+            previous = head[1]
+        else:
+            # Cold instance: compare with what another instance last appended
+            recent = await _store_op(store, "get_history", cache_key, 1)
+            previous = _track_identity(recent[0]) if recent else None
+
+        if track != previous:
+            entry = {
+                "title": media_data.get("title"),
+                "artist": media_data.get("artist"),
+                "album": media_data.get("album"),
+                "album_art_hash": media_data.get("album_art_hash"),
+                "duration": media_data.get("duration"),
+                "played_at": int(time.time()),
+            }
+            entry = {key: value for key, value in entry.items() if value is not None}
+            await _store_op(store, "append_history", cache_key, entry, HISTORY_SIZE)
+        app_state.history_heads.put(cache_key, (store, track))
+    except Exception as exc:
+        logger.warning("History write failed: %s", exc)
+
+
+async def _get_artwork(art_hash: str, store: MediaStore) -> Optional[bytes]:
+    """Fetch an artwork blob, preferring this instance's cache."""
+    album_art = app_state.artwork_blobs.get(art_hash)
+    if album_art is not None:
+        return album_art
+
+    try:
+        album_art = await _store_op(store, "get_artwork", art_hash)
+    except Exception as exc:
+        logger.warning("Artwork read failed: %s", exc)
+        return None
+
+    if album_art:
+        app_state.artwork_blobs.put(art_hash, album_art)
+    return album_art
+
+
+async def _resolve_media_info(
+    data: Optional[dict], store: MediaStore
+) -> Optional[MediaSnapshot]:
+    """Build a snapshot from a stored state, loading artwork by hash."""
+    if not data:
+        return None
+
+    album_art = None
+    if data.get("album_art_hash") and not data.get("album_art_b64"):
+        album_art = await _get_artwork(data["album_art_hash"], store)
+    with timing.span("decode"):
+        return MediaSnapshot.from_dict(data, album_art=album_art)
+
+
+async def _load_user_template(
+    user_id: str, name: str, store: MediaStore
+) -> Optional[dict]:
+    """Fetch a saved template, reusing this instance's copy for a while."""
+    now = time.monotonic()
+    cached = app_state.user_templates.get((user_id, name))
+    if (
+        cached is not None
+        and cached[0] is store
+        and now - cached[2] < USER_TEMPLATE_TTL
+    ):
+        return cached[1]
+
+    saved = await _store_op(store, "get_template", user_id, name)
+    app_state.user_templates.put((user_id, name), (store, saved, now))
+    return saved
+
+
+def _render_saved_template(
+    renderer: Renderer,
+    saved: Optional[dict],
+    name: str,
+    media_info: Optional[MediaSnapshot],
+    custom_css: Optional[str],
+) -> str:
+    """Render a saved user template in the sandbox, or an error card."""
+    if not saved:
+        message = f"Template not found: {name}"
+    else:
+        context = renderer.template_context(media_info, custom_css)
+        try:
+            svg_content, _ = app_state.previews.render(
+                saved["source"], context, label="user"
+            )
+            return svg_content
+        except PreviewError as exc:
+            message = str(exc)
+
+    return f"""
+        <svg width="400" height="120" xmlns="http://www.w3.org/2000/svg">
+            <rect width="400" height="120" fill="#2a2a2a" />
+            <text x="10" y="50" fill="#ff4444">{html.escape(message)}</text>
+        </svg>
+        """
+
+
+async def _store_artwork(data: bytes, store: MediaStore) -> str:
+    """Persist an artwork blob and return its hash."""
+    art_hash = artwork_hash(data)
+    await _store_op(store, "set_artwork", art_hash, data)
+    app_state.artwork_blobs.put(art_hash, data)
+    return art_hash
+
+
+async def _normalize_artwork(
+    media_data: Optional[dict], store: MediaStore
+) -> tuple[Optional[dict], Optional[str]]:
+    """Move inline artwork into the blob store and report whether it's held.
+
+    Returns:
+        The state to persist (artwork referenced by hash only) and
+        "present"/"missing" for the referenced artwork, or None without art.
+    """
+    if not media_data:
+        return media_data, None
+
+    media_data = dict(media_data)
+    encoded = media_data.pop("album_art_b64", None)
+    if encoded:
+        try:
+            album_art = base64.b64decode(encoded)
+        except ValueError:
+            album_art = None
+        if album_art:
+            media_data["album_art_hash"] = await _store_artwork(album_art, store)
+            return media_data, "present"
+
+    art_hash = media_data.get("album_art_hash")
+    if not art_hash:
+        return media_data, None
+
+    # Always asked of the store: its copy may have expired or been evicted
+    # while this instance still caches the bytes
+    try:
+        held = await _store_op(store, "has_artwork", art_hash)
+        cached = None if held else app_state.artwork_blobs.get(art_hash)
+        if cached is not None:
+            await _store_op(store, "set_artwork", art_hash, cached)
+            held = True
+    except Exception as exc:
+        logger.warning("Artwork lookup failed: %s", exc)
+        held = False
+    return media_data, "present" if held else "missing"
+
+
 app_state = AppState()
+metrics.REGISTRY.watch_cache("artwork_blobs", app_state.artwork_blobs)
+metrics.REGISTRY.watch_cache("preview_templates", app_state.previews.compiled)
+metrics.REGISTRY.watch_cache("group_cards", app_state.group_cards)
 
 
 @asynccontextmanager
@@ -51,76 +347,46 @@ async def lifespan(app: FastAPI):
         logger.info("Public mode media store backend: %s", app_state.store.backend)
 
     if not PUBLIC_MODE:
+        # Platform pollers and their native bindings are imported only in
+        # local mode, keeping them off the serverless cold start.
+        from .poller.artwork_cache import artwork_cache
+        from .poller.factory import create_poller
+
+        metrics.REGISTRY.watch_cache("poller_artwork", artwork_cache)
         exclude_browsers = config.get("server.exclude_browsers", False)
-        app_state.poller = create_poller(exclude_browsers=exclude_browsers)
+        app_state.poller = create_poller(
+            exclude_browsers=exclude_browsers,
+            replay_trace=config.get("server.replay_trace") or None,
+            replay_speed=config.get("server.replay_speed", 1.0),
+        )
 
+    template_dir = config.get("server.template_dir") or None
     try:
-        debug_msg = f"Attempting to initialize Renderer in PUBLIC_MODE: {PUBLIC_MODE}"
-        print(debug_msg)
-        app_state.debug_info.append(debug_msg)
-        
-        app_state.renderer = Renderer()
-        success_msg = "Renderer initialized successfully"
-        print(success_msg)
-        app_state.debug_info.append(success_msg)
+        app_state.renderer = Renderer(template_dir=template_dir)
+        app_state.debug_info.append(
+            f"Renderer loaded {len(app_state.renderer.templates)} templates "
+            f"from {app_state.renderer.template_dir}"
+        )
     except Exception as e:
-        error_msg = f"Failed to initialize renderer: {e}"
-        print(error_msg)
-        app_state.debug_info.append(error_msg)
-        
-        exc_type_msg = f"Exception type: {type(e).__name__}"
-        print(exc_type_msg)
-        app_state.debug_info.append(exc_type_msg)
-        
-        import traceback
-        traceback_msg = f"Traceback: {traceback.format_exc()}"
-        print(traceback_msg)
-        app_state.debug_info.append(traceback_msg)
-        
-        # Try with absolute path
-        try:
-            import os
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            template_dir = os.path.join(current_dir, "renderer", "templates")
-            
-            current_dir_msg = f"Current directory: {current_dir}"
-            print(current_dir_msg)
-            app_state.debug_info.append(current_dir_msg)
-            
-            template_dir_msg = f"Trying template directory: {template_dir}"
-            print(template_dir_msg)
-            app_state.debug_info.append(template_dir_msg)
-            
-            exists_msg = f"Template directory exists: {os.path.exists(template_dir)}"
-            print(exists_msg)
-            app_state.debug_info.append(exists_msg)
-            
-            if os.path.exists(template_dir):
-                contents_msg = f"Template directory contents: {os.listdir(template_dir)}"
-                print(contents_msg)
-                app_state.debug_info.append(contents_msg)
-                
-            app_state.renderer = Renderer(template_dir=template_dir)
-            success_abs_msg = "Renderer initialized with absolute path"
-            print(success_abs_msg)
-            app_state.debug_info.append(success_abs_msg)
-        except Exception as e2:
-            error_abs_msg = f"Failed to initialize renderer with absolute path: {e2}"
-            print(error_abs_msg)
-            app_state.debug_info.append(error_abs_msg)
-            
-            exc_type_abs_msg = f"Exception type: {type(e2).__name__}"
-            print(exc_type_abs_msg)
-            app_state.debug_info.append(exc_type_abs_msg)
-            
-            traceback_abs_msg = f"Traceback: {traceback.format_exc()}"
-            print(traceback_abs_msg)
-            app_state.debug_info.append(traceback_abs_msg)
-            
-            app_state.renderer = None
+        logger.exception("Failed to initialize renderer")
+        app_state.debug_info.append(f"Failed to initialize renderer: {e!r}")
+        app_state.renderer = None
+
+    # Development only: rebuild the template catalogue when files change
+    template_watcher = None
+    if app_state.renderer and config.get("server.template_reload", False):
+        template_watcher = asyncio.create_task(
+            watch_templates(app_state.renderer.template_dir, app_state.renderer.reload)
+        )
+        logger.info("Watching %s for template changes", app_state.renderer.template_dir)
 
     yield
 
+    if template_watcher:
+        template_watcher.cancel()
+    await app_state.broadcaster.close()
+    if app_state.rasterizer:
+        app_state.rasterizer.shutdown()
     logger.info("Application shutting down")
 
 
@@ -139,19 +405,18 @@ def get_store() -> MediaStore:
     return app_state.store
 
 
-app = FastAPI(
-    title="Now Playing Service",
-    description="A service to get currently playing music information.",
-    version="1.0.0",
-    lifespan=lifespan,
-)
+def get_broadcaster() -> StateBroadcaster:
+    """Dependency to get the live state broadcaster."""
+    return app_state.broadcaster
 
-web_dir = Path(__file__).parent.parent / "web"
-if web_dir.exists():
-    app.mount("/web", StaticFiles(directory=str(web_dir), html=True), name="web")
 
+# Routes served in both modes; ``public_router`` holds the ingest endpoints
+# only public deployments register
+router = APIRouter()
+public_router = APIRouter()
 
-@app.get("/")
+
+@router.get("/")
 async def root():
     """Root endpoint for health checks."""
     mode = "public" if PUBLIC_MODE else "local"
@@ -163,39 +428,70 @@ async def root():
     }
 
 
-@app.get("/now-playing.svg")
+@router.get("/now-playing.svg")
 async def get_now_playing_svg(
     template: str = "turntable",
     custom_css: Optional[str] = None,
     user_id: Optional[str] = None,
+    profile: bool = False,
+    api_key: Optional[str] = None,
     poller: Optional[BasePoller] = Depends(get_poller),
     renderer: Optional[Renderer] = Depends(get_renderer),
     store: MediaStore = Depends(get_store),
 ):
-    """Get the current playing media as an SVG image."""
+    """Get the current playing media as an SVG image.
 
-    if PUBLIC_MODE:
-        # In public mode, read shared state so every template instance agrees.
-        cache_key = user_id or "default"
+    The ``Server-Timing`` header breaks the request down into store, decode
+    (or poll) and render time. With ``server.profiling`` enabled,
+    ``profile=true`` and a valid ``api_key`` return a cProfile report of the
+    request instead of the card.
+    """
+    if profile:
+        if not config.get("server.profiling", False):
+            raise HTTPException(status_code=404, detail="Profiling is disabled")
+        if not _api_key_valid(api_key):
+            raise HTTPException(status_code=401, detail="Invalid API key")
+        # cProfile allows a single active profiler per process
+        if app_state.profiling:
+            raise HTTPException(status_code=409, detail="A profile is already running")
+
+        app_state.profiling = True
         try:
-            cached_data = await run_in_threadpool(store.get, cache_key)
-        except Exception as exc:
-            logger.warning("Store read failed: %s", exc)
-            cached_data = None
+            with timing.collect() as timings:
+                _, report = await timing.profile(
+                    _render_now_playing(
+                        template, custom_css, user_id, poller, renderer, store
+                    )
+                )
+        finally:
+            app_state.profiling = False
+        return PlainTextResponse(
+            report, headers={"Server-Timing": timings.server_timing()}
+        )
 
-        media_info = MediaInfo.from_dict(cached_data) if cached_data else None
-    else:
-        # In local mode, get data from poller
-        if not poller:
-            return Response(
-                content="<svg><text>Service not initialized</text></svg>",
-                media_type="image/svg+xml",
-            )
+    with timing.collect() as timings:
+        response = await _render_now_playing(
+            template, custom_css, user_id, poller, renderer, store
+        )
+    response.headers["Server-Timing"] = timings.server_timing()
+    response.headers["Timing-Allow-Origin"] = "*"
+    return response
 
-        try:
-            media_info = await poller.get_media_info()
-        except Exception:
-            media_info = None
+
+async def _render_now_playing(
+    template: str,
+    custom_css: Optional[str],
+    user_id: Optional[str],
+    poller: Optional[BasePoller],
+    renderer: Optional[Renderer],
+    store: MediaStore,
+) -> Response:
+    if not PUBLIC_MODE and not poller:
+        return Response(
+            content="<svg><text>Service not initialized</text></svg>",
+            media_type="image/svg+xml",
+        )
+    media_info = await _current_media(user_id, poller, store)
 
     if not renderer:
         error_svg = """
@@ -212,11 +508,10 @@ async def get_now_playing_svg(
         return Response(content=error_svg, media_type="image/svg+xml")
 
     try:
-        svg_content = renderer.render_svg(
-            media_info, template_name=template, custom_css=custom_css
+        svg_content = await _render_card(
+            renderer, template, custom_css, user_id, media_info, store
         )
-
-        return Response(
+        response = Response(
             content=svg_content,
             media_type="image/svg+xml",
             headers={
@@ -226,16 +521,324 @@ async def get_now_playing_svg(
                 "Access-Control-Allow-Headers": "Content-Type",
             },
         )
+        metrics.SVG_RESPONSES.labels("card").inc()
+        metrics.SVG_BYTES.labels("card").inc(len(response.body))
+        return response
     except Exception as e:
-        error_svg = f"""
-        <svg width="400" height="120" xmlns="http://www.w3.org/2000/svg">
-            <text x="10" y="50" fill="red">Error: {str(e)}</text>
-        </svg>
-        """
-        return Response(content=error_svg, media_type="image/svg+xml")
+        return Response(content=_error_card(e), media_type="image/svg+xml")
 
 
-@app.post("/api/v1/update")
+def _error_card(error: Exception) -> str:
+    """A small card reporting ``error`` in place of one that failed to render."""
+    return (
+        '<svg width="400" height="120" xmlns="http://www.w3.org/2000/svg">'
+        f'<text x="10" y="50" fill="red">Error: {html.escape(str(error))}</text>'
+        "</svg>"
+    )
+
+
+async def _current_media(
+    user_id: Optional[str], poller: Optional[BasePoller], store: MediaStore
+) -> Optional[MediaSnapshot]:
+    """Read a user's state from the store (public) or the poller (local)."""
+    if PUBLIC_MODE:
+        # In public mode, read shared state so every template instance agrees.
+        try:
+            cached_data = await _store_op(store, "get", user_id or "default")
+        except Exception as exc:
+            logger.warning("Store read failed: %s", exc)
+            cached_data = None
+        return await _resolve_media_info(cached_data, store)
+
+    try:
+        media_info = await _poll_media(poller)
+    except Exception:
+        media_info = None
+    app_state.broadcaster.publish(user_id or "default", media_info)
+    return media_info
+
+
+async def _saved_template(
+    user_id: Optional[str], template: str, store: MediaStore
+) -> Optional[dict]:
+    """The saved template ``template=user:<name>`` refers to, if readable."""
+    name = template[len(USER_TEMPLATE_PREFIX):]
+    try:
+        return await _load_user_template(user_id or "default", name, store)
+    except Exception as exc:
+        logger.warning("Template read failed: %s", exc)
+        return None
+
+
+async def _render_card(
+    renderer: Renderer,
+    template: str,
+    custom_css: Optional[str],
+    user_id: Optional[str],
+    media_info: Optional[MediaSnapshot],
+    store: MediaStore,
+) -> str:
+    """Render the now-playing card with a built-in or saved template."""
+    if not template.startswith(USER_TEMPLATE_PREFIX):
+        with timing.span("render"):
+            return renderer.render_svg(
+                media_info, template_name=template, custom_css=custom_css
+            )
+
+    saved = await _saved_template(user_id, template, store)
+    with timing.span("render"):
+        return await run_in_threadpool(
+            _render_saved_template,
+            renderer,
+            saved,
+            template[len(USER_TEMPLATE_PREFIX):],
+            media_info,
+            custom_css,
+        )
+
+
+@router.get("/now-playing.png")
+async def get_now_playing_png(
+    template: str = "turntable",
+    custom_css: Optional[str] = None,
+    user_id: Optional[str] = None,
+    scale: Optional[float] = None,
+    poller: Optional[BasePoller] = Depends(get_poller),
+    renderer: Optional[Renderer] = Depends(get_renderer),
+    store: MediaStore = Depends(get_store),
+):
+    """Get the current playing media as a PNG image.
+
+    The card is rendered as for ``/now-playing.svg`` and rasterized at
+    ``scale`` times the template's size (``server.png_scale`` by default).
+    PNGs are cached by state fingerprint, template, CSS and scale, so a card
+    is rasterized once per track change rather than once per request. Cards
+    with a progress bar are also re-rasterized every ``PNG_PROGRESS_STEP``
+    seconds of playback, since a PNG can't animate it.
+    """
+    # Imported here: resvg is only loaded by instances that serve PNGs
+    from .renderer.raster import MAX_SCALE, MIN_SCALE, RasterError
+
+    rasterizer = _get_rasterizer()
+    if not rasterizer.available:
+        raise HTTPException(
+            status_code=501, detail="PNG rendering requires the resvg-py package"
+        )
+    scale = PNG_SCALE if scale is None else scale
+    if not MIN_SCALE <= scale <= MAX_SCALE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"scale must be between {MIN_SCALE} and {MAX_SCALE}",
+        )
+    if not renderer:
+        raise HTTPException(status_code=503, detail="Renderer not initialized")
+    if not PUBLIC_MODE and not poller:
+        raise HTTPException(status_code=503, detail="Service not initialized")
+
+    with timing.collect() as timings:
+        media_info = await _current_media(user_id, poller, store)
+        # A saved template is identified by its source hash, so re-saving it
+        # changes the key instead of serving the old design
+        version = None
+        if template.startswith(USER_TEMPLATE_PREFIX):
+            saved = await _saved_template(user_id, template, store)
+            version = saved["hash"] if saved else None
+            shows_progress = bool(saved) and uses_progress(saved["source"])
+        else:
+            info = renderer.catalogue.get(template)
+            shows_progress = bool(info) and info.uses_progress
+
+        # The fingerprint ignores progress through the track, so bucket it
+        position = None
+        progress = media_info.progress() if media_info else None
+        if shows_progress and progress and media_info.is_playing:
+            position = int(progress[0] // PNG_PROGRESS_STEP)
+        cache_key = (
+            state_fingerprint(media_info),
+            position,
+            template,
+            version,
+            custom_css,
+            scale,
+        )
+
+        png = rasterizer.get(cache_key)
+        cached = png is not None
+        if not cached:
+            try:
+                svg_content = await _render_card(
+                    renderer, template, custom_css, user_id, media_info, store
+                )
+            except Exception as exc:
+                # As for the SVG card, a template that fails gets an error card
+                logger.warning("Rendering %s failed: %s", template, exc)
+                svg_content = _error_card(exc)
+                cache_key = ("error", svg_content, scale)
+            try:
+                with timing.span("raster"):
+                    png = await rasterizer.render(cache_key, svg_content, scale)
+            except RasterError as exc:
+                logger.warning("Rasterizing %s failed: %s", template, exc)
+                raise HTTPException(status_code=500, detail="Rasterizing failed")
+
+    metrics.PNG_RESPONSES.inc()
+    metrics.PNG_BYTES.inc(len(png))
+    return Response(
+        content=png,
+        media_type="image/png",
+        headers={
+            "Cache-Control": "public, max-age=10",
+            "Access-Control-Allow-Origin": "*",
+            "Server-Timing": timings.server_timing(),
+            "X-Png-Cache": "hit" if cached else "miss",
+        },
+    )
+
+
+def _get_rasterizer():
+    """The PNG rasterizer, created on first use."""
+    if app_state.rasterizer is None:
+        from .renderer.raster import Rasterizer
+
+        app_state.rasterizer = Rasterizer(
+            workers=config.get("server.png_workers", 2),
+            max_bytes=config.get("server.png_cache_mb", 32) * 1024 * 1024,
+        )
+        metrics.REGISTRY.watch_cache("png_cards", app_state.rasterizer.cache)
+    return app_state.rasterizer
+
+
+@router.get("/recent.svg")
+async def get_recent_svg(
+    template: str = "recent",
+    custom_css: Optional[str] = None,
+    user_id: Optional[str] = None,
+    limit: int = RECENT_CARD_ENTRIES,
+    renderer: Optional[Renderer] = Depends(get_renderer),
+    store: MediaStore = Depends(get_store),
+):
+    """Recently played tracks as an SVG card, read in one store call."""
+    if not renderer:
+        raise HTTPException(status_code=503, detail="Renderer not initialized")
+
+    history = await _read_history(user_id or "default", limit, store)
+    with timing.span("render"):
+        svg_content = renderer.render_svg(
+            None, template_name=template, custom_css=custom_css, history=history
+        )
+    metrics.SVG_RESPONSES.labels("recent").inc()
+    metrics.SVG_BYTES.labels("recent").inc(len(svg_content.encode()))
+    return Response(
+        content=svg_content,
+        media_type="image/svg+xml",
+        headers={
+            "Cache-Control": "public, max-age=30",
+            "Access-Control-Allow-Origin": "*",
+        },
+    )
+
+
+@router.get("/group.svg")
+async def get_group_svg(
+    users: str,
+    template: str = "group",
+    custom_css: Optional[str] = None,
+    renderer: Optional[Renderer] = Depends(get_renderer),
+    store: MediaStore = Depends(get_store),
+):
+    """What each user in ``users`` (comma-separated) is playing, as one card.
+
+    All states are read in one batched store call, artwork shared by several
+    members is fetched once, and the rendered card is cached by the
+    combination of member state fingerprints.
+    """
+    user_ids = list(dict.fromkeys(user.strip() for user in users.split(",")))
+    user_ids = [user_id for user_id in user_ids if user_id]
+    if not user_ids:
+        raise HTTPException(status_code=400, detail="No users given")
+    if len(user_ids) > GROUP_MAX_MEMBERS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {GROUP_MAX_MEMBERS} users per card"
+        )
+    if not renderer:
+        raise HTTPException(status_code=503, detail="Renderer not initialized")
+
+    with timing.collect() as timings:
+        try:
+            states = await _store_op(store, "get_many", user_ids)
+        except Exception as exc:
+            logger.warning("Store read failed: %s", exc)
+            states = [None] * len(user_ids)
+        members = await _resolve_members(user_ids, states, store)
+
+        cache_key = (
+            template,
+            custom_css,
+            tuple(
+                (member["user_id"], state_fingerprint(member["media_info"]))
+                for member in members
+            ),
+        )
+        svg_content = app_state.group_cards.get(cache_key)
+        cached = svg_content is not None
+        if not cached:
+            with timing.span("render"):
+                svg_content = renderer.render_svg(
+                    None, template_name=template, custom_css=custom_css, members=members
+                )
+            app_state.group_cards.put(cache_key, svg_content)
+
+    metrics.SVG_RESPONSES.labels("group").inc()
+    metrics.SVG_BYTES.labels("group").inc(len(svg_content.encode()))
+    return Response(
+        content=svg_content,
+        media_type="image/svg+xml",
+        headers={
+            "Cache-Control": "public, max-age=10",
+            "Access-Control-Allow-Origin": "*",
+            "Server-Timing": timings.server_timing(),
+            "X-Group-Cache": "hit" if cached else "miss",
+        },
+    )
+
+
+async def _resolve_members(
+    user_ids: list[str], states: list[Optional[dict]], store: MediaStore
+) -> list[dict]:
+    """Build each member's snapshot, fetching every distinct artwork once."""
+    hashes = list(
+        {
+            data["album_art_hash"]
+            for data in states
+            if data and data.get("album_art_hash") and not data.get("album_art_b64")
+        }
+    )
+    blobs = await asyncio.gather(*(_get_artwork(h, store) for h in hashes))
+    # Members sharing artwork share the bytes, and the card embeds them once
+    artwork = dict(zip(hashes, blobs))
+
+    members = []
+    with timing.span("decode"):
+        for user_id, data in zip(user_ids, states):
+            media_info = None
+            if data:
+                media_info = MediaSnapshot.from_dict(
+                    data, album_art=artwork.get(data.get("album_art_hash"))
+                )
+            members.append({"user_id": user_id, "media_info": media_info})
+    return members
+
+
+async def _read_history(cache_key: str, limit: int, store: MediaStore) -> list[dict]:
+    limit = max(1, min(limit, HISTORY_SIZE))
+    try:
+        return await _store_op(store, "get_history", cache_key, limit)
+    except Exception as exc:
+        logger.warning("History read failed: %s", exc)
+        return []
+
+
+@public_router.post("/api/v1/update")
 async def update_media_info(
     request: dict,
     api_key: str = None,
@@ -248,21 +851,295 @@ async def update_media_info(
             status_code=404, detail="Endpoint not available in local mode"
         )
 
-    expected_key = config.get("server.api_key", "your-secret-key")
-    if api_key != expected_key:
+    if not _api_key_valid(api_key):
         raise HTTPException(status_code=401, detail="Invalid API key")
 
-    cache_key = user_id or "default"
+    media_data = _validate_media_data(request.get("media_info"))
+    return await _apply_update(user_id or "default", media_data, store)
+
+
+def _api_key_valid(api_key: Optional[str]) -> bool:
+    return api_key == config.get("server.api_key", "your-secret-key")
+
+
+def _validate_media_data(media_data: Any) -> Optional[dict]:
+    """Check an uploaded state against ``MediaInfo`` and normalize its fields.
+
+    Artwork travels as ``album_art_b64``/``album_art_hash`` strings rather
+    than the model's bytes, so those are checked separately.
+
+    Raises:
+        HTTPException: 422 describing the invalid fields.
+    """
+    if not isinstance(media_data, dict):
+        if media_data is None:
+            return None
+        raise HTTPException(status_code=422, detail="media_info must be an object")
+    if not media_data:
+        return media_data
+
+    fields = {
+        name: media_data[name]
+        for name in MediaInfo.model_fields
+        if name != "album_art" and name in media_data
+    }
     try:
-        await run_in_threadpool(store.set, cache_key, request.get("media_info"))
+        model = MediaInfo.model_validate(fields)
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=422,
+            detail=exc.errors(
+                include_url=False, include_context=False, include_input=False
+            ),
+        )
+
+    # Only the fields sent, with the types the model coerced them to
+    validated = {name: getattr(model, name) for name in fields}
+    for name in ("album_art_hash", "album_art_b64"):
+        value = media_data.get(name)
+        if value is not None and not isinstance(value, str):
+            raise HTTPException(status_code=422, detail=f"{name} must be a string")
+        if name in media_data:
+            validated[name] = value
+    return validated
+
+
+async def _apply_update(
+    cache_key: str, media_data: Optional[dict], store: MediaStore
+) -> dict:
+    """Persist an uploaded state and notify live subscribers.
+
+    An upload identical to the last state this instance wrote for the user
+    (e.g. a client retrying after a lost acknowledgement) is counted as a
+    repeat but still written: another instance may have written a newer
+    state since, and the store must end up with the latest upload.
+    """
+    try:
+        media_data, artwork_status = await _normalize_artwork(media_data, store)
+    except Exception as exc:
+        logger.error("Store write failed: %s", exc)
+        raise HTTPException(status_code=502, detail="Failed to persist media state")
+
+    result = {"status": "updated", "user_id": cache_key, "backend": store.backend}
+    if artwork_status:
+        result["artwork"] = artwork_status
+
+    now = time.monotonic()
+    last = app_state.last_updates.get(cache_key)
+    if (
+        last is not None
+        and last[0] is store
+        and last[1] == media_data
+        and now - last[2] < UPDATE_REPEAT_WINDOW
+    ):
+        metrics.UPDATE_REPEATS.inc()
+
+    try:
+        await _store_op(store, "set", cache_key, media_data)
     except Exception as exc:
         logger.error("Store write failed: %s", exc)
         raise HTTPException(status_code=502, detail="Failed to persist media state")
+    app_state.last_updates.put(cache_key, (store, media_data, now))
+    metrics.UPDATES.inc()
+    await _record_history(cache_key, media_data, store)
 
-    return {"status": "updated", "user_id": cache_key, "backend": store.backend}
+    if app_state.broadcaster.has_subscribers(cache_key):
+        app_state.broadcaster.publish(
+            cache_key, await _resolve_media_info(media_data, store)
+        )
+
+    return result
 
 
-@app.get("/api/v1/status")
+@public_router.put("/api/v1/artwork/{art_hash}")
+async def upload_artwork(
+    art_hash: str,
+    request: Request,
+    api_key: str = None,
+    store: MediaStore = Depends(get_store),
+):
+    """Store raw artwork bytes referenced by ``album_art_hash`` (public mode only).
+
+    Clients call this only after an update reports ``"artwork": "missing"``.
+    """
+    if not PUBLIC_MODE:
+        raise HTTPException(
+            status_code=404, detail="Endpoint not available in local mode"
+        )
+    if not _api_key_valid(api_key):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+
+    body = await request.body()
+    if len(body) > MAX_ARTWORK_BYTES:
+        raise HTTPException(status_code=413, detail="Artwork too large")
+    return await _receive_artwork(art_hash, body, store)
+
+
+async def _receive_artwork(art_hash: str, body: bytes, store: MediaStore) -> dict:
+    if not body or artwork_hash(body) != art_hash:
+        raise HTTPException(status_code=400, detail="Artwork does not match its hash")
+
+    try:
+        await _store_artwork(body, store)
+    except Exception as exc:
+        logger.error("Artwork write failed: %s", exc)
+        raise HTTPException(status_code=502, detail="Failed to persist artwork")
+
+    return {"status": "stored", "hash": art_hash}
+
+
+@public_router.websocket("/api/v1/ws")
+async def ingest_websocket(
+    websocket: WebSocket,
+    api_key: Optional[str] = None,
+    user_id: Optional[str] = None,
+):
+    """Persistent update channel for public clients (public mode only).
+
+    The API key is checked once at connect time, either as the ``api_key``
+    query parameter or an ``Authorization: Bearer`` header. Each text frame
+    is ``{"media_info": ..., "seq": n}`` and is acknowledged with the same
+    body ``/api/v1/update`` returns, plus the echoed ``seq``. A binary frame
+    uploads raw artwork bytes, acknowledged like ``/api/v1/artwork``.
+    """
+    if not PUBLIC_MODE:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        api_key = authorization[7:].strip()
+    if not _api_key_valid(api_key):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    cache_key = user_id or "default"
+    store = app_state.store
+    await websocket.accept()
+
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
+
+            if frame.get("bytes") is not None:
+                body = frame["bytes"]
+                try:
+                    if len(body) > MAX_ARTWORK_BYTES:
+                        raise HTTPException(status_code=413, detail="Artwork too large")
+                    result = await _receive_artwork(artwork_hash(body), body, store)
+                except HTTPException as exc:
+                    result = {"status": "error", "detail": exc.detail}
+                await websocket.send_json(result)
+                continue
+
+            try:
+                message = json.loads(frame.get("text") or "")
+            except ValueError:
+                await websocket.send_json({"status": "error", "detail": "Invalid JSON"})
+                continue
+
+            if not isinstance(message, dict):
+                await websocket.send_json(
+                    {"status": "error", "detail": "Expected a JSON object"}
+                )
+                continue
+
+            try:
+                media_data = _validate_media_data(message.get("media_info"))
+                result = await _apply_update(cache_key, media_data, store)
+            except HTTPException as exc:
+                result = {"status": "error", "detail": exc.detail}
+
+            if "seq" in message:
+                result["seq"] = message["seq"]
+            await websocket.send_json(result)
+    except WebSocketDisconnect:
+        pass
+
+
+@router.get("/api/v1/stream")
+async def stream_media_state(
+    request: Request,
+    user_id: Optional[str] = None,
+    template: Optional[str] = None,
+    custom_css: Optional[str] = None,
+    renderer: Optional[Renderer] = Depends(get_renderer),
+    broadcaster: StateBroadcaster = Depends(get_broadcaster),
+):
+    """Stream state changes as Server-Sent Events.
+
+    Each ``state`` event carries the track metadata and, when ``template`` is
+    given, the pre-rendered SVG so viewers never re-fetch the card to poll.
+    """
+    cache_key = user_id or "default"
+
+    # Saved templates are read once per connection
+    saved = None
+    if template and template.startswith(USER_TEMPLATE_PREFIX):
+        try:
+            saved = await _load_user_template(
+                cache_key, template[len(USER_TEMPLATE_PREFIX):], app_state.store
+            )
+        except Exception as exc:
+            logger.warning("Template read failed: %s", exc)
+
+    def render(
+        media_info: Optional[MediaSnapshot], name: str, css: Optional[str]
+    ) -> str:
+        if name.startswith(USER_TEMPLATE_PREFIX):
+            return _render_saved_template(
+                renderer, saved, name[len(USER_TEMPLATE_PREFIX):], media_info, css
+            )
+        return renderer.render_svg(media_info, template_name=name, custom_css=css)
+
+    async def event_stream():
+        queue = broadcaster.subscribe(cache_key)
+        try:
+            yield f"retry: {int(STREAM_KEEPALIVE * 1000)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                svg = None
+                if template and renderer:
+                    svg = await event.svg(render, template, custom_css)
+                    metrics.SVG_RESPONSES.labels("stream").inc()
+                    metrics.SVG_BYTES.labels("stream").inc(len(svg.encode()))
+                yield event.format(svg)
+        finally:
+            broadcaster.unsubscribe(cache_key, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "Access-Control-Allow-Origin": "*",
+        },
+    )
+
+
+@router.get("/api/v1/history")
+async def get_history(
+    user_id: Optional[str] = None,
+    limit: int = 10,
+    store: MediaStore = Depends(get_store),
+):
+    """Most recent plays, newest first, with artwork referenced by hash."""
+    cache_key = user_id or "default"
+    return {
+        "user_id": cache_key,
+        "history": await _read_history(cache_key, limit, store),
+    }
+
+
+@router.get("/api/v1/status")
 async def get_status(
     poller: Optional[BasePoller] = Depends(get_poller),
     store: MediaStore = Depends(get_store),
@@ -272,7 +1149,7 @@ async def get_status(
 
     if PUBLIC_MODE:
         try:
-            cache_keys = await run_in_threadpool(store.keys)
+            cache_keys = await _store_op(store, "keys")
         except Exception as exc:
             logger.warning("Store keys failed: %s", exc)
             cache_keys = []
@@ -287,7 +1164,8 @@ async def get_status(
         current_media = None
         if poller:
             try:
-                current_media = await poller.get_media_info()
+                current_media = await _poll_media(poller)
+                app_state.broadcaster.publish("default", current_media)
                 current_media = current_media.to_dict() if current_media else None
             except Exception:
                 pass
@@ -300,12 +1178,74 @@ async def get_status(
         }
 
 
-@app.get("/health")
-async def health_check(
+@router.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/health")
+@router.get("/health/ready")
+async def readiness(
+    poller: Optional[BasePoller] = Depends(get_poller),
+    renderer: Optional[Renderer] = Depends(get_renderer),
+    store: MediaStore = Depends(get_store),
+):
+    """Readiness probe built only from in-memory state.
+
+    Reports the last poll result and its age instead of polling, and the
+    template catalogue loaded at startup instead of scanning the directory.
+    Returns 503 until the renderer (and, in local mode, the poller) exist.
+    """
+    ready = renderer is not None and (PUBLIC_MODE or poller is not None)
+
+    last_poll = None
+    if app_state.last_poll:
+        last_poll = dict(
+            app_state.last_poll,
+            age_seconds=round(time.time() - app_state.last_poll["at"], 3),
+        )
+
+    components = {
+        "renderer": {
+            "available": renderer is not None,
+            "templates": renderer.templates if renderer else [],
+        },
+    }
+    if PUBLIC_MODE:
+        components["store"] = {"backend": store.backend}
+    else:
+        components["poller"] = {
+            "available": poller is not None,
+            "type": type(poller).__name__ if poller else None,
+            "last_poll": last_poll,
+        }
+
+    body = {
+        "status": "ready" if ready else "unavailable",
+        "timestamp": datetime.now().isoformat(),
+        "mode": "public" if PUBLIC_MODE else "local",
+        "uptime_seconds": round(time.time() - app_state.start_time, 3)
+        if app_state.start_time
+        else 0,
+        "components": components,
+    }
+    if not ready:
+        return JSONResponse(body, status_code=503)
+    return body
+
+
+@router.get("/health/diagnostics")
+async def health_diagnostics(
     poller: Optional[BasePoller] = Depends(get_poller),
     renderer: Optional[Renderer] = Depends(get_renderer),
 ):
-    """Detailed health check endpoint."""
+    """Deep health check: polls the media player and lists the templates.
+
+    Templates come from the renderer's in-memory catalogue, so only the poll
+    is expensive. That is slow on macOS (it spawns helper processes), so this
+    endpoint is not meant for frequent probes.
+    """
     health_status = {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
@@ -326,7 +1266,7 @@ async def health_check(
 
     if poller and not PUBLIC_MODE:
         try:
-            test_result = await poller.get_media_info()
+            test_result = await _poll_media(poller)
             health_status["components"]["poller"]["test_successful"] = True
             health_status["components"]["poller"]["has_media"] = test_result is not None
         except Exception as e:
@@ -337,21 +1277,30 @@ async def health_check(
     return health_status
 
 
-@app.get("/api/v1/templates")
+@router.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics for render, store and poller latency and caches."""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE
+    )
+
+
+@router.get("/api/v1/templates")
 async def get_templates(renderer: Optional[Renderer] = Depends(get_renderer)):
     """get available SVG templates."""
     if not renderer:
         raise HTTPException(status_code=503, detail="Renderer not available")
     
-    templates = renderer.list_templates()
+    catalogue = renderer.catalogue
     return {
-        "templates": templates,
+        "templates": list(catalogue),
+        "metadata": {name: info.metadata() for name, info in catalogue.items()},
         "current_template": "turntable",
         "timestamp": datetime.now().isoformat()
     }
 
 
-@app.get("/api/v1/templates/{template_name}")
+@router.get("/api/v1/templates/{template_name}")
 async def get_template_content(
     template_name: str,
     renderer: Optional[Renderer] = Depends(get_renderer)
@@ -360,59 +1309,226 @@ async def get_template_content(
     if not renderer:
         raise HTTPException(status_code=503, detail="Renderer not available")
     
-    try:
-        template_path = renderer.template_dir / f"{template_name}.svg"
-        if template_path.exists():
-            with open(template_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            return {
-                "template_name": template_name,
-                "content": content,
-                "timestamp": datetime.now().isoformat()
-            }
-        else:
-            raise HTTPException(status_code=404, detail="Template not found")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error loading template: {str(e)}")
+    info = renderer.catalogue.get(template_name)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return {
+        "template_name": template_name,
+        "content": info.source,
+        "metadata": info.metadata(),
+        "timestamp": datetime.now().isoformat()
+    }
 
 
-@app.post("/api/v1/preview")
+@router.post("/api/v1/preview")
 async def preview_custom_svg(
     request: dict,
     renderer: Optional[Renderer] = Depends(get_renderer)
 ):
-    """preview custom SVG content with optional mock data."""
+    """Render submitted template source in a sandbox, with optional mock data.
+
+    The source is rendered exactly like a built-in template (``media_info``,
+    ``is_playing`` and ``custom_css`` are available), plus bare ``title``,
+    ``artist``, ``album`` and ``album_art`` for simple placeholder drafts.
+    """
     if not renderer:
         raise HTTPException(status_code=503, detail="Renderer not available")
-    
+
+    svg_content = request.get("svg_content") or ""
+    if len(svg_content.encode("utf-8")) > MAX_TEMPLATE_SOURCE_BYTES:
+        raise HTTPException(status_code=413, detail="Template source too large")
+
+    mock_data = request.get("mock_data") or {}
+    if not isinstance(mock_data, dict):
+        raise HTTPException(status_code=422, detail="mock_data must be an object")
+    media_info = MediaSnapshot.from_dict(
+        _validate_media_data({"is_playing": True, **mock_data})
+    )
+    context = renderer.template_context(media_info, request.get("custom_css"))
+    context.update(
+        title=mock_data.get("title", ""),
+        artist=mock_data.get("artist", ""),
+        album=mock_data.get("album", ""),
+        album_art=mock_data.get("album_art") or media_info.album_art_data_uri or "",
+    )
+
+    headers = {
+        "Cache-Control": "no-cache",
+        "Access-Control-Allow-Origin": "*",
+    }
     try:
-        svg_content = request.get("svg_content", "")
-        mock_data = request.get("mock_data", {})
-        
-        if mock_data:
-            svg_content = svg_content.replace("{{title}}", mock_data.get("title", ""))
-            svg_content = svg_content.replace("{{artist}}", mock_data.get("artist", ""))
-            svg_content = svg_content.replace("{{album}}", mock_data.get("album", ""))
-            svg_content = svg_content.replace("{{album_art}}", mock_data.get("album_art", ""))
-        
-        return Response(
-            content=svg_content,
-            media_type="image/svg+xml",
-            headers={
-                "Cache-Control": "no-cache",
-                "Access-Control-Allow-Origin": "*",
-            }
+        svg_content, cached = await run_in_threadpool(
+            app_state.previews.render, svg_content, context
         )
-        
-    except Exception as e:
+    except PreviewError as e:
         error_svg = f"""
         <svg width="400" height="120" xmlns="http://www.w3.org/2000/svg">
             <rect width="400" height="120" fill="#ff4444"/>
-            <text x="10" y="50" fill="white">Preview Error: {str(e)}</text>
+            <text x="10" y="50" fill="white">Preview Error: {html.escape(str(e))}</text>
         </svg>
         """
-        return Response(content=error_svg, media_type="image/svg+xml")
+        return Response(
+            content=error_svg,
+            status_code=422 if isinstance(e, PreviewLimitExceeded) else 400,
+            media_type="image/svg+xml",
+            headers=headers,
+        )
+
+    headers["X-Preview-Cache"] = "hit" if cached else "miss"
+    return Response(content=svg_content, media_type="image/svg+xml", headers=headers)
+
+
+def _check_template_access(api_key: Optional[str], name: Optional[str] = None) -> None:
+    if not _api_key_valid(api_key):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    if name is not None and not USER_TEMPLATE_NAME.match(name):
+        raise HTTPException(
+            status_code=400,
+            detail="Template names use 1-64 letters, digits, '-' or '_'",
+        )
+
+
+@router.get("/api/v1/user-templates")
+async def list_user_templates(
+    api_key: str = None,
+    user_id: Optional[str] = None,
+    store: MediaStore = Depends(get_store),
+):
+    """List the templates saved for a user."""
+    _check_template_access(api_key)
+    cache_key = user_id or "default"
+    try:
+        names = await _store_op(store, "list_templates", cache_key)
+    except Exception as exc:
+        logger.error("Template list failed: %s", exc)
+        raise HTTPException(status_code=502, detail="Failed to read templates")
+    return {"user_id": cache_key, "templates": names}
+
+
+@router.get("/api/v1/user-templates/{name}")
+async def get_user_template(
+    name: str,
+    api_key: str = None,
+    user_id: Optional[str] = None,
+    store: MediaStore = Depends(get_store),
+):
+    """Return a saved template's source, e.g. to reopen it in the editor."""
+    _check_template_access(api_key, name)
+    cache_key = user_id or "default"
+    try:
+        saved = await _store_op(store, "get_template", cache_key, name)
+    except Exception as exc:
+        logger.error("Template read failed: %s", exc)
+        raise HTTPException(status_code=502, detail="Failed to read template")
+    if not saved:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return {"user_id": cache_key, "name": name, **saved}
+
+
+@router.put("/api/v1/user-templates/{name}")
+async def save_user_template(
+    name: str,
+    request: dict,
+    api_key: str = None,
+    user_id: Optional[str] = None,
+    store: MediaStore = Depends(get_store),
+):
+    """Save a named template, rendered with ``template=user:<name>``.
+
+    The source is compiled once here so syntax errors are reported on save;
+    cards then use the short, stable ``user:<name>`` reference instead of
+    resending ``custom_css`` on every request.
+    """
+    _check_template_access(api_key, name)
+    source = request.get("source")
+    if not isinstance(source, str) or not source:
+        raise HTTPException(status_code=400, detail="Template source is required")
+    encoded = source.encode("utf-8")
+    if len(encoded) > MAX_TEMPLATE_SOURCE_BYTES:
+        raise HTTPException(status_code=413, detail="Template source too large")
+
+    try:
+        await run_in_threadpool(app_state.previews.compile, source)
+    except PreviewError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    cache_key = user_id or "default"
+    saved = {
+        "source": source,
+        "hash": hashlib.sha256(encoded).hexdigest()[:16],
+        "updated": time.time(),
+    }
+    try:
+        await _store_op(store, "set_template", cache_key, name, saved)
+    except Exception as exc:
+        logger.error("Template write failed: %s", exc)
+        raise HTTPException(status_code=502, detail="Failed to save template")
+    app_state.user_templates.put((cache_key, name), (store, saved, time.monotonic()))
+
+    return {
+        "status": "saved",
+        "user_id": cache_key,
+        "template": USER_TEMPLATE_PREFIX + name,
+        "hash": saved["hash"],
+    }
+
+
+@router.delete("/api/v1/user-templates/{name}")
+async def delete_user_template(
+    name: str,
+    api_key: str = None,
+    user_id: Optional[str] = None,
+    store: MediaStore = Depends(get_store),
+):
+    """Delete a saved template."""
+    _check_template_access(api_key, name)
+    cache_key = user_id or "default"
+    try:
+        deleted = await _store_op(store, "delete_template", cache_key, name)
+    except Exception as exc:
+        logger.error("Template delete failed: %s", exc)
+        raise HTTPException(status_code=502, detail="Failed to delete template")
+    app_state.user_templates.pop((cache_key, name))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return {"status": "deleted", "user_id": cache_key, "template": name}
+
+
+def create_app(public_mode: Optional[bool] = None) -> FastAPI:
+    """Build the ASGI application for public or local mode.
+
+    A public app registers the ingest routes and leaves out the local web
+    editor, so static file serving is never imported on a serverless cold
+    start. A local app serves the editor under ``/web`` instead; the lifespan
+    handler loads the poller only when ``PUBLIC_MODE`` is off.
+
+    Args:
+        public_mode: Mode to build for, ``PUBLIC_MODE`` by default
+    """
+    if public_mode is None:
+        public_mode = PUBLIC_MODE
+    application = FastAPI(
+        title="Now Playing Service",
+        description="A service to get currently playing music information.",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+    application.include_router(router)
+    if public_mode:
+        application.include_router(public_router)
+        return application
+
+    web_dir = Path(__file__).parent.parent / "web"
+    if web_dir.exists():
+        from fastapi.staticfiles import StaticFiles
+
+        application.mount(
+            "/web", StaticFiles(directory=str(web_dir), html=True), name="web"
+        )
+    return application
+
 
+app = create_app()
 
 
 if __name__ == "__main__":
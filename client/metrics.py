@@ -0,0 +1,298 @@
+"""
+Process-wide Prometheus metrics in the text exposition format.
+
+Deliberately tiny instead of pulling in ``prometheus_client``: recording a
+sample is a dict lookup, a bisect and a few additions under a lock, cheap
+enough to leave on for every request. Cache statistics are not counted on
+the hot path at all; ``LRUCache`` already tracks hits and misses, and those
+are read when ``/metrics`` is scraped.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+from .utils.lru import LRUCache
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow KV calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _format_labels(
+    names: tuple[str, ...], values: tuple[str, ...], extra: str = ""
+) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Return the child for one combination of label values."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def expose(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._expose_child(values, child))
+        return lines
+
+    def _expose_child(self, values: tuple[str, ...], child) -> list[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def _expose_child(
+        self, values: tuple[str, ...], child: _CounterChild
+    ) -> list[str]:
+        labels = _format_labels(self.labelnames, values)
+        return [f"{self.name}{labels} {_format_value(child.value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # One slot per bucket plus the implicit +Inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed, cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _expose_child(
+        self, values: tuple[str, ...], child: _HistogramChild
+    ) -> list[str]:
+        with child._lock:
+            counts = list(child.counts)
+            total = child.sum
+
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            cumulative += count
+            labels = _format_labels(
+                self.labelnames, values, f'le="{_format_value(bound)}"'
+            )
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics and watched caches rendered for ``/metrics``."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._caches: dict[str, LRUCache] = {}
+
+    def counter(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def watch_cache(self, name: str, cache: Optional[LRUCache]) -> None:
+        """Export an ``LRUCache``'s hit/miss/size statistics under ``name``."""
+        if cache is not None:
+            self._caches[name] = cache
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.expose())
+        lines.extend(self._expose_caches())
+        return "\n".join(lines) + "\n"
+
+    def _expose_caches(self) -> list[str]:
+        if not self._caches:
+            return []
+
+        series = {
+            "nowplaying_cache_hits_total": (
+                "counter",
+                "Cache lookups that hit",
+                "hits",
+            ),
+            "nowplaying_cache_misses_total": (
+                "counter",
+                "Cache lookups that missed",
+                "misses",
+            ),
+            "nowplaying_cache_entries": ("gauge", "Entries currently cached", None),
+            "nowplaying_cache_bytes": (
+                "gauge",
+                "Bytes currently cached",
+                "total_bytes",
+            ),
+        }
+        lines = []
+        for name, (kind, documentation, attribute) in series.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for cache_name, cache in sorted(self._caches.items()):
+                value = len(cache) if attribute is None else getattr(cache, attribute)
+                lines.append(f'{name}{{cache="{_escape(cache_name)}"}} {value}')
+        return lines
+
+
+# Shared by the whole process; instrumented modules register their metrics here.
+REGISTRY = MetricsRegistry()
+
+RENDER_SECONDS = REGISTRY.histogram(
+    "nowplaying_render_seconds", "Time spent rendering SVG cards", ("template",)
+)
+STORE_SECONDS = REGISTRY.histogram(
+    "nowplaying_store_seconds",
+    "Latency of media store operations",
+    ("backend", "operation"),
+)
+POLLER_SECONDS = REGISTRY.histogram(
+    "nowplaying_poller_seconds",
+    "Time spent fetching media info from the poller",
+    ("poller",),
+)
+POLLER_ERRORS = REGISTRY.counter(
+    "nowplaying_poller_errors_total", "Poller fetches that raised", ("poller",)
+)
+SVG_BYTES = REGISTRY.counter(
+    "nowplaying_svg_bytes_total", "SVG bytes served", ("endpoint",)
+)
+SVG_RESPONSES = REGISTRY.counter(
+    "nowplaying_svg_responses_total", "SVG cards served", ("endpoint",)
+)
+PNG_BYTES = REGISTRY.counter("nowplaying_png_bytes_total", "PNG bytes served")
+PNG_RESPONSES = REGISTRY.counter(
+    "nowplaying_png_responses_total", "PNG cards served"
+)
+UPDATE_REPEATS = REGISTRY.counter(
+    "nowplaying_update_repeats_total",
+    "Uploaded states identical to the last one this instance wrote",
+)
+UPDATES = REGISTRY.counter(
+    "nowplaying_updates_total", "Uploaded states written to the store"
+)
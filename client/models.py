@@ -1,11 +1,133 @@
 import base64
-from typing import Optional
+import hashlib
+import math
+import time
+from typing import Optional, Union
 
 from pydantic import BaseModel
 
 from .utils.image_metadata import detect_image_mime_type, read_image_dimensions
 
 
+def artwork_hash(data: bytes) -> str:
+    """Content address used to deduplicate artwork uploads and storage."""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+# Seconds a playback position may drift before it counts as a seek
+SEEK_TOLERANCE = 2.0
+
+
+def timeline_key(
+    is_playing: bool,
+    position: Optional[float],
+    duration: Optional[float],
+    position_timestamp: Optional[float],
+) -> str:
+    """
+    Identify a playback timeline, ignoring normal progress through it.
+
+    While playing, the wall-clock time the track would have started stays
+    constant until the listener seeks; while paused the position does. Both
+    are bucketed by ``SEEK_TOLERANCE`` so that re-sampling the position
+    rarely counts as a change; at worst one straddling a bucket edge costs
+    an extra render.
+    """
+    if position is None or not duration:
+        return ""
+    if is_playing and position_timestamp is not None:
+        anchor = position_timestamp - position
+    else:
+        anchor = position
+    return f"{duration:.0f}@{anchor // SEEK_TOLERANCE:.0f}"
+
+
+def media_fingerprint(
+    title: Optional[str],
+    artist: Optional[str],
+    album: Optional[str],
+    is_playing: bool,
+    album_art: Optional[bytes],
+    timeline: str = "",
+) -> str:
+    """Short digest of everything a rendered card depends on."""
+    digest = hashlib.sha1(
+        f"{title or ''}\0{artist or ''}\0{album or ''}\0{'1' if is_playing else '0'}"
+        .encode("utf-8")
+    )
+    if timeline:
+        digest.update(f"\0{timeline}".encode("utf-8"))
+    if album_art:
+        digest.update(hashlib.sha1(album_art).digest())
+    return digest.hexdigest()[:16]
+
+
+def playback_progress(
+    is_playing: bool,
+    position: Optional[float],
+    duration: Optional[float],
+    position_timestamp: Optional[float],
+    now: Optional[float] = None,
+) -> Optional[tuple[float, float]]:
+    """Elapsed and total seconds at ``now``, or None without a known length."""
+    if position is None or not duration or duration <= 0:
+        return None
+    elapsed = position
+    if is_playing and position_timestamp is not None:
+        elapsed += (time.time() if now is None else now) - position_timestamp
+    return round(min(max(elapsed, 0.0), duration), 3), round(duration, 3)
+
+
+def _as_seconds(value) -> Optional[float]:
+    """Coerce a timeline field to seconds, dropping anything that isn't one."""
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return None
+    return seconds if math.isfinite(seconds) else None
+
+
+def _timeline_fields(
+    position: Optional[float],
+    duration: Optional[float],
+    position_timestamp: Optional[float],
+) -> dict:
+    # Only serialized when known, so players without a timeline send nothing new
+    fields = {
+        "position": position,
+        "duration": duration,
+        "position_timestamp": position_timestamp,
+    }
+    return {key: value for key, value in fields.items() if value is not None}
+
+
+def _artwork_mime_type(album_art: bytes) -> str:
+    # Preserve the previous behavior for uncommon formats.
+    return detect_image_mime_type(album_art) or "image/png"
+
+
+def _fit(
+    dimensions: Optional[tuple[int, int]], max_width: int, max_height: int
+) -> tuple[int, int]:
+    if not dimensions:
+        return min(max_width, 96), min(max_height, 96)
+
+    width, height = dimensions
+    scale = min(max_width / width, max_height / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _decode_artwork(data: dict, album_art: Optional[bytes]) -> Optional[bytes]:
+    if album_art is None and data.get("album_art_b64"):
+        try:
+            album_art = base64.b64decode(data["album_art_b64"])
+        except Exception:
+            pass
+    return album_art
+
+
 class MediaInfo(BaseModel):
     """Data model for media information."""
 
@@ -14,11 +136,46 @@ class MediaInfo(BaseModel):
     album: Optional[str] = None
     is_playing: bool = False
     album_art: Optional[bytes] = None
+    # Seconds into the track, sampled at ``position_timestamp`` (Unix time)
+    position: Optional[float] = None
+    duration: Optional[float] = None
+    position_timestamp: Optional[float] = None
 
     class Config:
         # Allow arbitrary types like bytes
         arbitrary_types_allowed = True
 
+    @property
+    def fingerprint(self) -> str:
+        """Short digest of everything a rendered card depends on."""
+        return media_fingerprint(
+            self.title,
+            self.artist,
+            self.album,
+            self.is_playing,
+            self.album_art,
+            timeline_key(
+                self.is_playing, self.position, self.duration, self.position_timestamp
+            ),
+        )
+
+    def progress(self, now: Optional[float] = None) -> Optional[tuple[float, float]]:
+        """Elapsed and total seconds at ``now`` (default: the current time)."""
+        return playback_progress(
+            self.is_playing,
+            self.position,
+            self.duration,
+            self.position_timestamp,
+            now,
+        )
+
+    @property
+    def album_art_hash(self) -> Optional[str]:
+        """Content hash of the artwork, used to skip redundant uploads."""
+        if self.album_art:
+            return artwork_hash(self.album_art)
+        return None
+
     @property
     def album_art_b64(self) -> Optional[str]:
         """Get base64 encoded album art for embedding in SVG."""
@@ -31,9 +188,7 @@ class MediaInfo(BaseModel):
         """Detect the embedded artwork MIME type from its file signature."""
         if not self.album_art:
             return None
-
-        # Preserve the previous behavior for uncommon formats.
-        return detect_image_mime_type(self.album_art) or "image/png"
+        return _artwork_mime_type(self.album_art)
 
     @property
     def album_art_data_uri(self) -> Optional[str]:
@@ -58,41 +213,311 @@ class MediaInfo(BaseModel):
 
     def album_art_fit(self, max_width: int, max_height: int) -> tuple[int, int]:
         """Fit artwork inside a box without enlarging known source pixels."""
-        dimensions = self.album_art_dimensions
-        if not dimensions:
-            return min(max_width, 96), min(max_height, 96)
+        return _fit(self.album_art_dimensions, max_width, max_height)
 
-        width, height = dimensions
-        scale = min(max_width / width, max_height / height, 1.0)
-        return max(1, round(width * scale)), max(1, round(height * scale))
+    def to_dict(self, include_album_art: bool = True) -> dict:
+        """
+        Convert to dictionary for JSON serialization.
 
-    def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
-        return {
+        Args:
+            include_album_art: Embed the artwork as base64. When False only
+                ``album_art_hash`` identifies it, for delta uploads.
+        """
+        data = {
             "title": self.title,
             "artist": self.artist,
             "album": self.album,
             "is_playing": self.is_playing,
-            "album_art_b64": self.album_art_b64,
+            "album_art_hash": self.album_art_hash,
+            **_timeline_fields(self.position, self.duration, self.position_timestamp),
         }
+        if include_album_art:
+            data["album_art_b64"] = self.album_art_b64
+        return data
 
     @classmethod
-    def from_dict(cls, data: dict) -> "MediaInfo":
-        """Create MediaInfo from dictionary."""
+    def from_dict(
+        cls, data: dict, album_art: Optional[bytes] = None
+    ) -> "MediaInfo":
+        """
+        Create MediaInfo from dictionary.
+
+        Args:
+            data: Dictionary produced by ``to_dict``
+            album_art: Artwork resolved separately from ``album_art_hash``
+        """
         if not data:
             return None
 
-        album_art = None
-        if data.get("album_art_b64"):
-            try:
-                album_art = base64.b64decode(data["album_art_b64"])
-            except Exception:
-                pass
-
         return cls(
             title=data.get("title"),
             artist=data.get("artist"),
             album=data.get("album"),
             is_playing=data.get("is_playing", False),
-            album_art=album_art,
+            album_art=_decode_artwork(data, album_art),
+            position=data.get("position"),
+            duration=data.get("duration"),
+            position_timestamp=data.get("position_timestamp"),
+        )
+
+    def to_snapshot(self) -> "MediaSnapshot":
+        """Convert to the lightweight representation used internally."""
+        return MediaSnapshot(
+            self.title,
+            self.artist,
+            self.album,
+            self.is_playing,
+            self.album_art,
+            self.position,
+            self.duration,
+            self.position_timestamp,
+        )
+
+
+_UNSET = object()
+
+
+class MediaSnapshot:
+    """
+    Immutable media state for internal hot paths.
+
+    Pollers, the store and the renderer pass these around instead of
+    ``MediaInfo``: construction skips pydantic validation, instances carry no
+    ``__dict__``, the fingerprint is computed once up front and derived
+    artwork fields (hash, base64, MIME type, dimensions) are computed on first
+    use and cached. Reads the same as ``MediaInfo``; convert with
+    ``MediaInfo.to_snapshot()`` and ``to_model()`` at the API boundary.
+    """
+
+    __slots__ = (
+        "title",
+        "artist",
+        "album",
+        "is_playing",
+        "album_art",
+        "position",
+        "duration",
+        "position_timestamp",
+        "fingerprint",
+        "_album_art_hash",
+        "_album_art_b64",
+        "_album_art_mime_type",
+        "_album_art_dimensions",
+    )
+
+    def __init__(
+        self,
+        title: Optional[str] = None,
+        artist: Optional[str] = None,
+        album: Optional[str] = None,
+        is_playing: bool = False,
+        album_art: Optional[bytes] = None,
+        position: Optional[float] = None,
+        duration: Optional[float] = None,
+        position_timestamp: Optional[float] = None,
+    ):
+        album_art = album_art or None
+        is_playing = bool(is_playing)
+        # Stored states and pollers aren't validated, so bad values become None
+        position = _as_seconds(position)
+        duration = _as_seconds(duration)
+        position_timestamp = _as_seconds(position_timestamp)
+        timeline = ""
+        if duration is not None:
+            timeline = timeline_key(is_playing, position, duration, position_timestamp)
+        init = object.__setattr__
+        init(self, "title", title)
+        init(self, "artist", artist)
+        init(self, "album", album)
+        init(self, "is_playing", is_playing)
+        init(self, "album_art", album_art)
+        init(self, "position", position)
+        init(self, "duration", duration)
+        init(self, "position_timestamp", position_timestamp)
+        init(
+            self,
+            "fingerprint",
+            media_fingerprint(title, artist, album, is_playing, album_art, timeline),
+        )
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MediaSnapshot):
+            return NotImplemented
+        return (
+            self.fingerprint == other.fingerprint
+            and self.title == other.title
+            and self.artist == other.artist
+            and self.album == other.album
+            and self.is_playing == other.is_playing
+            and self.album_art == other.album_art
+            and self.position == other.position
+            and self.duration == other.duration
+            and self.position_timestamp == other.position_timestamp
         )
+
+    def __hash__(self) -> int:
+        return hash(self.fingerprint)
+
+    def __repr__(self) -> str:
+        return (
+            f"MediaSnapshot(title={self.title!r}, artist={self.artist!r}, "
+            f"album={self.album!r}, is_playing={self.is_playing!r}, "
+            f"position={self.position!r}, duration={self.duration!r}, "
+            f"album_art={len(self.album_art) if self.album_art else 0} bytes)"
+        )
+
+    def __reduce__(self):
+        return (
+            MediaSnapshot,
+            (
+                self.title,
+                self.artist,
+                self.album,
+                self.is_playing,
+                self.album_art,
+                self.position,
+                self.duration,
+                self.position_timestamp,
+            ),
+        )
+
+    def _cached(self, slot: str, compute):
+        # Cache slots stay empty until first use
+        value = getattr(self, slot, _UNSET)
+        if value is _UNSET:
+            value = compute() if self.album_art else None
+            object.__setattr__(self, slot, value)
+        return value
+
+    @property
+    def album_art_hash(self) -> Optional[str]:
+        """Content hash of the artwork, used to skip redundant uploads."""
+        return self._cached("_album_art_hash", lambda: artwork_hash(self.album_art))
+
+    @property
+    def album_art_b64(self) -> Optional[str]:
+        """Get base64 encoded album art for embedding in SVG."""
+        return self._cached(
+            "_album_art_b64",
+            lambda: base64.b64encode(self.album_art).decode("utf-8"),
+        )
+
+    def progress(self, now: Optional[float] = None) -> Optional[tuple[float, float]]:
+        """Elapsed and total seconds at ``now`` (default: the current time)."""
+        return playback_progress(
+            self.is_playing,
+            self.position,
+            self.duration,
+            self.position_timestamp,
+            now,
+        )
+
+    @property
+    def album_art_mime_type(self) -> Optional[str]:
+        """Detect the embedded artwork MIME type from its file signature."""
+        return self._cached(
+            "_album_art_mime_type", lambda: _artwork_mime_type(self.album_art)
+        )
+
+    @property
+    def album_art_data_uri(self) -> Optional[str]:
+        """Get a correctly typed data URI for embedding artwork in SVG."""
+        encoded = self.album_art_b64
+        if not encoded:
+            return None
+        return f"data:{self.album_art_mime_type};base64,{encoded}"
+
+    @property
+    def album_art_dimensions(self) -> Optional[tuple[int, int]]:
+        """Read artwork dimensions without decoding or resizing the image."""
+        return self._cached(
+            "_album_art_dimensions", lambda: read_image_dimensions(self.album_art)
+        )
+
+    def album_art_is_at_least(self, min_width: int, min_height: int) -> bool:
+        """Return whether artwork is large enough for a full-bleed layout."""
+        dimensions = self.album_art_dimensions
+        if not dimensions:
+            return False
+        width, height = dimensions
+        return width >= min_width and height >= min_height
+
+    def album_art_fit(self, max_width: int, max_height: int) -> tuple[int, int]:
+        """Fit artwork inside a box without enlarging known source pixels."""
+        return _fit(self.album_art_dimensions, max_width, max_height)
+
+    def replace(self, **changes) -> "MediaSnapshot":
+        """Return a copy with some fields changed."""
+        fields = {
+            "title": self.title,
+            "artist": self.artist,
+            "album": self.album,
+            "is_playing": self.is_playing,
+            "album_art": self.album_art,
+            "position": self.position,
+            "duration": self.duration,
+            "position_timestamp": self.position_timestamp,
+        }
+        fields.update(changes)
+        return MediaSnapshot(**fields)
+
+    def to_dict(self, include_album_art: bool = True) -> dict:
+        """Same serialization as ``MediaInfo.to_dict``."""
+        data = {
+            "title": self.title,
+            "artist": self.artist,
+            "album": self.album,
+            "is_playing": self.is_playing,
+            "album_art_hash": self.album_art_hash,
+            **_timeline_fields(self.position, self.duration, self.position_timestamp),
+        }
+        if include_album_art:
+            data["album_art_b64"] = self.album_art_b64
+        return data
+
+    @classmethod
+    def from_dict(
+        cls, data: dict, album_art: Optional[bytes] = None
+    ) -> Optional["MediaSnapshot"]:
+        """Same as ``MediaInfo.from_dict``, without model validation."""
+        if not data:
+            return None
+
+        return cls(
+            data.get("title"),
+            data.get("artist"),
+            data.get("album"),
+            data.get("is_playing", False),
+            _decode_artwork(data, album_art),
+            data.get("position"),
+            data.get("duration"),
+            data.get("position_timestamp"),
+        )
+
+    def to_model(self) -> MediaInfo:
+        """Convert to the pydantic model for API responses and validation."""
+        return MediaInfo(
+            title=self.title,
+            artist=self.artist,
+            album=self.album,
+            is_playing=self.is_playing,
+            album_art=self.album_art,
+            position=self.position,
+            duration=self.duration,
+            position_timestamp=self.position_timestamp,
+        )
+
+
+def as_snapshot(
+    media_info: Optional[Union[MediaInfo, MediaSnapshot]],
+) -> Optional[MediaSnapshot]:
+    """Accept either representation and return a snapshot."""
+    if media_info is None or isinstance(media_info, MediaSnapshot):
+        return media_info
+    return media_info.to_snapshot()
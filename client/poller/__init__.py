@@ -3,6 +3,15 @@ Polling services for retrieving media information from different platforms.
 """
 
 from .base import BasePoller
-from .factory import create_poller
 
 __all__ = ["BasePoller", "create_poller"]
+
+
+def __getattr__(name: str):
+    # Importing the factory is deferred so ``client.poller.base`` can be used
+    # without loading any platform poller.
+    if name == "create_poller":
+        from .factory import create_poller
+
+        return create_poller
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,46 @@
+"""
+Per-track artwork cache shared by the platform pollers.
+
+Album art only changes when the track does, so pollers look the current track
+up here before reading or decoding artwork again. Entries are keyed by the
+track metadata plus the media source when the platform exposes one.
+"""
+
+from typing import Optional
+
+from ..utils.lru import LRUCache
+
+ArtworkKey = tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def artwork_key(
+    title: Optional[str],
+    artist: Optional[str],
+    album: Optional[str],
+    source: Optional[str] = None,
+) -> ArtworkKey:
+    """Build the cache key identifying one track from one media source."""
+    return (source, title, artist, album)
+
+
+class ArtworkCache(LRUCache[bytes]):
+    """LRU cache of artwork bytes bounded by entry count and total size."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes)
+
+    def put(self, key: ArtworkKey, value: Optional[bytes]) -> None:
+        """Cache artwork for a track; missing artwork is never cached."""
+        if value:
+            super().put(key, value)
+
+
+# Shared by every poller in the process.
+artwork_cache = ArtworkCache()
@@ -1,19 +1,19 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 
-from ..models import MediaInfo
+from ..models import MediaSnapshot
 
 
 class BasePoller(ABC):
     """Abstract base class for all media pollers."""
 
     @abstractmethod
-    async def get_media_info(self) -> Optional[MediaInfo]:
+    async def get_media_info(self) -> Optional[MediaSnapshot]:
         """
         Get current media information.
 
         Returns:
-            MediaInfo object if media is playing, None otherwise.
+            MediaSnapshot object if media is playing, None otherwise.
         """
         pass
 
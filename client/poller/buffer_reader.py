@@ -0,0 +1,42 @@
+"""
+Bulk copy helpers for reading WinRT-style buffers into Python bytes.
+"""
+
+from typing import Any, Callable, Optional
+
+
+def read_buffer_bytes(
+    buffer: Any, reader_factory: Optional[Callable[[Any], Any]] = None
+) -> Optional[bytes]:
+    """
+    Copy the readable contents of a buffer in a single bulk operation.
+
+    The buffer protocol is tried first because it lets ``bytes`` copy the
+    whole payload at C speed. Buffers that don't expose it are drained with
+    one ``read_bytes`` call into a preallocated ``bytearray``.
+
+    Args:
+        buffer: Object exposing ``length`` (e.g. ``winsdk`` ``Buffer``)
+        reader_factory: Creates a reader with ``read_bytes`` for the buffer,
+            such as ``DataReader.from_buffer``
+
+    Returns:
+        The buffer contents, or None if the buffer is empty or unreadable.
+    """
+    length = getattr(buffer, "length", 0) or 0
+    if length <= 0:
+        return None
+
+    try:
+        with memoryview(buffer) as view:
+            return view.cast("B")[:length].tobytes()
+    except TypeError:
+        pass
+
+    if reader_factory is None:
+        return None
+
+    reader = reader_factory(buffer)
+    data = bytearray(length)
+    reader.read_bytes(data)
+    return bytes(data)
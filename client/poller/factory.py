@@ -2,30 +2,51 @@ import platform
 from typing import Optional
 
 from .base import BasePoller
-from .macos import MacosMediaPoller
-from .windows import WindowsMediaPoller
 
 
-def create_poller(exclude_browsers: bool = False) -> Optional[BasePoller]:
+def create_poller(
+    exclude_browsers: bool = False,
+    replay_trace: Optional[str] = None,
+    replay_speed: float = 1.0,
+) -> Optional[BasePoller]:
     """
     Factory function to create the appropriate poller for the current platform.
 
     Args:
         exclude_browsers: Whether to exclude browser media sources (default: False)
+        replay_trace: Replay this recorded trace instead of polling a player
+        replay_speed: Playback speed multiplier for ``replay_trace``
 
     Returns:
         A platform-specific poller instance, or None if no poller is available.
     """
+    # Poller modules are imported on demand so only the one in use (and its
+    # native bindings) is ever loaded.
+    if replay_trace:
+        from .replay import ReplayPoller
+
+        return ReplayPoller(replay_trace, speed=replay_speed, loop=True)
+
     system = platform.system()
 
     if system == "Windows":
+        from .windows import WindowsMediaPoller
+
         poller = WindowsMediaPoller(exclude_browsers=exclude_browsers)
         if poller.is_supported():
             return poller
     elif system == "Darwin":  # macOS
+        from .macos import MacosMediaPoller
+
         poller = MacosMediaPoller()
         if poller.is_supported():
             return poller
+    elif system == "Linux":
+        from .linux import LinuxMprisPoller
+
+        poller = LinuxMprisPoller(exclude_browsers=exclude_browsers)
+        if poller.is_supported():
+            return poller
 
     # Return a dummy poller if no platform-specific one is available
     return DummyPoller()
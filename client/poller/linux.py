@@ -0,0 +1,408 @@
+import asyncio
+import logging
+import platform
+import time
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import unquote, urlparse
+
+# Import D-Bus bindings only on Linux
+if platform.system() == "Linux":
+    try:
+        from dbus_next import BusType, Message, MessageType, Variant
+        from dbus_next.aio import MessageBus
+
+        DBUS_AVAILABLE = True
+    except ImportError:
+        DBUS_AVAILABLE = False
+else:
+    DBUS_AVAILABLE = False
+
+from ..models import MediaSnapshot
+from .artwork_cache import ArtworkCache, artwork_cache, artwork_key
+from .base import BasePoller
+
+logger = logging.getLogger(__name__)
+
+MPRIS_PREFIX = "org.mpris.MediaPlayer2."
+MPRIS_PATH = "/org/mpris/MediaPlayer2"
+PLAYER_INTERFACE = "org.mpris.MediaPlayer2.Player"
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+DBUS_NAME = "org.freedesktop.DBus"
+DBUS_PATH = "/org/freedesktop/DBus"
+
+# MPRIS reports positions and lengths in microseconds
+MICROSECONDS = 1_000_000
+
+# Artwork files larger than this are ignored rather than embedded in cards.
+MAX_ARTWORK_FILE_BYTES = 8 * 1024 * 1024
+
+
+def _unwrap(value: Any) -> Any:
+    """Recursively unwrap dbus-next ``Variant`` values into plain Python."""
+    if DBUS_AVAILABLE and isinstance(value, Variant):
+        return _unwrap(value.value)
+    if isinstance(value, dict):
+        return {key: _unwrap(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_unwrap(item) for item in value]
+    return value
+
+
+def _seconds(microseconds: Any) -> Optional[float]:
+    """Convert an MPRIS microsecond value, ignoring missing or bogus ones."""
+    if not isinstance(microseconds, int) or microseconds < 0:
+        return None
+    return microseconds / MICROSECONDS
+
+
+class LinuxMprisPoller(BasePoller):
+    """
+    Reads media information from MPRIS2 players on the D-Bus session bus.
+
+    Player state is loaded once per player and then kept current from
+    ``PropertiesChanged`` signals, so ``get_media_info`` never makes a
+    D-Bus round trip for metadata. ``Position`` isn't signalled, so it is
+    tracked from the initial load, ``Seeked`` signals and playback status
+    changes instead of being read on every poll.
+    """
+
+    def __init__(
+        self,
+        exclude_browsers: bool = False,
+        bus_address: Optional[str] = None,
+        artwork: Optional[ArtworkCache] = None,
+    ):
+        self.is_linux = platform.system() == "Linux"
+        self.dbus_available = DBUS_AVAILABLE
+        self.exclude_browsers = exclude_browsers
+        self.bus_address = bus_address
+        self.artwork_cache = artwork if artwork is not None else artwork_cache
+
+        # Browser MPRIS bus name fragments
+        self.browser_names = {
+            "firefox",
+            "chromium",
+            "chrome",
+            "brave",
+            "vivaldi",
+            "opera",
+            "edge",
+            "plasma-browser-integration",
+        }
+
+        self._bus = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        # Well-known bus name -> {"owner", "props", "updated", "position",
+        # "position_at"}
+        self._players: dict[str, dict[str, Any]] = {}
+        # Unique connection name -> well-known bus name
+        self._owners: dict[str, str] = {}
+        # Player loads started from signal handlers, referenced until done
+        self._tasks: set[asyncio.Task] = set()
+
+    def is_supported(self) -> bool:
+        """Check if MPRIS polling over D-Bus is supported."""
+        return self.is_linux and self.dbus_available
+
+    async def get_media_info(self) -> Optional[MediaSnapshot]:
+        """Get current media information from the most relevant player."""
+        if not self.is_supported():
+            return None
+
+        try:
+            await self._ensure_connected()
+        except Exception as e:
+            logger.error(f"Error connecting to D-Bus: {e}")
+            self._reset()
+            return None
+
+        selected = self._select_player()
+        if not selected:
+            return None
+
+        bus_name, player = selected
+        return await self._build_media_info(bus_name, player)
+
+    async def close(self) -> None:
+        """Disconnect from the session bus."""
+        if self._bus is not None:
+            self._bus.disconnect()
+        for task in self._tasks:
+            task.cancel()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._bus = None
+        self._players.clear()
+        self._owners.clear()
+
+    async def _ensure_connected(self) -> None:
+        """Connect, subscribe to player signals and load the initial state."""
+        if self._bus is not None and self._bus.connected:
+            return
+
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self._bus is not None and self._bus.connected:
+                return
+
+            self._reset()
+            if self.bus_address:
+                bus = MessageBus(bus_address=self.bus_address)
+            else:
+                bus = MessageBus(bus_type=BusType.SESSION)
+            await bus.connect()
+            bus.add_message_handler(self._on_message)
+
+            await self._dbus_call(
+                bus,
+                "AddMatch",
+                "s",
+                [
+                    f"type='signal',interface='{PROPERTIES_INTERFACE}',"
+                    f"member='PropertiesChanged',path='{MPRIS_PATH}',"
+                    f"arg0='{PLAYER_INTERFACE}'"
+                ],
+            )
+            await self._dbus_call(
+                bus,
+                "AddMatch",
+                "s",
+                [
+                    f"type='signal',sender='{DBUS_NAME}',"
+                    f"member='NameOwnerChanged',arg0namespace='org.mpris.MediaPlayer2'"
+                ],
+            )
+            await self._dbus_call(
+                bus,
+                "AddMatch",
+                "s",
+                [
+                    f"type='signal',interface='{PLAYER_INTERFACE}',"
+                    f"member='Seeked',path='{MPRIS_PATH}'"
+                ],
+            )
+            self._bus = bus
+
+            names = await self._dbus_call(bus, "ListNames")
+            for name in names[0] if names else []:
+                if self._is_player_name(name):
+                    await self._load_player(name)
+
+    async def _dbus_call(
+        self,
+        bus: Any,
+        member: str,
+        signature: str = "",
+        body: Optional[list] = None,
+    ) -> Optional[list]:
+        """Call a method on the bus daemon itself."""
+        reply = await bus.call(
+            Message(
+                destination=DBUS_NAME,
+                path=DBUS_PATH,
+                interface=DBUS_NAME,
+                member=member,
+                signature=signature,
+                body=body or [],
+            )
+        )
+        if reply.message_type == MessageType.ERROR:
+            raise RuntimeError(f"{member} failed: {reply.error_name} {reply.body}")
+        return reply.body
+
+    def _is_player_name(self, name: str) -> bool:
+        if not name.startswith(MPRIS_PREFIX):
+            return False
+        if self.exclude_browsers:
+            player = name[len(MPRIS_PREFIX) :].lower()
+            if any(browser in player for browser in self.browser_names):
+                return False
+        return True
+
+    async def _load_player(self, bus_name: str) -> None:
+        """Fetch the owner and all player properties for one MPRIS name."""
+        if self._bus is None:
+            return
+
+        try:
+            owner = await self._dbus_call(self._bus, "GetNameOwner", "s", [bus_name])
+            reply = await self._bus.call(
+                Message(
+                    destination=bus_name,
+                    path=MPRIS_PATH,
+                    interface=PROPERTIES_INTERFACE,
+                    member="GetAll",
+                    signature="s",
+                    body=[PLAYER_INTERFACE],
+                )
+            )
+        except Exception as e:
+            logger.debug(f"Error loading MPRIS player {bus_name}: {e}")
+            return
+
+        if not owner or reply.message_type == MessageType.ERROR:
+            return
+
+        props = _unwrap(reply.body[0])
+        self._owners[owner[0]] = bus_name
+        self._players[bus_name] = {
+            "owner": owner[0],
+            "props": props,
+            "updated": time.monotonic(),
+            "position": _seconds(props.get("Position")) or 0.0,
+            "position_at": time.time(),
+        }
+
+    def _remove_player(self, bus_name: str) -> None:
+        player = self._players.pop(bus_name, None)
+        if player:
+            self._owners.pop(player["owner"], None)
+
+    def _on_message(self, message: Any) -> None:
+        """Apply player signals to the cached state."""
+        if message.message_type != MessageType.SIGNAL:
+            return
+
+        if message.member == "Seeked" and message.interface == PLAYER_INTERFACE:
+            player = self._players.get(self._owners.get(message.sender))
+            if player is not None and message.body:
+                player["position"] = _seconds(message.body[0]) or 0.0
+                player["position_at"] = time.time()
+            return
+
+        if message.member == "NameOwnerChanged" and message.interface == DBUS_NAME:
+            name, _old_owner, new_owner = message.body
+            if not self._is_player_name(name):
+                return
+            self._remove_player(name)
+            if new_owner:
+                self._spawn(self._load_player(name))
+            return
+
+        if (
+            message.member != "PropertiesChanged"
+            or message.interface != PROPERTIES_INTERFACE
+            or message.path != MPRIS_PATH
+        ):
+            return
+
+        interface, changed, invalidated = message.body
+        bus_name = self._owners.get(message.sender)
+        if interface != PLAYER_INTERFACE or bus_name not in self._players:
+            return
+
+        player = self._players[bus_name]
+        changed = _unwrap(changed)
+        self._advance_position(player, changed)
+        player["props"].update(changed)
+        player["updated"] = time.monotonic()
+        if invalidated:
+            # Invalidated properties carry no value; re-read them all.
+            self._spawn(self._load_player(bus_name))
+
+    def _spawn(self, coroutine) -> None:
+        """Run a coroutine from a signal handler, keeping the task referenced."""
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Reloading MPRIS player failed: %s", task.exception())
+
+    @staticmethod
+    def _advance_position(player: dict[str, Any], changed: dict[str, Any]) -> None:
+        """Re-anchor the tracked position before a change takes effect."""
+        props = player["props"]
+        now = time.time()
+
+        def track(metadata: Optional[dict]) -> tuple:
+            metadata = metadata or {}
+            return metadata.get("mpris:trackid"), metadata.get("xesam:title")
+
+        if "Metadata" in changed and track(changed["Metadata"]) != track(
+            props.get("Metadata")
+        ):
+            player["position"], player["position_at"] = 0.0, now
+        elif "PlaybackStatus" in changed or "Rate" in changed:
+            if props.get("PlaybackStatus") == "Playing":
+                rate = props.get("Rate", 1.0)
+                player["position"] += (now - player["position_at"]) * rate
+            player["position_at"] = now
+
+    def _select_player(self) -> Optional[tuple[str, dict[str, Any]]]:
+        """Prefer a playing player, then the most recently updated one."""
+        if not self._players:
+            return None
+
+        def rank(item: tuple[str, dict[str, Any]]) -> tuple[bool, float]:
+            _name, player = item
+            playing = player["props"].get("PlaybackStatus") == "Playing"
+            return playing, player["updated"]
+
+        return max(self._players.items(), key=rank)
+
+    async def _build_media_info(
+        self, bus_name: str, player: dict[str, Any]
+    ) -> Optional[MediaSnapshot]:
+        props = player["props"]
+        metadata = props.get("Metadata") or {}
+        title = metadata.get("xesam:title")
+        if not title:
+            return None
+
+        artists = metadata.get("xesam:artist") or []
+        if isinstance(artists, str):
+            artists = [artists]
+        artist = ", ".join(artists) or "Unknown Artist"
+        album = metadata.get("xesam:album") or "Unknown Album"
+
+        album_art = None
+        art_url = metadata.get("mpris:artUrl")
+        if art_url:
+            album_art = await self._get_album_art(title, artist, album, art_url)
+
+        return MediaSnapshot(
+            title=title,
+            artist=artist,
+            album=album,
+            is_playing=props.get("PlaybackStatus") == "Playing",
+            album_art=album_art,
+            position=player["position"],
+            duration=_seconds(metadata.get("mpris:length")),
+            position_timestamp=player["position_at"],
+        )
+
+    async def _get_album_art(
+        self, title: str, artist: str, album: str, art_url: str
+    ) -> Optional[bytes]:
+        """Read ``file://`` artwork, at most once per track and URL."""
+        parsed = urlparse(art_url)
+        if parsed.scheme != "file":
+            return None
+
+        track_key = artwork_key(title, artist, album, art_url)
+        cached = self.artwork_cache.get(track_key)
+        if cached is not None:
+            return cached
+
+        path = Path(unquote(parsed.path))
+        try:
+            album_art = await asyncio.to_thread(self._read_artwork_file, path)
+        except OSError as e:
+            logger.debug(f"Error reading artwork {path}: {e}")
+            return None
+
+        self.artwork_cache.put(track_key, album_art)
+        return album_art
+
+    @staticmethod
+    def _read_artwork_file(path: Path) -> Optional[bytes]:
+        if path.stat().st_size > MAX_ARTWORK_FILE_BYTES:
+            return None
+        return path.read_bytes()
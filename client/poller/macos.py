@@ -1,13 +1,18 @@
 import json
+import logging
 import platform
 import subprocess
 import base64
+import time
 from pathlib import Path
 from typing import Optional
 
-from ..models import MediaInfo
+from ..models import MediaSnapshot
+from .artwork_cache import ArtworkCache, artwork_cache, artwork_key
 from .base import BasePoller
 
+logger = logging.getLogger(__name__)
+
 # JXA script path should be in the same directory
 JXA_SCRIPT_PATH = Path(__file__).parent / "get_media_info.jxa"
 
@@ -16,12 +21,29 @@ MEDIAREMOTE_FRAMEWORK = Path(__file__).parent / "mediaremote-adapter" / "MediaRe
 MEDIAREMOTE_SCRIPT = Path(__file__).parent / "mediaremote-adapter" / "bin" / "mediaremote-adapter.pl"
 
 
+def _timeline(elapsed, duration, timestamp, unit: float = 1.0):
+    """Position, duration and sample time in seconds; Nones if there's no timeline."""
+    try:
+        position = float(elapsed) / unit
+        duration = float(duration) / unit
+    except (TypeError, ValueError):
+        return None, None, None
+    if duration <= 0:
+        return None, None, None
+    try:
+        sampled_at = float(timestamp) / unit
+    except (TypeError, ValueError):
+        sampled_at = time.time()
+    return position, duration, sampled_at
+
+
 class MacosMediaPoller(BasePoller):
     """
     Polls for media information on macOS by executing a JXA script.
     """
 
-    def __init__(self):
+    def __init__(self, artwork: Optional[ArtworkCache] = None):
+        self.artwork_cache = artwork if artwork is not None else artwork_cache
         self.is_macos = platform.system() == "Darwin"
         self.script_available = JXA_SCRIPT_PATH.exists()
         self.enhanced_mode = (
@@ -32,7 +54,7 @@ class MacosMediaPoller(BasePoller):
         """Check if macOS JXA polling is supported."""
         return self.is_macos and self.script_available
 
-    async def get_media_info(self) -> Optional[MediaInfo]:
+    async def get_media_info(self) -> Optional[MediaSnapshot]:
         """Get current media information using JXA script."""
         if not self.is_supported():
             return None
@@ -46,7 +68,7 @@ class MacosMediaPoller(BasePoller):
         # Fallback to basic JXA mode
         return await self._get_basic_media_info()
 
-    async def _get_enhanced_media_info(self) -> Optional[MediaInfo]:
+    async def _get_enhanced_media_info(self) -> Optional[MediaSnapshot]:
         """Get media info with album artwork using mediaremote-adapter."""
         try:
             # Use mediaremote-adapter for complete info including artwork
@@ -54,7 +76,8 @@ class MacosMediaPoller(BasePoller):
                 "/usr/bin/perl",
                 str(MEDIAREMOTE_SCRIPT),
                 str(MEDIAREMOTE_FRAMEWORK),
-                "get"
+                "get",
+                "--micros",  # timestamp as epoch time rather than a date string
             ], capture_output=True, text=True, timeout=10)
 
             if process.returncode != 0 or not process.stdout.strip():
@@ -66,27 +89,47 @@ class MacosMediaPoller(BasePoller):
             if data is None:
                 return None
 
-            # Extract album artwork
-            album_art_data = None
-            if data.get("artworkData") and data.get("artworkMimeType"):
+            title = data.get("title", "Unknown Title")
+            artist = data.get("artist", "Unknown Artist")
+            album = data.get("album", "Unknown Album")
+
+            # Extract album artwork, decoding it only once per track
+            track_key = artwork_key(title, artist, album, data.get("bundleIdentifier"))
+            album_art_data = self.artwork_cache.get(track_key)
+            if (
+                album_art_data is None
+                and data.get("artworkData")
+                and data.get("artworkMimeType")
+            ):
                 try:
                     album_art_data = base64.b64decode(data["artworkData"])
+                    self.artwork_cache.put(track_key, album_art_data)
                 except Exception as e:
-                    print(f"Error decoding artwork: {e}")
+                    logger.warning("Error decoding artwork: %s", e)
 
-            return MediaInfo(
-                title=data.get("title", "Unknown Title"),
-                artist=data.get("artist", "Unknown Artist"),
-                album=data.get("album", "Unknown Album"),
+            position, duration, position_timestamp = _timeline(
+                data.get("elapsedTimeMicros"),
+                data.get("durationMicros"),
+                data.get("timestampEpochMicros"),
+                unit=1_000_000,
+            )
+
+            return MediaSnapshot(
+                title=title,
+                artist=artist,
+                album=album,
                 is_playing=data.get("playing", False),
                 album_art=album_art_data,
+                position=position,
+                duration=duration,
+                position_timestamp=position_timestamp,
             )
 
         except Exception as e:
-            print(f"Enhanced media info error: {e}")
+            logger.warning("Enhanced media info error: %s", e)
             return None
 
-    async def _get_basic_media_info(self) -> Optional[MediaInfo]:
+    async def _get_basic_media_info(self) -> Optional[MediaSnapshot]:
         """Get basic media info using JXA script (fallback)."""
         try:
             # Execute JXA script
@@ -111,19 +154,26 @@ class MacosMediaPoller(BasePoller):
 
             # Handle error response
             if isinstance(data, dict) and "error" in data:
-                print(f"JXA script error: {data['error']}")
+                logger.warning("JXA script error: %s", data["error"])
                 return None
 
             # Return None if no media data
             if not data or not isinstance(data, dict) or data.get("title") is None:
                 return None
 
-            return MediaInfo(
+            position, duration, position_timestamp = _timeline(
+                data.get("elapsedTime"), data.get("duration"), data.get("timestamp")
+            )
+
+            return MediaSnapshot(
                 title=data.get("title", "Unknown Title"),
                 artist=data.get("artist", "Unknown Artist"),
                 album=data.get("album", "Unknown Album"),
                 is_playing=data.get("isPlaying", False),
                 album_art=None,  # Basic mode doesn't provide artwork
+                position=position,
+                duration=duration,
+                position_timestamp=position_timestamp,
             )
 
         except (
@@ -131,8 +181,8 @@ class MacosMediaPoller(BasePoller):
             subprocess.TimeoutExpired,
             json.JSONDecodeError,
         ) as e:
-            print(f"Error getting basic macOS media info: {e}")
+            logger.warning("Error getting basic macOS media info: %s", e)
             return None
         except Exception as e:
-            print(f"Unexpected error in basic mode: {e}")
+            logger.error("Unexpected error in basic mode: %s", e)
             return None
@@ -0,0 +1,289 @@
+"""
+Replay and record media-state traces.
+
+A trace is a JSON-lines file with one entry per observed state change::
+
+    {"t": 12.5, "media_info": {"title": "...", "artist": "...", "album": "...",
+     "is_playing": true, "position": 61.2, "duration": 215.0,
+     "album_art_file": "trace.artwork/3f2a....png"}}
+
+``t`` is seconds since the start of the trace and ``media_info`` is ``null``
+when nothing was playing. ``position`` is the playback position when the
+entry was recorded; playing through a track isn't a change, seeking is.
+Artwork is stored once per distinct image in a sibling ``<trace>.artwork/``
+directory and referenced by relative path, so traces stay small and
+diffable.
+
+``ReplayPoller`` plays a trace back at real or accelerated speed, and
+``RecordingPoller`` wraps any real poller to capture one::
+
+    python -m client.poller.replay record trace.jsonl --interval 1
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from ..models import MediaSnapshot
+from ..utils.image_metadata import detect_image_mime_type
+from .base import BasePoller
+
+_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/bmp": ".bmp",
+    "image/tiff": ".tif",
+    "image/avif": ".avif",
+    "image/heic": ".heic",
+    "image/heif": ".heif",
+}
+
+
+def _artwork_dir(trace_path: Path) -> Path:
+    return trace_path.with_name(trace_path.name + ".artwork")
+
+
+class ReplayPoller(BasePoller):
+    """Plays back a recorded trace of media states."""
+
+    def __init__(
+        self,
+        trace_path: Union[str, Path],
+        speed: float = 1.0,
+        loop: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the replay poller.
+
+        Args:
+            trace_path: JSON-lines trace written by ``TraceRecorder``
+            speed: Playback speed multiplier (e.g. 10.0 replays 10x faster)
+            loop: Restart from the beginning once the trace has finished
+            clock: Monotonic clock in seconds, injectable for tests
+        """
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+
+        self.trace_path = Path(trace_path)
+        self.speed = speed
+        self.loop = loop
+        self._clock = clock
+        self._start: Optional[float] = None
+        self._wall_start = 0.0
+        self._artwork: dict[str, bytes] = {}
+
+        self._times: list[float] = []
+        self._states: list[Optional[dict[str, Any]]] = []
+        with open(self.trace_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._times.append(float(entry["t"]))
+                self._states.append(entry.get("media_info"))
+
+        # The trace lasts until its final state, which is held for a second
+        # so that looping replays show it at all.
+        self.duration = self._times[-1] + 1.0 if self._times else 0.0
+
+    def is_supported(self) -> bool:
+        """Replay works wherever the trace file can be read."""
+        return bool(self._times)
+
+    def restart(self) -> None:
+        """Start playback again from the beginning of the trace."""
+        self._start = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether a non-looping replay has passed its last state."""
+        return not self.loop and self._elapsed(advance=False) >= self.duration
+
+    async def get_media_info(self) -> Optional[MediaSnapshot]:
+        """Return the trace state that is current at the replay clock."""
+        if not self._times:
+            return None
+
+        elapsed = trace_time = self._elapsed()
+        if self.loop:
+            trace_time %= self.duration
+
+        index = bisect.bisect_right(self._times, trace_time) - 1
+        if index < 0:
+            return None
+        # Wall-clock time the entry was reached, when its position was current
+        entered_at = self._wall_start + (
+            elapsed - trace_time + self._times[index]
+        ) / self.speed
+        return self._to_media_info(self._states[index], entered_at)
+
+    def _elapsed(self, advance: bool = True) -> float:
+        now = self._clock()
+        if self._start is None:
+            if not advance:
+                return 0.0
+            self._start = now
+            self._wall_start = time.time()
+        return (now - self._start) * self.speed
+
+    def _to_media_info(
+        self, state: Optional[dict[str, Any]], entered_at: float
+    ) -> Optional[MediaSnapshot]:
+        if not state:
+            return None
+
+        album_art = None
+        art_file = state.get("album_art_file")
+        if art_file:
+            album_art = self._artwork.get(art_file)
+            if album_art is None:
+                album_art = (self.trace_path.parent / art_file).read_bytes()
+                self._artwork[art_file] = album_art
+
+        return MediaSnapshot(
+            title=state.get("title"),
+            artist=state.get("artist"),
+            album=state.get("album"),
+            is_playing=state.get("is_playing", False),
+            album_art=album_art,
+            position=state.get("position"),
+            duration=state.get("duration"),
+            position_timestamp=entered_at if "position" in state else None,
+        )
+
+
+class TraceRecorder:
+    """Appends media-state changes to a JSON-lines trace."""
+
+    def __init__(
+        self,
+        trace_path: Union[str, Path],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.trace_path = Path(trace_path)
+        self._clock = clock
+        self._start: Optional[float] = None
+        self._last: Any = object()
+        self._artwork_files: dict[str, str] = {}
+
+        self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+        self.trace_path.write_text("", encoding="utf-8")
+
+    def record(self, media_info: Optional[MediaSnapshot]) -> bool:
+        """
+        Record a state if it differs from the previous one.
+
+        Returns:
+            True if a new trace entry was written, False otherwise.
+        """
+        # The fingerprint ignores playing through a track but not seeking
+        key = media_info.fingerprint if media_info else None
+        if key == self._last:
+            return False
+        state = self._to_state(media_info)
+
+        now = self._clock()
+        if self._start is None:
+            self._start = now
+
+        entry = {"t": round(now - self._start, 3), "media_info": state}
+        with open(self.trace_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._last = key
+        return True
+
+    def _to_state(
+        self, media_info: Optional[MediaSnapshot]
+    ) -> Optional[dict[str, Any]]:
+        if media_info is None:
+            return None
+
+        state = {
+            "title": media_info.title,
+            "artist": media_info.artist,
+            "album": media_info.album,
+            "is_playing": media_info.is_playing,
+        }
+        progress = media_info.progress()
+        if progress:
+            state["position"], state["duration"] = progress
+        state["album_art_file"] = self._store_artwork(media_info.album_art)
+        return state
+
+    def _store_artwork(self, album_art: Optional[bytes]) -> Optional[str]:
+        """Write each distinct image once and return its trace-relative path."""
+        if not album_art:
+            return None
+
+        digest = hashlib.sha256(album_art).hexdigest()
+        if digest in self._artwork_files:
+            return self._artwork_files[digest]
+
+        extension = _EXTENSIONS.get(detect_image_mime_type(album_art) or "", ".bin")
+        artwork_dir = _artwork_dir(self.trace_path)
+        artwork_dir.mkdir(exist_ok=True)
+        path = artwork_dir / f"{digest[:16]}{extension}"
+        if not path.exists():
+            path.write_bytes(album_art)
+
+        relative = f"{artwork_dir.name}/{path.name}"
+        self._artwork_files[digest] = relative
+        return relative
+
+
+class RecordingPoller(BasePoller):
+    """Wraps a real poller and records every state change it observes."""
+
+    def __init__(self, poller: BasePoller, recorder: TraceRecorder):
+        self.poller = poller
+        self.recorder = recorder
+
+    def is_supported(self) -> bool:
+        return self.poller.is_supported()
+
+    async def get_media_info(self) -> Optional[MediaSnapshot]:
+        media_info = await self.poller.get_media_info()
+        self.recorder.record(media_info)
+        return media_info
+
+
+async def _record(trace_path: str, interval: float, exclude_browsers: bool) -> None:
+    from .factory import create_poller
+
+    poller = RecordingPoller(
+        create_poller(exclude_browsers=exclude_browsers), TraceRecorder(trace_path)
+    )
+    print(f"Recording {type(poller.poller).__name__} to {trace_path}")
+    print("Press Ctrl+C to stop")
+    while True:
+        media_info = await poller.get_media_info()
+        print(f"[{time.strftime('%H:%M:%S')}] {media_info.title if media_info else 'No media'}")
+        await asyncio.sleep(interval)
+
+
+def main() -> None:
+    """Command line entry point for recording traces."""
+    parser = argparse.ArgumentParser(description="Record a media-state trace.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record = subparsers.add_parser("record", help="record the platform poller")
+    record.add_argument("trace", help="output JSON-lines trace path")
+    record.add_argument("--interval", type=float, default=1.0)
+    record.add_argument("--exclude-browsers", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_record(args.trace, args.interval, args.exclude_browsers))
+    except KeyboardInterrupt:
+        print("\nStopped recording")
+
+
+if __name__ == "__main__":
+    main()
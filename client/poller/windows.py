@@ -1,3 +1,4 @@
+import logging
 import platform
 from typing import Optional
 
@@ -19,8 +20,12 @@ if platform.system() == "Windows":
 else:
     WINDOWS_AVAILABLE = False
 
-from ..models import MediaInfo
+from ..models import MediaSnapshot
+from .artwork_cache import ArtworkCache, artwork_cache, artwork_key
 from .base import BasePoller
+from .buffer_reader import read_buffer_bytes
+
+logger = logging.getLogger(__name__)
 
 
 class WindowsMediaPoller(BasePoller):
@@ -29,7 +34,12 @@ class WindowsMediaPoller(BasePoller):
     Uses the modern Windows SDK Python bindings for better compatibility.
     """
 
-    def __init__(self, enable_album_art: bool = True, exclude_browsers: bool = False):
+    def __init__(
+        self,
+        enable_album_art: bool = True,
+        exclude_browsers: bool = False,
+        artwork: Optional[ArtworkCache] = None,
+    ):
         self.is_windows = platform.system() == "Windows"
         self.winsdk_available = WINDOWS_AVAILABLE
         self.enable_album_art = enable_album_art
@@ -46,11 +56,13 @@ class WindowsMediaPoller(BasePoller):
             "iexplore.exe",
         }
 
+        self.artwork_cache = artwork if artwork is not None else artwork_cache
+
     def is_supported(self) -> bool:
         """Check if Windows winsdk polling is supported."""
         return self.is_windows and self.winsdk_available
 
-    async def get_media_info(self) -> Optional[MediaInfo]:
+    async def get_media_info(self) -> Optional[MediaSnapshot]:
         """Get current media information using Windows winsdk API."""
         if not self.is_supported():
             return None
@@ -76,7 +88,7 @@ class WindowsMediaPoller(BasePoller):
                         for browser in self.browser_processes:
                             browser_name = browser.replace('.exe', '')
                             if browser_name in source_lower:
-                                print(f"Skipping browser session: {source_app_user_model_id}")
+                                logger.debug("Skipping browser session: %s", source_app_user_model_id)
                                 return None
                     
                     # 如果无法获取源应用信息，检查媒体标题是否包含浏览器特征
@@ -97,11 +109,11 @@ class WindowsMediaPoller(BasePoller):
                         
                         for indicator in browser_indicators:
                             if indicator in title_lower:
-                                print(f"Skipping browser media: {info.title}")
+                                logger.debug("Skipping browser media: %s", info.title)
                                 return None
                 
                 except Exception as e:
-                    print(f"Error checking browser filter: {e}")
+                    logger.warning("Error checking browser filter: %s", e)
                     # 继续处理，不阻断正常功能
 
             info = await current_session.try_get_media_properties_async()
@@ -131,32 +143,62 @@ class WindowsMediaPoller(BasePoller):
             except Exception:
                 is_playing = "playing" in playback_status_str.lower()
 
-            import logging
-
-            logger = logging.getLogger(__name__)
             logger.debug(
                 f"Playback status object: {playback_status}, string: '{playback_status_str}', is_playing: {is_playing}"
             )
 
             album_art = None
             if self.enable_album_art:
-                album_art = await self._get_album_art(info.thumbnail)
+                track_key = artwork_key(
+                    title,
+                    artist,
+                    album,
+                    getattr(current_session, "source_app_user_model_id", None),
+                )
+                album_art = self.artwork_cache.get(track_key)
+                if album_art is None:
+                    # Thumbnails often arrive after the track change; a miss
+                    # isn't cached so the next poll retries.
+                    album_art = await self._get_album_art(info.thumbnail)
+                    self.artwork_cache.put(track_key, album_art)
+
+            position, duration, position_timestamp = self._get_timeline(
+                current_session
+            )
 
-            return MediaInfo(
+            return MediaSnapshot(
                 title=title,
                 artist=artist,
                 album=album,
                 is_playing=is_playing,
                 album_art=album_art,
+                position=position,
+                duration=duration,
+                position_timestamp=position_timestamp,
             )
 
         except Exception as e:
-            import logging
-
-            logger = logging.getLogger(__name__)
             logger.error(f"Error getting Windows media info: {e}", exc_info=True)
             return None
 
+    def _get_timeline(
+        self, session
+    ) -> tuple[Optional[float], Optional[float], Optional[float]]:
+        """Read the session's position, length and when the position was sampled."""
+        try:
+            timeline = session.get_timeline_properties()
+            duration = (timeline.end_time - timeline.start_time).total_seconds()
+            if duration <= 0:
+                # Streams and some apps publish no timeline
+                return None, None, None
+            return (
+                (timeline.position - timeline.start_time).total_seconds(),
+                duration,
+                timeline.last_updated_time.timestamp(),
+            )
+        except Exception:
+            return None, None, None
+
     async def _get_album_art(self, thumbnail_ref) -> Optional[bytes]:
         """Extract album art bytes from thumbnail reference."""
         if not thumbnail_ref:
@@ -178,25 +220,11 @@ class WindowsMediaPoller(BasePoller):
                 return None
 
             try:
-                reader = DataReader.from_buffer(buffer)
-                byte_data = bytearray()
-
-                for _i in range(buffer.length):
-                    try:
-                        byte_val = reader.read_byte()
-                        byte_data.append(byte_val)
-                    except Exception:
-                        break
-
-                if len(byte_data) > 0:
-                    return bytes(byte_data)
-                else:
-                    return None
-
+                return read_buffer_bytes(buffer, DataReader.from_buffer)
             except Exception as read_error:
-                print(f"Error reading bytes from buffer: {read_error}")
+                logger.warning("Error reading bytes from buffer: %s", read_error)
                 return None
 
         except Exception as e:
-            print(f"Error extracting album art: {e}")
+            logger.warning("Error extracting album art: %s", e)
             return None
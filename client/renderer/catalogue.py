@@ -0,0 +1,171 @@
+"""
+Template catalogue, loaded once and then read without touching the disk.
+
+Every ``.svg`` in the template directory is read and compiled at startup into
+an immutable ``TemplateCatalogue`` holding the compiled template, its source
+and metadata parsed from the root ``<svg>`` element. Rendering, listing and
+the template API only read the catalogue, so serving a card never stats or
+opens a file. In development ``watch`` rebuilds the catalogue when files
+change, using ``watchfiles`` when installed and an mtime poll otherwise.
+"""
+
+import asyncio
+import logging
+import re
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Optional, Union
+
+from jinja2 import DictLoader, Environment, Template, select_autoescape
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIX = ".svg"
+
+_ROOT_SVG = re.compile(r"<svg\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r'\b(width|height|viewBox)\s*=\s*"([^"]*)"')
+
+
+@dataclass(frozen=True)
+class TemplateInfo:
+    """One compiled template with its source and metadata."""
+
+    name: str
+    source: str
+    template: Template
+    width: Optional[int]
+    height: Optional[int]
+    uses_artwork: bool
+    uses_progress: bool
+
+    def metadata(self) -> dict:
+        return {
+            "name": self.name,
+            "width": self.width,
+            "height": self.height,
+            "uses_artwork": self.uses_artwork,
+            "uses_progress": self.uses_progress,
+        }
+
+
+def uses_progress(source: str) -> bool:
+    """Whether template source draws the playback position."""
+    return ".progress(" in source
+
+
+def _declared_size(source: str) -> tuple[Optional[int], Optional[int]]:
+    """Read the root element's size, falling back to its viewBox."""
+    root = _ROOT_SVG.search(source)
+    if not root:
+        return None, None
+    attributes = dict(_ATTRIBUTE.findall(root.group(0)))
+
+    def number(value: Optional[str]) -> Optional[int]:
+        try:
+            return round(float(value)) if value else None
+        except ValueError:
+            return None
+
+    width, height = number(attributes.get("width")), number(attributes.get("height"))
+    view_box = attributes.get("viewBox", "").replace(",", " ").split()
+    if len(view_box) == 4:
+        width = width or number(view_box[2])
+        height = height or number(view_box[3])
+    return width, height
+
+
+class TemplateCatalogue(Mapping[str, TemplateInfo]):
+    """Read-only mapping of template name to ``TemplateInfo``."""
+
+    def __init__(self, env: Environment, entries: Mapping[str, TemplateInfo]):
+        self.env = env
+        self._entries = MappingProxyType(dict(entries))
+
+    @classmethod
+    def load(cls, template_dir: Union[str, Path]) -> "TemplateCatalogue":
+        """Read and compile every template in ``template_dir``."""
+        template_dir = Path(template_dir)
+        sources = {}
+        if template_dir.exists():
+            for path in sorted(template_dir.glob(f"*{TEMPLATE_SUFFIX}")):
+                sources[path.stem] = path.read_text(encoding="utf-8")
+
+        # Templates are looked up by their file name, as with FileSystemLoader
+        env = Environment(
+            loader=DictLoader(
+                {name + TEMPLATE_SUFFIX: source for name, source in sources.items()}
+            ),
+            autoescape=select_autoescape(["html", "xml", "svg"]),
+            auto_reload=False,
+        )
+        entries = {}
+        for name, source in sources.items():
+            width, height = _declared_size(source)
+            entries[name] = TemplateInfo(
+                name=name,
+                source=source,
+                template=env.get_template(name + TEMPLATE_SUFFIX),
+                width=width,
+                height=height,
+                uses_artwork="album_art" in source,
+                uses_progress=uses_progress(source),
+            )
+        return cls(env, entries)
+
+    def __getitem__(self, name: str) -> TemplateInfo:
+        return self._entries[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _snapshot_mtimes(template_dir: Path) -> dict[str, float]:
+    return {
+        path.name: path.stat().st_mtime
+        for path in template_dir.glob(f"*{TEMPLATE_SUFFIX}")
+    }
+
+
+async def watch(
+    template_dir: Union[str, Path],
+    on_change: Callable[[], None],
+    poll_interval: float = 1.0,
+) -> None:
+    """
+    Call ``on_change`` whenever a template in ``template_dir`` changes.
+
+    Runs until cancelled. Meant for development only.
+    """
+    template_dir = Path(template_dir)
+
+    def notify() -> None:
+        try:
+            on_change()
+        except Exception:
+            logger.exception("Reloading templates failed")
+
+    # Imported here: production never watches, so never pays for it.
+    try:
+        from watchfiles import awatch
+    except ImportError:
+        awatch = None
+
+    if awatch is not None:
+        async for changes in awatch(template_dir):
+            if any(path.endswith(TEMPLATE_SUFFIX) for _, path in changes):
+                notify()
+        return
+
+    logger.info("watchfiles not installed; polling %s for changes", template_dir)
+    previous = _snapshot_mtimes(template_dir)
+    while True:
+        await asyncio.sleep(poll_interval)
+        current = _snapshot_mtimes(template_dir)
+        if current != previous:
+            previous = current
+            notify()
@@ -1,9 +1,13 @@
+import html
+import time
 from pathlib import Path
 from typing import Optional
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment
 
-from ..models import MediaInfo
+from ..metrics import RENDER_SECONDS
+from ..models import MediaSnapshot
+from .catalogue import TEMPLATE_SUFFIX, TemplateCatalogue
 
 
 class Renderer:
@@ -21,17 +25,28 @@ class Renderer:
 
         self.template_dir = Path(template_dir)
 
-        # Create Jinja2 environment
-        self.env = Environment(
-            loader=FileSystemLoader(str(self.template_dir)),
-            autoescape=select_autoescape(["html", "xml", "svg"]),
-        )
+        # Read and compiled once, so rendering never touches the filesystem
+        self.catalogue = TemplateCatalogue.load(self.template_dir)
+
+    @property
+    def env(self) -> Environment:
+        return self.catalogue.env
+
+    @property
+    def templates(self) -> list[str]:
+        return list(self.catalogue)
+
+    def reload(self) -> None:
+        """Rebuild the catalogue from disk, e.g. when a watched file changes."""
+        self.catalogue = TemplateCatalogue.load(self.template_dir)
 
     def render_svg(
         self,
-        media_info: Optional[MediaInfo] = None,
+        media_info: Optional[MediaSnapshot] = None,
         template_name: str = "turntable",
         custom_css: Optional[str] = None,
+        history: Optional[list[dict]] = None,
+        members: Optional[list[dict]] = None,
     ) -> str:
         """
         Render an SVG using the specified template and media information.
@@ -40,34 +55,48 @@ class Renderer:
             media_info: Current media information, or None if nothing is playing
             template_name: Name of the template to use (without .svg extension)
             custom_css: Optional custom CSS to inject into the template
+            history: Recent plays, newest first, for history templates
+            members: ``{"user_id", "media_info"}`` per user, for group templates
 
         Returns:
             Rendered SVG as a string
         """
-        # Ensure template has .svg extension
-        if not template_name.endswith(".svg"):
-            template_name += ".svg"
+        # Accept the name with or without the .svg extension
+        name = template_name.removesuffix(TEMPLATE_SUFFIX)
+        info = self.catalogue.get(name)
+        if info is None:
+            return self._render_error_svg(f"Template not found: {name}")
 
         try:
-            # Load template
-            template = self.env.get_template(template_name)
-
             # Prepare template context
-            context = {
-                "media_info": media_info,
-                "custom_css": custom_css or "",
-                "is_playing": media_info is not None and media_info.is_playing
-                if media_info
-                else False,
-            }
+            context = self.template_context(media_info, custom_css, history, members)
 
             # Render and return
-            return template.render(context)
+            with RENDER_SECONDS.labels(name).time():
+                return info.template.render(context)
 
         except Exception as e:
             # Return error SVG if template rendering fails
             return self._render_error_svg(f"Template error: {str(e)}")
 
+    @staticmethod
+    def template_context(
+        media_info: Optional[MediaSnapshot] = None,
+        custom_css: Optional[str] = None,
+        history: Optional[list[dict]] = None,
+        members: Optional[list[dict]] = None,
+    ) -> dict:
+        """Variables every template is rendered with."""
+        return {
+            "media_info": media_info,
+            "custom_css": custom_css or "",
+            "is_playing": bool(media_info and media_info.is_playing),
+            "history": history or [],
+            "members": members or [],
+            # Unix time of the render, for "played 5m ago"
+            "now": time.time(),
+        }
+
     def _render_error_svg(self, error_message: str) -> str:
         """Render an error SVG with the given error message."""
         return f"""
@@ -77,13 +106,10 @@ class Renderer:
             </style>
             <rect width="400" height="120" fill="#2a2a2a" />
             <text x="10" y="30" class="error-text">Error rendering template:</text>
-            <text x="10" y="50" class="error-text">{error_message}</text>
+            <text x="10" y="50" class="error-text">{html.escape(error_message)}</text>
         </svg>
         """
 
     def list_templates(self) -> list:
         """List available templates."""
-        if not self.template_dir.exists():
-            return []
-
-        return [f.stem for f in self.template_dir.glob("*.svg")]
+        return list(self.catalogue)
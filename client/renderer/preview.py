@@ -0,0 +1,423 @@
+"""
+Sandboxed rendering of user-submitted template source.
+
+Editor previews and templates users save server-side are compiled in a
+``SandboxedEnvironment`` and cached by source hash, so re-rendering the same
+source skips compilation whichever user or draft it came from. Output is
+streamed and the render stops once it passes ``timeout`` seconds or
+``max_output_bytes``. Every ``for`` loop, call and filter checks the deadline,
+and sequence multiplication and concatenation, powers, ``%`` and ``format``
+widths and the str methods that pad or expand a string check the size of their
+result before building it, so templates that spin or allocate without emitting
+anything are bounded too. Lists, tuples and dicts are measured by the elements
+of every nested sequence, so nesting shared references can't build a value
+that only explodes once it is stringified, summed or iterated.
+"""
+
+import functools
+import hashlib
+import re
+import string
+import time
+from collections.abc import Iterable
+from contextvars import ContextVar
+from itertools import compress, repeat
+from typing import Any, Callable, Optional
+
+from jinja2 import Template, TemplateError, nodes
+from jinja2.sandbox import SandboxedEnvironment
+from markupsafe import Markup
+
+from ..metrics import RENDER_SECONDS
+from ..utils.lru import LRUCache
+
+# Wall-clock budget for one preview render, in seconds
+DEFAULT_TIMEOUT = 0.5
+
+# Largest rendered preview
+DEFAULT_MAX_OUTPUT_BYTES = 1024 * 1024
+
+# Loop iterations between deadline checks
+_LOOP_CHECK_INTERVAL = 256
+
+# Filter wrapped around every for-loop iterable at compile time
+_LOOP_FILTER = "_preview_loop"
+
+# Filter wrapped around every ``~`` operand at compile time
+_CONCAT_FILTER = "_preview_concat"
+
+# Element copies a ``sum`` of sequences may make, per element of output budget
+_SUM_COPY_FACTOR = 8
+
+# Values measured element by element, nested sequences included
+_CONTAINERS = (list, tuple, set, frozenset, dict)
+_SIZED = frozenset({str, Markup, bytes, range, *_CONTAINERS})
+
+# Conversion fields of printf-style formatting, capturing width and precision
+_PERCENT_FIELD = re.compile(r"%(?:\([^)]*\))?[#0 +-]*(\*|\d+)?(?:\.(\*|\d+))?")
+
+# str methods whose first argument is the width of the result
+_PADDING_METHODS = frozenset({"center", "ljust", "rjust", "zfill"})
+
+_deadline: ContextVar[Optional[float]] = ContextVar("preview_deadline", default=None)
+
+
+class PreviewError(Exception):
+    """A draft that failed to compile or render."""
+
+
+class PreviewLimitExceeded(PreviewError):
+    """A render that ran past its time or output budget."""
+
+
+def _check_deadline() -> None:
+    deadline = _deadline.get()
+    if deadline is not None and time.perf_counter() > deadline:
+        raise PreviewLimitExceeded("Preview took too long to render")
+
+
+def _count_elements(
+    value: Any, limit: int, _counted: Optional[dict] = None
+) -> int:
+    """
+    Count the elements of ``value`` and every sequence nested in it.
+
+    A sequence referenced twice is counted twice, as it is when stringified,
+    but walked once: counts are memoized by identity and summed per reference
+    in C, so the cost follows the distinct objects rather than the expansion.
+    Counts stop at ``limit + 1``, which cyclic values also report.
+    """
+    counted = {} if _counted is None else _counted
+    key = id(value)
+    if key in counted:
+        return counted[key]
+    if isinstance(value, (str, bytes, range)):
+        counted[key] = len(value)
+        return counted[key]
+    if not isinstance(value, _CONTAINERS):
+        return 0
+    counted[key] = limit + 1
+    items = (*value.keys(), *value.values()) if isinstance(value, dict) else value
+    count = len(items)
+    if count <= limit:
+        nested = list(compress(items, map(_SIZED.__contains__, map(type, items))))
+        for child in dict(zip(map(id, nested), nested)).values():
+            if _count_elements(child, limit, counted) > limit:
+                return limit + 1
+        count += sum(map(counted.get, map(id, nested), repeat(0)))
+    counted[key] = min(count, limit + 1)
+    return counted[key]
+
+
+def _checked_loop(iterable):
+    """Iterate while checking the render deadline."""
+    for index, value in enumerate(iterable):
+        if not index % _LOOP_CHECK_INTERVAL:
+            _check_deadline()
+        yield value
+
+
+class _PreviewEnvironment(SandboxedEnvironment):
+    """Sandbox that also enforces the active render's budget."""
+
+    intercepted_binops = frozenset({"*", "**", "%", "+"})
+
+    def __init__(self, max_output_bytes: int):
+        super().__init__(autoescape=True, finalize=self._finalize)
+        self.max_output_bytes = max_output_bytes
+        # lipsum(n) builds all n paragraphs in one call
+        self.globals.pop("lipsum", None)
+        self.filters["format"] = self._guard_format(self.filters["format"])
+        self.filters["sum"] = self._guard_sum(self.filters["sum"])
+        self.filters = {
+            name: self._guard_filter(func) for name, func in self.filters.items()
+        }
+        self.filters[_LOOP_FILTER] = _checked_loop
+        self.filters[_CONCAT_FILTER] = self._finalize
+
+    def compile_checked(self, source: str) -> Template:
+        """
+        Compile ``source`` with every loop iterable deadline-checked and every
+        ``~`` operand size-checked before it is stringified.
+        """
+        ast = self.parse(source)
+        for loop in ast.find_all(nodes.For):
+            loop.iter = nodes.Filter(
+                loop.iter, _LOOP_FILTER, [], [], None, None, lineno=loop.lineno
+            )
+        for concat in ast.find_all(nodes.Concat):
+            concat.nodes = [
+                nodes.Filter(
+                    node, _CONCAT_FILTER, [], [], None, None, lineno=concat.lineno
+                )
+                for node in concat.nodes
+            ]
+        ast.set_environment(self)
+        return self.from_string(ast)
+
+    def _check_elements(self, value: Any, what: str) -> None:
+        """Reject containers holding more nested elements than the budget."""
+        limit = self.max_output_bytes
+        if isinstance(value, _CONTAINERS) and _count_elements(value, limit) > limit:
+            raise PreviewLimitExceeded(f"{what} too large")
+
+    def _finalize(self, value: Any) -> Any:
+        # Runs on every output expression, before it is stringified
+        self._check_elements(value, "Output value")
+        return value
+
+    def _guard_filter(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def guarded(*args, **kwargs):
+            _check_deadline()
+            for value in (*args, *kwargs.values()):
+                if isinstance(value, int) and abs(value) > self.max_output_bytes:
+                    raise PreviewLimitExceeded("Filter argument too large")
+                self._check_elements(value, "Filter argument")
+            result = func(*args, **kwargs)
+            if isinstance(result, str) and len(result) > self.max_output_bytes:
+                raise PreviewLimitExceeded("Filter output too large")
+            return result
+
+        return guarded
+
+    def _guard_format(self, func: Callable) -> Callable:
+        # ``|format`` is printf-style, with the widths in the value
+        @functools.wraps(func)
+        def guarded(value, *args, **kwargs):
+            self._check_percent_format(str(value), kwargs or args)
+            return func(value, *args, **kwargs)
+
+        return guarded
+
+    def _guard_sum(self, func: Callable) -> Callable:
+        # Summing sequences copies the running total once per item
+        @functools.wraps(func)
+        def guarded(environment, iterable, *args, **kwargs):
+            start = args[1] if len(args) > 1 else kwargs.get("start", 0)
+            if isinstance(start, (str, list, tuple)):
+                iterable = list(_checked_loop(iterable))
+                copies = len(iterable) * _count_elements(
+                    iterable, self.max_output_bytes
+                )
+                self._check_size(copies // _SUM_COPY_FACTOR, "Summed sequence")
+            return func(environment, iterable, *args, **kwargs)
+
+        return guarded
+
+    def _check_size(self, size: int, what: str) -> None:
+        if size > self.max_output_bytes:
+            raise PreviewLimitExceeded(f"{what} too large")
+
+    def _check_width(self, digits: str) -> None:
+        # Length first: int() refuses very long digit strings
+        if len(digits) > 9 or int(digits) > self.max_output_bytes:
+            raise PreviewLimitExceeded("Format width too large")
+
+    def _check_dynamic_widths(self, values: Iterable[Any]) -> None:
+        for value in values:
+            if isinstance(value, int):
+                self._check_size(abs(value), "Format width")
+
+    def _check_percent_format(self, fmt: str, values: Any) -> None:
+        """Reject ``fmt % values`` fields wider than the output budget."""
+        if isinstance(values, dict):
+            values = values.values()
+        elif not isinstance(values, tuple):
+            values = (values,)
+        for field in _PERCENT_FIELD.finditer(fmt):
+            for digits in field.groups():
+                if digits == "*":
+                    self._check_dynamic_widths(values)
+                elif digits:
+                    self._check_width(digits)
+
+    def _check_str_format(self, fmt: str, args: tuple, kwargs: dict) -> None:
+        """Reject ``fmt.format(...)`` fields wider than the output budget."""
+        try:
+            fields = list(string.Formatter().parse(fmt))
+        except ValueError:
+            return  # The call itself reports the malformed format
+        for _, _, spec, _ in fields:
+            if not spec:
+                continue
+            if "{" in spec:
+                # Nested fields take the width from the arguments
+                self._check_dynamic_widths((*args, *kwargs.values()))
+            for digits in re.findall(r"\d+", spec):
+                self._check_width(digits)
+
+    def _check_str_method(
+        self, value: str, name: str, args: tuple, kwargs: dict
+    ) -> None:
+        """Bound the result of str methods that can outgrow their inputs."""
+        if name in _PADDING_METHODS:
+            width = args[0] if args else kwargs.get("width")
+            if isinstance(width, int):
+                self._check_size(width, "Padded string")
+        elif name == "expandtabs":
+            tabsize = args[0] if args else kwargs.get("tabsize", 8)
+            if isinstance(tabsize, int):
+                size = len(value) + value.count("\t") * max(tabsize, 0)
+                self._check_size(size, "Expanded string")
+        elif name == "replace" and len(args) >= 2:
+            old, new = args[:2]
+            count = args[2] if len(args) > 2 else kwargs.get("count", -1)
+            if isinstance(old, str) and isinstance(new, str):
+                matches = value.count(old) if old else len(value) + 1
+                if isinstance(count, int) and count >= 0:
+                    matches = min(matches, count)
+                size = len(value) + matches * max(len(new) - len(old), 0)
+                self._check_size(size, "Replaced string")
+        elif name == "join" and args and isinstance(args[0], (list, tuple)):
+            items = args[0]
+            size = len(value) * max(len(items) - 1, 0) + sum(
+                len(item) for item in items if isinstance(item, str)
+            )
+            self._check_size(size, "Joined string")
+
+    def wrap_str_format(self, value: Any) -> Optional[Callable[..., str]]:
+        # str.format is swapped for a sandboxed version on attribute access
+        wrapper = super().wrap_str_format(value)
+        if wrapper is None:
+            return None
+        fmt = value.__self__
+
+        @functools.wraps(wrapper)
+        def checked(*args, **kwargs):
+            mapping = args[0] if value.__name__ == "format_map" and args else {}
+            self._check_str_format(fmt, args, {**kwargs, **mapping})
+            return wrapper(*args, **kwargs)
+
+        return checked
+
+    def call(__self, __context, __obj, *args, **kwargs):  # noqa: N805
+        _check_deadline()
+        owner = getattr(__obj, "__self__", None)
+        # Mutating methods like list.extend can grow their owner in place
+        for value in (owner, *args, *kwargs.values()):
+            __self._check_elements(value, "Call argument")
+        if isinstance(owner, str):
+            __self._check_str_method(owner, __obj.__name__, args, kwargs)
+        return super().call(__context, __obj, *args, **kwargs)
+
+    def call_binop(self, context, operator: str, left: Any, right: Any) -> Any:
+        _check_deadline()
+        limit = self.max_output_bytes
+        if operator == "*":
+            for sequence, count in ((left, right), (right, left)):
+                if (
+                    isinstance(sequence, (str, bytes, list, tuple))
+                    and isinstance(count, int)
+                    and count > 0
+                    and _count_elements(sequence, limit // count) * count > limit
+                ):
+                    raise PreviewLimitExceeded("Repeated sequence too large")
+        elif operator == "+":
+            if (
+                isinstance(left, (str, bytes, list, tuple))
+                and isinstance(right, (str, bytes, list, tuple))
+                and _count_elements(left, limit) + _count_elements(right, limit)
+                > limit
+            ):
+                raise PreviewLimitExceeded("Concatenated sequence too large")
+        elif operator == "%":
+            if isinstance(left, str):
+                self._check_elements(right, "Format argument")
+                self._check_percent_format(left, right)
+        elif (
+            isinstance(left, int)
+            and isinstance(right, int)
+            and right > 0
+            and left.bit_length() * right > self.max_output_bytes * 8
+        ):
+            raise PreviewLimitExceeded("Power too large")
+        return super().call_binop(context, operator, left, right)
+
+
+class PreviewRenderer:
+    """Renders template source in a sandbox, caching compiled templates."""
+
+    def __init__(
+        self,
+        max_templates: int = 64,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+    ):
+        """
+        Initialize the preview renderer.
+
+        Args:
+            max_templates: Compiled templates kept, least recently used evicted
+            timeout: Seconds a single render may take
+            max_output_bytes: Largest output a render may produce
+        """
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.env = _PreviewEnvironment(max_output_bytes)
+        # Values are (template, source size) so the cache reports its footprint
+        self.compiled: LRUCache[tuple[Template, int]] = LRUCache(
+            max_entries=max_templates, sizeof=lambda entry: entry[1]
+        )
+
+    def compile(self, source: str) -> tuple[Template, bool]:
+        """
+        Compile ``source``, reusing a cached template for identical source.
+
+        Returns:
+            The template and whether it came from the cache.
+        """
+        encoded = source.encode("utf-8")
+        key = hashlib.sha256(encoded).digest()
+        entry = self.compiled.get(key)
+        if entry is not None:
+            return entry[0], True
+
+        try:
+            template = self.env.compile_checked(source)
+        except TemplateError as exc:
+            raise PreviewError(f"Template error: {exc}") from exc
+        self.compiled.put(key, (template, len(encoded)))
+        return template, False
+
+    def render(
+        self, source: str, context: dict, label: str = "preview"
+    ) -> tuple[str, bool]:
+        """
+        Render ``source`` with ``context`` within the time and output caps.
+
+        Args:
+            source: Template source
+            context: Template variables
+            label: ``template`` label for the render-time histogram
+
+        Returns:
+            The rendered output and whether the compiled template was cached.
+
+        Raises:
+            PreviewError: The source doesn't compile or fails to render.
+            PreviewLimitExceeded: The render ran past a cap.
+        """
+        template, cached = self.compile(source)
+
+        token = _deadline.set(time.perf_counter() + self.timeout)
+        chunks: list[str] = []
+        size = 0
+        try:
+            with RENDER_SECONDS.labels(label).time():
+                for chunk in template.generate(context):
+                    size += len(chunk.encode("utf-8"))
+                    if size > self.max_output_bytes:
+                        raise PreviewLimitExceeded(
+                            f"Preview output exceeds {self.max_output_bytes} bytes"
+                        )
+                    _check_deadline()
+                    chunks.append(chunk)
+        except PreviewError:
+            raise
+        except Exception as exc:
+            raise PreviewError(f"Template error: {exc}") from exc
+        finally:
+            _deadline.reset(token)
+
+        return "".join(chunks), cached
@@ -0,0 +1,149 @@
+"""
+PNG rasterization of rendered cards, for embeds that don't accept SVG.
+
+resvg (``resvg-py``) is optional: without it ``RASTER_AVAILABLE`` is False
+and ``/now-playing.png`` answers 501. Rasterizing costs tens of milliseconds,
+so results are cached by the caller's key (state fingerprint, template and
+scale) in a byte-bounded LRU. resvg holds the GIL while it renders, so a
+rasterization in a thread would stall the event loop; they run in a small pool
+of worker processes instead, falling back to threads where processes can't be
+started. Concurrent misses for the same key share one rasterization.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from collections.abc import Hashable
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Optional
+
+from ..utils.lru import LRUCache
+
+try:
+    import resvg_py
+
+    RASTER_AVAILABLE = True
+except ImportError:
+    RASTER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Zoom factors accepted for a PNG, relative to the template's declared size
+MIN_SCALE = 0.5
+MAX_SCALE = 4.0
+
+
+class RasterError(Exception):
+    """The SVG could not be rasterized."""
+
+
+def rasterize(svg_content: str, scale: float = 1.0) -> bytes:
+    """Rasterize an SVG document to PNG bytes at ``scale`` times its size."""
+    if not RASTER_AVAILABLE:
+        raise RasterError("resvg-py is not installed")
+    try:
+        return bytes(resvg_py.svg_to_bytes(svg_string=svg_content, zoom=scale))
+    except Exception as exc:
+        # resvg reports most failures as ValueError, but not all of them
+        raise RasterError(f"{type(exc).__name__}: {exc}") from exc
+
+
+class Rasterizer:
+    """Rasterizes cards on a worker pool, once per distinct cache key."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_bytes: int = 32 * 1024 * 1024,
+        max_entries: int = 1024,
+        processes: bool = True,
+    ):
+        """
+        Initialize the rasterizer.
+
+        Args:
+            workers: Processes (or threads) rasterizing concurrently
+            max_bytes: Total size of cached PNGs before the oldest are evicted
+            max_entries: Most PNGs cached regardless of size
+            processes: Rasterize in worker processes rather than threads
+        """
+        self.workers = max(1, workers)
+        self.processes = processes
+        self.cache: LRUCache[bytes] = LRUCache(
+            max_entries=max_entries, max_bytes=max_bytes
+        )
+        self._pool: Optional[Executor] = None
+        self._pending: dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def available(self) -> bool:
+        return RASTER_AVAILABLE
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return the cached PNG for ``key``, if any."""
+        return self.cache.get(key)
+
+    async def render(self, key: Hashable, svg_content: str, scale: float) -> bytes:
+        """Rasterize ``svg_content`` for ``key``, or join one already running."""
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._submit(svg_content, scale)
+            self._pending[key] = pending
+            pending.add_done_callback(lambda done: self._finish(key, done))
+        try:
+            # Shielded so one client disconnecting doesn't cancel the others' PNG
+            return await asyncio.shield(pending)
+        except BrokenExecutor as exc:
+            raise RasterError("Rasterizer worker died") from exc
+
+    def _submit(self, svg_content: str, scale: float) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        try:
+            return loop.run_in_executor(
+                self._executor(), rasterize, svg_content, scale
+            )
+        except BrokenExecutor:
+            # A worker process died; later rasterizations get a fresh pool
+            self._pool = None
+            return loop.run_in_executor(
+                self._executor(), rasterize, svg_content, scale
+            )
+
+    def _executor(self) -> Executor:
+        if self._pool is None and self.processes:
+            try:
+                # Spawned rather than forked: the server process runs threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except (OSError, NotImplementedError) as exc:
+                # e.g. serverless sandboxes without POSIX semaphores
+                logger.warning("Rasterizing in threads instead of processes: %s", exc)
+                self.processes = False
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="raster"
+            )
+        return self._pool
+
+    def _finish(self, key: Hashable, done: asyncio.Future) -> None:
+        if self._pending.get(key) is done:
+            del self._pending[key]
+        if not done.cancelled() and done.exception() is None:
+            self.cache.put(key, done.result())
+
+    def shutdown(self) -> None:
+        """Stop the workers; queued rasterizations are dropped."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -17,11 +17,14 @@ This module provides a small store abstraction with two backends:
 back to in-memory, so nothing breaks locally or without a KV store.
 """
 
+import base64
 import json
 import os
+from collections import deque
+from itertools import islice
 from typing import Any, Optional
 
-import requests
+from .utils.lru import LRUCache
 
 
 class MediaStore:
@@ -32,20 +35,64 @@ class MediaStore:
     def get(self, key: str) -> Optional[dict]:
         raise NotImplementedError
 
+    def get_many(self, keys: list[str]) -> list[Optional[dict]]:
+        """States for several users in one read, in the order asked for."""
+        return [self.get(key) for key in keys]
+
     def set(self, key: str, value: Optional[dict]) -> None:
         raise NotImplementedError
 
     def keys(self) -> list[str]:
         raise NotImplementedError
 
+    # Artwork blobs are content-addressed by ``artwork_hash`` and immutable,
+    # so states reference them instead of embedding base64 copies.
+
+    def get_artwork(self, artwork_hash: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set_artwork(self, artwork_hash: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def has_artwork(self, artwork_hash: str) -> bool:
+        raise NotImplementedError
+
+    # Named card templates saved per user, as {"source": ..., "hash": ...}.
+
+    def get_template(self, user_id: str, name: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def set_template(self, user_id: str, name: str, value: dict) -> None:
+        raise NotImplementedError
+
+    def delete_template(self, user_id: str, name: str) -> bool:
+        raise NotImplementedError
+
+    def list_templates(self, user_id: str) -> list[str]:
+        raise NotImplementedError
+
+    # Play history per user: a ring buffer of compact entries, newest first,
+    # that reference artwork by hash.
+
+    def append_history(self, user_id: str, entry: dict, limit: int) -> None:
+        raise NotImplementedError
+
+    def get_history(self, user_id: str, count: int) -> list[dict]:
+        raise NotImplementedError
+
 
 class InMemoryStore(MediaStore):
     """Process-local store. Not shared across serverless instances."""
 
     backend = "memory"
 
-    def __init__(self) -> None:
+    def __init__(self, max_artwork_bytes: int = 64 * 1024 * 1024) -> None:
         self._data: dict[str, Any] = {}
+        self._artwork: LRUCache[bytes] = LRUCache(
+            max_entries=1024, max_bytes=max_artwork_bytes
+        )
+        self._templates: dict[str, dict[str, dict]] = {}
+        self._history: dict[str, deque] = {}
 
     def get(self, key: str) -> Optional[dict]:
         return self._data.get(key)
@@ -56,6 +103,37 @@ class InMemoryStore(MediaStore):
     def keys(self) -> list[str]:
         return list(self._data.keys())
 
+    def get_artwork(self, artwork_hash: str) -> Optional[bytes]:
+        return self._artwork.get(artwork_hash)
+
+    def set_artwork(self, artwork_hash: str, data: bytes) -> None:
+        self._artwork.put(artwork_hash, data)
+
+    def has_artwork(self, artwork_hash: str) -> bool:
+        return artwork_hash in self._artwork
+
+    def get_template(self, user_id: str, name: str) -> Optional[dict]:
+        return self._templates.get(user_id, {}).get(name)
+
+    def set_template(self, user_id: str, name: str, value: dict) -> None:
+        self._templates.setdefault(user_id, {})[name] = value
+
+    def delete_template(self, user_id: str, name: str) -> bool:
+        return self._templates.get(user_id, {}).pop(name, None) is not None
+
+    def list_templates(self, user_id: str) -> list[str]:
+        return sorted(self._templates.get(user_id, {}))
+
+    def append_history(self, user_id: str, entry: dict, limit: int) -> None:
+        history = self._history.get(user_id)
+        if history is None or history.maxlen != limit:
+            history = deque(islice(history or (), limit), maxlen=limit)
+            self._history[user_id] = history
+        history.appendleft(entry)
+
+    def get_history(self, user_id: str, count: int) -> list[dict]:
+        return list(islice(self._history.get(user_id, ()), count))
+
 
 class RedisStore(MediaStore):
     """Shared store backed by the Upstash / Vercel KV REST API.
@@ -67,14 +145,33 @@ class RedisStore(MediaStore):
 
     backend = "redis"
     PREFIX = "nowplaying:"
+    ARTWORK_PREFIX = "nowplaying-art:"
+    # One hash per user, field per template name
+    TEMPLATE_PREFIX = "nowplaying-templates:"
+    # One list per user, newest entry first, trimmed on every append
+    HISTORY_PREFIX = "nowplaying-history:"
+    # Unreferenced artwork expires on its own; re-uploads refresh the TTL.
+    ARTWORK_TTL = 30 * 24 * 60 * 60
 
     def __init__(self, url: str, token: str, timeout: float = 5.0) -> None:
         self._url = url.rstrip("/")
         self._headers = {"Authorization": f"Bearer {token}"}
         self._timeout = timeout
+        self._http = None
+
+    @property
+    def _session(self):
+        """Keep-alive session reused across commands on a warm instance."""
+        if self._http is None:
+            # Imported on the first command rather than at startup, so even a
+            # deployment with a KV store keeps requests off the cold start
+            import requests
+
+            self._http = requests.Session()
+        return self._http
 
     def _command(self, *args: str) -> Any:
-        resp = requests.post(
+        resp = self._session.post(
             self._url,
             json=list(args),
             headers=self._headers,
@@ -83,8 +180,32 @@ class RedisStore(MediaStore):
         resp.raise_for_status()
         return resp.json().get("result")
 
+    def _pipeline(self, *commands: list[str]) -> list[Any]:
+        """Run several commands in one round trip."""
+        resp = self._session.post(
+            self._url + "/pipeline",
+            json=[list(command) for command in commands],
+            headers=self._headers,
+            timeout=self._timeout,
+        )
+        resp.raise_for_status()
+        replies = resp.json()
+        for reply in replies:
+            if reply.get("error"):
+                raise RuntimeError(reply["error"])
+        return [reply.get("result") for reply in replies]
+
     def get(self, key: str) -> Optional[dict]:
-        raw = self._command("GET", self.PREFIX + key)
+        return self._decode(self._command("GET", self.PREFIX + key))
+
+    def get_many(self, keys: list[str]) -> list[Optional[dict]]:
+        if not keys:
+            return []
+        raw = self._command("MGET", *(self.PREFIX + key for key in keys)) or []
+        return [self._decode(item) for item in raw]
+
+    @staticmethod
+    def _decode(raw: Optional[str]) -> Optional[dict]:
         if not raw:
             return None
         try:
@@ -99,6 +220,59 @@ class RedisStore(MediaStore):
         result = self._command("KEYS", self.PREFIX + "*") or []
         return [k[len(self.PREFIX):] for k in result if k.startswith(self.PREFIX)]
 
+    def get_artwork(self, artwork_hash: str) -> Optional[bytes]:
+        raw = self._command("GET", self.ARTWORK_PREFIX + artwork_hash)
+        if not raw:
+            return None
+        try:
+            return base64.b64decode(raw)
+        except (TypeError, ValueError):
+            return None
+
+    def set_artwork(self, artwork_hash: str, data: bytes) -> None:
+        self._command(
+            "SET",
+            self.ARTWORK_PREFIX + artwork_hash,
+            base64.b64encode(data).decode("ascii"),
+            "EX",
+            str(self.ARTWORK_TTL),
+        )
+
+    def has_artwork(self, artwork_hash: str) -> bool:
+        return bool(self._command("EXISTS", self.ARTWORK_PREFIX + artwork_hash))
+
+    def get_template(self, user_id: str, name: str) -> Optional[dict]:
+        return self._decode(
+            self._command("HGET", self.TEMPLATE_PREFIX + user_id, name)
+        )
+
+    def set_template(self, user_id: str, name: str, value: dict) -> None:
+        self._command("HSET", self.TEMPLATE_PREFIX + user_id, name, json.dumps(value))
+
+    def delete_template(self, user_id: str, name: str) -> bool:
+        return bool(self._command("HDEL", self.TEMPLATE_PREFIX + user_id, name))
+
+    def list_templates(self, user_id: str) -> list[str]:
+        return sorted(self._command("HKEYS", self.TEMPLATE_PREFIX + user_id) or [])
+
+    def append_history(self, user_id: str, entry: dict, limit: int) -> None:
+        key = self.HISTORY_PREFIX + user_id
+        self._pipeline(
+            ["LPUSH", key, json.dumps(entry, separators=(",", ":"))],
+            ["LTRIM", key, "0", str(limit - 1)],
+        )
+
+    def get_history(self, user_id: str, count: int) -> list[dict]:
+        key = self.HISTORY_PREFIX + user_id
+        raw = self._command("LRANGE", key, "0", str(count - 1))
+        entries = []
+        for item in raw or []:
+            try:
+                entries.append(json.loads(item))
+            except (TypeError, ValueError):
+                continue
+        return entries
+
 
 def _kv_credentials() -> tuple[Optional[str], Optional[str]]:
     """Find the KV REST URL + read-write token from the environment.
@@ -1,6 +1,32 @@
+import re
 import struct
 from typing import Optional
 
+# ISO base media file brands (the "ftyp" box) for AVIF and HEIF stills
+_AVIF_BRANDS = {b"avif", b"avis"}
+_HEIC_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx"}
+_HEIF_BRANDS = {b"mif1", b"msf1"}
+
+# JPEG start-of-frame markers, which carry the image dimensions
+_JPEG_SOF_MARKERS = frozenset(
+    {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+)
+# Markers without a length field
+_JPEG_STANDALONE_MARKERS = frozenset({0x01, 0xD8, *range(0xD0, 0xD8)})
+_JPEG_START_OF_SCAN = 0xDA
+_JPEG_END_OF_IMAGE = 0xD9
+_JPEG_FILL = re.compile(rb"\xff+")
+
+# The frame header precedes all entropy-coded data, so it is found within the
+# metadata segments at the start of the file. Beyond these limits the input
+# is treated as not a readable JPEG rather than scanned further.
+JPEG_SCAN_LIMIT = 2 * 1024 * 1024
+JPEG_MAX_SEGMENTS = 1024
+
+# Real "ftyp" boxes list a handful of brands; its declared size is untrusted,
+# so brands past this many bytes are ignored rather than scanned
+FTYP_SCAN_LIMIT = 128
+
 
 def detect_image_mime_type(data: bytes) -> Optional[str]:
     """Detect a common image MIME type from its file signature."""
@@ -14,6 +40,26 @@ def detect_image_mime_type(data: bytes) -> Optional[str]:
         return "image/webp"
     if data.startswith(b"BM"):
         return "image/bmp"
+    if data.startswith((b"II*\x00", b"MM\x00*")):
+        return "image/tiff"
+    if len(data) >= 12 and data[4:8] == b"ftyp":
+        return _detect_heif_family(data)
+    return None
+
+
+def _detect_heif_family(data: bytes) -> Optional[str]:
+    """Classify an ISO-BMFF file by its major and compatible brands."""
+    box_size = int.from_bytes(data[0:4], "big")
+    end = min(len(data), box_size, FTYP_SCAN_LIMIT) if box_size >= 16 else 12
+    brands = {data[8:12]}
+    brands.update(data[offset : offset + 4] for offset in range(16, end - 3, 4))
+
+    if brands & _AVIF_BRANDS:
+        return "image/avif"
+    if brands & _HEIC_BRANDS:
+        return "image/heic"
+    if brands & _HEIF_BRANDS:
+        return "image/heif"
     return None
 
 
@@ -46,49 +92,40 @@ def read_image_dimensions(data: Optional[bytes]) -> Optional[tuple[int, int]]:
 
 
 def _read_jpeg_dimensions(data: bytes) -> Optional[tuple[int, int]]:
-    """Read dimensions from a JPEG start-of-frame segment."""
-    start_of_frame_markers = {
-        0xC0,
-        0xC1,
-        0xC2,
-        0xC3,
-        0xC5,
-        0xC6,
-        0xC7,
-        0xC9,
-        0xCA,
-        0xCB,
-        0xCD,
-        0xCE,
-        0xCF,
-    }
+    """Read dimensions from a JPEG start-of-frame segment.
+
+    Jumps from segment to segment by their lengths; fill bytes and stray data
+    are skipped with ``bytes.find``/regex matching rather than a Python loop,
+    and the walk gives up at the first scan or after a fixed budget, so
+    adversarial input costs at most a few C-level scans.
+    """
+    limit = min(len(data), JPEG_SCAN_LIMIT)
     position = 2
 
-    while position + 8 < len(data):
-        if data[position] != 0xFF:
-            position += 1
-            continue
-
-        while position < len(data) and data[position] == 0xFF:
-            position += 1
-        if position >= len(data):
-            break
+    for _ in range(JPEG_MAX_SEGMENTS):
+        position = data.find(b"\xff", position, limit)
+        if position < 0:
+            return None
+        position = _JPEG_FILL.match(data, position, limit).end()
+        if position >= limit:
+            return None
 
         marker = data[position]
         position += 1
-
-        if marker in {0x01, 0xD8, 0xD9} or 0xD0 <= marker <= 0xD7:
+        if marker == 0x00 or marker in _JPEG_STANDALONE_MARKERS:
+            # Stuffed zero or a marker without payload
             continue
-        if position + 2 > len(data):
-            break
+        if marker in (_JPEG_START_OF_SCAN, _JPEG_END_OF_IMAGE):
+            return None
+        if position + 2 > limit:
+            return None
 
-        segment_length = int.from_bytes(data[position : position + 2], "big")
+        (segment_length,) = struct.unpack_from(">H", data, position)
         if segment_length < 2 or position + segment_length > len(data):
-            break
+            return None
 
-        if marker in start_of_frame_markers and segment_length >= 7:
-            height = int.from_bytes(data[position + 3 : position + 5], "big")
-            width = int.from_bytes(data[position + 5 : position + 7], "big")
+        if marker in _JPEG_SOF_MARKERS and segment_length >= 7:
+            height, width = struct.unpack_from(">HH", data, position + 3)
             if width > 0 and height > 0:
                 return width, height
 
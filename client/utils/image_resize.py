@@ -0,0 +1,91 @@
+"""
+Artwork downscaling for uploads.
+
+Pillow is optional: without it artwork is passed through unchanged.
+"""
+
+import io
+import logging
+from typing import Optional
+
+from .image_metadata import detect_image_mime_type, read_image_dimensions
+from .lru import LRUCache
+
+try:
+    from PIL import Image
+
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Formats every template consumer can display without re-encoding.
+PASSTHROUGH_MIME_TYPES = {"image/jpeg", "image/png", "image/webp"}
+
+
+class ArtworkPreprocessor:
+    """Downscales and re-encodes artwork once per distinct source image."""
+
+    def __init__(self, max_size: int = 512, quality: int = 85, cache_entries: int = 8):
+        """
+        Initialize the preprocessor.
+
+        Args:
+            max_size: Longest allowed edge in pixels; 0 disables processing
+            quality: JPEG quality used when re-encoding
+            cache_entries: Number of recent source images remembered
+        """
+        self.max_size = max_size
+        self.quality = quality
+        self._cache: LRUCache[bytes] = LRUCache(max_entries=cache_entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and PIL_AVAILABLE
+
+    def process(self, data: Optional[bytes]) -> Optional[bytes]:
+        """Return artwork no larger than ``max_size`` on its longest edge."""
+        if not data or not self.enabled or self._fits(data):
+            return data
+
+        # bytes objects cache their hash, and pollers hand back the same
+        # cached artwork object each poll, so this lookup is cheap.
+        processed = self._cache.get(data)
+        if processed is None:
+            processed = self._resize(data)
+            self._cache.put(data, processed)
+        return processed
+
+    def _fits(self, data: bytes) -> bool:
+        """Skip decoding when the header already shows a small, common image."""
+        dimensions = read_image_dimensions(data)
+        return (
+            dimensions is not None
+            and max(dimensions) <= self.max_size
+            and detect_image_mime_type(data) in PASSTHROUGH_MIME_TYPES
+        )
+
+    def _resize(self, data: bytes) -> bytes:
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                # Lets the JPEG decoder scale by 1/2..1/8 while decoding.
+                image.draft("RGB", (self.max_size, self.max_size))
+                image.thumbnail((self.max_size, self.max_size), Image.LANCZOS)
+
+                has_alpha = image.mode in ("RGBA", "LA") or (
+                    image.mode == "P" and "transparency" in image.info
+                )
+                output = io.BytesIO()
+                if has_alpha:
+                    image.save(output, format="PNG", optimize=True)
+                else:
+                    image.convert("RGB").save(
+                        output, format="JPEG", quality=self.quality, optimize=True
+                    )
+        except Exception as e:
+            logger.warning(f"Artwork resize failed, sending original: {e}")
+            return data
+
+        resized = output.getvalue()
+        return resized if len(resized) < len(data) else data
@@ -0,0 +1,95 @@
+"""
+Lightweight timing spans for breaking down where a request spends time.
+
+``collect()`` starts a ``Timings`` for the current task; code anywhere below
+it wraps work in ``span("name")`` without the timings being passed around.
+Outside ``collect()`` a span costs one context-variable lookup.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, TypeVar
+
+T = TypeVar("T")
+
+_current: ContextVar[Optional["Timings"]] = ContextVar("timings", default=None)
+
+
+class Timings:
+    """Accumulated durations of named spans, in first-seen order."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.spans: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Format as a ``Server-Timing`` header value, durations in ms."""
+        entries = [
+            f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items()
+        ]
+        entries.append(f"total;dur={self.total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def collect() -> Iterator[Timings]:
+    """Collect spans recorded by the current task into a new ``Timings``."""
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block into the active ``Timings``, if any."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    with timings.span(name):
+        yield
+
+
+async def profile(awaitable: Awaitable[T], limit: int = 40) -> tuple[T, str]:
+    """
+    Await ``awaitable`` under cProfile.
+
+    The profiler sees everything the event loop runs meanwhile, so other
+    requests served concurrently show up too.
+
+    Returns:
+        The result and a ``pstats`` report sorted by cumulative time.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = await awaitable
+    finally:
+        profiler.disable()
+
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(limit)
+    return result, report.getvalue()
@@ -44,10 +44,26 @@ class Config:
             int(os.getenv("PORT", "8000")))
         config["server"].setdefault("template_dir", 
             os.getenv("TEMPLATE_DIR", ""))
+        config["server"].setdefault("template_reload", 
+            os.getenv("NOW_PLAYING_TEMPLATE_RELOAD", "false").lower() == "true")
         config["server"].setdefault("enable_album_art", 
             os.getenv("ENABLE_ALBUM_ART", "true").lower() == "true")
         config["server"].setdefault("exclude_browsers", 
             os.getenv("EXCLUDE_BROWSERS", "false").lower() == "true")
+        config["server"].setdefault("replay_trace", 
+            os.getenv("NOW_PLAYING_REPLAY_TRACE", ""))
+        config["server"].setdefault("replay_speed", 
+            float(os.getenv("NOW_PLAYING_REPLAY_SPEED", "1.0")))
+        config["server"].setdefault("profiling", 
+            os.getenv("NOW_PLAYING_PROFILING", "false").lower() == "true")
+        config["server"].setdefault("history_size", 
+            int(os.getenv("NOW_PLAYING_HISTORY_SIZE", "50")))
+        config["server"].setdefault("png_scale", 
+            float(os.getenv("NOW_PLAYING_PNG_SCALE", "2.0")))
+        config["server"].setdefault("png_workers", 
+            int(os.getenv("NOW_PLAYING_PNG_WORKERS", "2")))
+        config["server"].setdefault("png_cache_mb", 
+            int(os.getenv("NOW_PLAYING_PNG_CACHE_MB", "32")))
         
         # Client configuration (for public deployment)
         config.setdefault("client", {})
@@ -59,6 +75,18 @@ class Config:
             int(os.getenv("NOW_PLAYING_CLIENT_POLL_INTERVAL", "10")))
         config["client"].setdefault("template", 
             os.getenv("NOW_PLAYING_TEMPLATE", "turntable"))
+        config["client"].setdefault("transport", 
+            os.getenv("NOW_PLAYING_CLIENT_TRANSPORT", "auto"))
+        config["client"].setdefault("artwork_max_size", 
+            int(os.getenv("NOW_PLAYING_CLIENT_ARTWORK_MAX_SIZE", "512")))
+        config["client"].setdefault("artwork_quality", 
+            int(os.getenv("NOW_PLAYING_CLIENT_ARTWORK_QUALITY", "85")))
+        config["client"].setdefault("spool_dir", 
+            os.getenv("NOW_PLAYING_CLIENT_SPOOL_DIR", ""))
+        config["client"].setdefault("spool_max_bytes", 
+            int(os.getenv("NOW_PLAYING_CLIENT_SPOOL_MAX_BYTES", str(20 * 1024 * 1024))))
+        config["client"].setdefault("targets", 
+            json.loads(os.getenv("NOW_PLAYING_CLIENT_TARGETS", "[]")))
         
         return config
     
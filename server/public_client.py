@@ -12,21 +12,85 @@ import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
-
-import requests
+from urllib.parse import urlencode
 
 # Add the now_playing package to the path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from client.models import MediaInfo
+from client.models import MediaSnapshot, as_snapshot
 from client.poller.factory import create_poller
+from client.utils.image_resize import ArtworkPreprocessor
 from config import get_config
+from server.spool import UpdateSpool, default_spool_dir
+from server.transport import Backoff, TransportError, UpdateTransport
+
+
+class UploadTarget:
+    """One server the client pushes updates to."""
+
+    def __init__(
+        self,
+        server_url: str,
+        api_key: str,
+        user_id: Optional[str] = None,
+        template: Optional[str] = None,
+        name: Optional[str] = None,
+        transport: str = "auto",
+    ):
+        """
+        Initialize the target.
+
+        Args:
+            server_url: URL of the public server
+            api_key: API key for authentication
+            user_id: Optional user ID the updates are stored under
+            template: Template used for the card URL shown at startup
+            name: Label used in logs and as the spool key
+            transport: "auto" (WebSocket with HTTP fallback), "websocket" or "http"
+        """
+        self.server_url = server_url.rstrip("/")
+        self.api_key = api_key
+        self.user_id = user_id
+        self.template = template
+        self.name = name or (
+            f"{self.server_url}#{user_id}" if user_id else self.server_url
+        )
+        self.transport = UpdateTransport(
+            self.server_url, api_key, user_id=user_id, mode=transport
+        )
+        # Per target, so an unreachable server is skipped while backing off
+        # instead of holding up delivery to the others.
+        self.backoff = Backoff(initial=2.0, maximum=60.0)
+
+    @property
+    def card_url(self) -> str:
+        params = {}
+        if self.user_id:
+            params["user_id"] = self.user_id
+        if self.template:
+            params["template"] = self.template
+        query = f"?{urlencode(params)}" if params else ""
+        return f"{self.server_url}/now-playing.svg{query}"
 
 
 class PublicClient:
     """Client for sending media information to a public server."""
 
-    def __init__(self, server_url: str, api_key: str, poll_interval: int = 5, exclude_browsers: bool = False):
+    def __init__(
+        self,
+        server_url: str,
+        api_key: str,
+        poll_interval: int = 5,
+        exclude_browsers: bool = False,
+        replay_trace: Optional[str] = None,
+        replay_speed: float = 1.0,
+        transport: str = "auto",
+        artwork_max_size: int = 512,
+        artwork_quality: int = 85,
+        spool_dir: Optional[str] = None,
+        spool_max_bytes: int = 20 * 1024 * 1024,
+        targets: Optional[list[dict[str, Any]]] = None,
+    ):
         """
         Initialize the public client.
 
@@ -35,95 +99,199 @@ class PublicClient:
             api_key: API key for authentication
             poll_interval: Seconds between polling attempts
             exclude_browsers: Whether to exclude browser media sources
+            replay_trace: Replay a recorded trace instead of a real player
+            replay_speed: Playback speed multiplier for ``replay_trace``
+            transport: "auto" (WebSocket with HTTP fallback), "websocket" or "http"
+            artwork_max_size: Downscale artwork to this many pixels on its
+                longest edge before upload (0 sends it unchanged)
+            artwork_quality: JPEG quality for re-encoded artwork
+            spool_dir: Directory for updates queued while the server is
+                unreachable (defaults to ~/.now-playing/spool)
+            spool_max_bytes: Disk budget for queued updates
+            targets: Servers to push to, each a dict with ``server_url``,
+                ``api_key`` and optional ``user_id``, ``template``, ``name``
+                and ``transport``. Defaults to ``server_url``/``api_key``.
         """
         self.server_url = server_url.rstrip("/")
         self.api_key = api_key
         self.poll_interval = poll_interval
-        self.poller = create_poller(exclude_browsers=exclude_browsers)
+        if targets:
+            self.targets = [
+                UploadTarget(**dict({"transport": transport}, **target))
+                for target in targets
+            ]
+        else:
+            self.targets = [
+                UploadTarget(
+                    self.server_url, api_key, name="default", transport=transport
+                )
+            ]
+        self.artwork = ArtworkPreprocessor(artwork_max_size, artwork_quality)
+        self.spool = UpdateSpool(spool_dir or default_spool_dir(), spool_max_bytes)
+        self.poller = create_poller(
+            exclude_browsers=exclude_browsers,
+            replay_trace=replay_trace,
+            replay_speed=replay_speed,
+        )
 
         if not self.poller:
             raise RuntimeError("No supported media poller found for this platform")
 
-    async def get_media_info(self) -> Optional[MediaInfo]:
-        """Get current media information."""
+    async def get_media_info(self) -> Optional[MediaSnapshot]:
+        """Get current media information, with artwork prepared for upload."""
         try:
-            return await self.poller.get_media_info()
+            media_info = as_snapshot(await self.poller.get_media_info())
         except Exception as e:
             print(f"Error getting media info: {e}")
             return None
 
-    def send_media_info(self, media_info: Optional[MediaInfo]) -> bool:
+        if media_info and media_info.album_art and self.artwork.enabled:
+            album_art = self.artwork.process(media_info.album_art)
+            if album_art is not media_info.album_art:
+                media_info = media_info.replace(album_art=album_art)
+        return media_info
+
+    async def send_media_info(self, media_info: Optional[MediaSnapshot]) -> bool:
         """
-        Send media information to the public server.
+        Send media information to every target concurrently.
+
+        Updates that can't be delivered to a target are queued in the spool
+        under that target's name (replacing any older pending state) and
+        retried by ``drain_spool``.
 
         Args:
             media_info: Media information to send, or None if nothing is playing
 
         Returns:
-            True if successful, False otherwise
+            True if delivered to all targets now, False if any were queued
+        """
+        # Artwork is referenced by hash; bytes follow only if the server lacks them
+        if media_info:
+            data = media_info.to_dict(include_album_art=False)
+            album_art = media_info.album_art
+        else:
+            data = None
+            album_art = None
+        payload = {"media_info": data}
+
+        results = await asyncio.gather(
+            *(self._send_to(target, payload, album_art) for target in self.targets)
+        )
+        return all(results)
+
+    async def drain_spool(self) -> bool:
+        """
+        Deliver queued updates to every target, each backing off while offline.
+
+        Returns:
+            True if the spool is now empty
         """
+        await asyncio.gather(*(self._drain(target) for target in self.targets))
+        return not self.spool.has_pending()
+
+    async def _send_to(
+        self, target: UploadTarget, payload: dict, album_art: Optional[bytes]
+    ) -> bool:
+        # Older queued updates go first, so this one waits behind them.
+        if self.spool.has_pending(target.name):
+            self.spool.put(target.name, payload, album_art)
+            return await self._drain(target)
+
+        if await self._deliver(target, payload, album_art):
+            return True
+
+        self.spool.put(target.name, payload, album_art)
+        delay = target.backoff.failure()
+        print(
+            f"[{datetime.now().strftime('%H:%M:%S')}] 💾 Queued update for "
+            f"{target.name}, retrying in {delay:.0f}s"
+        )
+        return False
+
+    async def _drain(self, target: UploadTarget) -> bool:
+        if not target.backoff.ready():
+            return False
+
+        for entry in self.spool.pending(target.name):
+            if not await self._deliver(
+                target, entry["payload"], self.spool.artwork(entry)
+            ):
+                target.backoff.failure()
+                return False
+            self.spool.remove(entry)
+
+        target.backoff.success()
+        return not self.spool.has_pending(target.name)
+
+    async def _deliver(
+        self, target: UploadTarget, payload: dict, album_art: Optional[bytes]
+    ) -> bool:
+        """Send one update, uploading its artwork if the server asks for it."""
+        media_data = payload.get("media_info")
         try:
-            # Prepare data for JSON serialization
-            if media_info:
-                data = media_info.to_dict()
-            else:
-                data = None
-
-            # Send POST request to server
-            response = requests.post(
-                f"{self.server_url}/api/v1/update",
-                json={"media_info": data},
-                params={"api_key": self.api_key},
-                timeout=10,
-            )
-            print(response.status_code, response.text)
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("status") == "updated":
-                    title = media_info.title if media_info else "No media"
-                    print(
-                        f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Updated: {title}"
-                    )
-                    return True
-                else:
-                    print(
-                        f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Server error: {result}"
-                    )
-                    return False
+            result = await target.transport.send(payload)
+            if result.get("artwork") == "missing" and album_art:
+                await target.transport.upload_artwork(
+                    media_data["album_art_hash"], album_art
+                )
+                print(
+                    f"[{datetime.now().strftime('%H:%M:%S')}] 🖼️ Uploaded artwork "
+                    f"to {target.name} ({len(album_art) // 1024} KB)"
+                )
+
+            if result.get("status") == "updated":
+                title = media_data.get("title") if media_data else "No media"
+                print(
+                    f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Updated "
+                    f"{target.name}: {title}"
+                )
+                return True
             else:
                 print(
-                    f"[{datetime.now().strftime('%H:%M:%S')}] ❌ HTTP error: {response.status_code}"
+                    f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Server error from "
+                    f"{target.name}: {result}"
                 )
                 return False
 
-        except requests.RequestException as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Network error: {e}")
+        except TransportError as e:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ {target.name}: {e}")
             return False
         except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Unexpected error: {e}")
+            print(
+                f"[{datetime.now().strftime('%H:%M:%S')}] ❌ {target.name}: "
+                f"Unexpected error: {e}"
+            )
             return False
 
     async def run(self):
         """Main client loop."""
         print("Starting Now Playing client...")
-        print(f"Server: {self.server_url}")
+        for target in self.targets:
+            print(f"Server: {target.server_url} ({target.card_url})")
         print(f"Poll interval: {self.poll_interval} seconds")
         print(f"Poller: {type(self.poller).__name__}")
         print("Press Ctrl+C to stop")
         print("-" * 50)
 
         last_media_info = None
+        # Updates left in the spool by a previous run are superseded by
+        # whatever is playing now.
+        resume_spool = self.spool.has_pending()
 
         try:
             while True:
                 # Get current media info
                 current_media_info = await self.get_media_info()
 
-                # Only send if media info changed
-                if self._media_info_changed(last_media_info, current_media_info):
-                    success = self.send_media_info(current_media_info)
-                    if success:
-                        last_media_info = current_media_info
+                # Only send if media info changed; failed sends are spooled
+                if resume_spool or self._media_info_changed(
+                    last_media_info, current_media_info
+                ):
+                    resume_spool = False
+                    await self.send_media_info(current_media_info)
+                    last_media_info = current_media_info
+                elif self.spool.has_pending():
+                    await self.drain_spool()
 
                 # Wait before next poll
                 await asyncio.sleep(self.poll_interval)
@@ -133,22 +301,19 @@ class PublicClient:
         except Exception as e:
             print(f"Fatal error: {e}")
             sys.exit(1)
+        finally:
+            await asyncio.gather(*(target.transport.close() for target in self.targets))
 
     def _media_info_changed(
-        self, old: Optional[MediaInfo], new: Optional[MediaInfo]
+        self, old: Optional[MediaSnapshot], new: Optional[MediaSnapshot]
     ) -> bool:
-        """Check if media info has changed."""
+        """Check if media info has changed, counting seeks but not progress."""
         if old is None and new is None:
             return False
         if old is None or new is None:
             return True
 
-        return (
-            old.title != new.title
-            or old.artist != new.artist
-            or old.album != new.album
-            or old.is_playing != new.is_playing
-        )
+        return old.fingerprint != new.fingerprint
 
 
 def load_config() -> dict[str, Any]:
@@ -166,12 +331,18 @@ def main():
         # 从服务器配置获取 exclude_browsers 设置
         exclude_browsers = config_manager.get("server.exclude_browsers", False)
 
+        targets = config.get("targets") or None
+        for target in targets or []:
+            if not target.get("server_url") or not target.get("api_key"):
+                print("Error: every client target needs a server_url and api_key")
+                sys.exit(1)
+
         # Validate configuration
-        if not config.get("server_url"):
+        if not targets and not config.get("server_url"):
             print("Error: SERVER_URL not configured")
             sys.exit(1)
 
-        if not config.get("api_key"):
+        if not targets and not config.get("api_key"):
             print("Error: API_KEY not configured")
             sys.exit(1)
 
@@ -181,6 +352,14 @@ def main():
             api_key=config["api_key"],
             poll_interval=config["poll_interval"],
             exclude_browsers=exclude_browsers,
+            replay_trace=config_manager.get("server.replay_trace") or None,
+            replay_speed=config_manager.get("server.replay_speed", 1.0),
+            transport=config.get("transport", "auto"),
+            artwork_max_size=config.get("artwork_max_size", 512),
+            artwork_quality=config.get("artwork_quality", 85),
+            spool_dir=config.get("spool_dir") or None,
+            spool_max_bytes=config.get("spool_max_bytes", 20 * 1024 * 1024),
+            targets=targets,
         )
 
         print(f"Browser filtering: {'Enabled' if exclude_browsers else 'Disabled'}")
@@ -0,0 +1,144 @@
+"""
+On-disk spool of updates the public client could not deliver.
+
+Only the latest state per user is kept: queuing a newer update replaces the
+pending one, so a laptop that was offline for an hour uploads one state, not
+hundreds. Artwork referenced by pending updates is stored alongside, once per
+hash, so it can still be uploaded after a restart. Total disk usage is capped;
+artwork is dropped before states when over budget.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional, Union
+from urllib.parse import quote
+
+
+class UpdateSpool:
+    """Coalescing, size-capped queue of pending updates per user."""
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 20 * 1024 * 1024):
+        """
+        Initialize the spool.
+
+        Args:
+            directory: Directory that holds pending updates
+            max_bytes: Upper bound on the spool's total size on disk
+        """
+        self.directory = Path(directory)
+        self.artwork_dir = self.directory / "artwork"
+        self.max_bytes = max_bytes
+        self.artwork_dir.mkdir(parents=True, exist_ok=True)
+
+    def put(self, key: str, payload: dict, album_art: Optional[bytes] = None) -> dict:
+        """Queue an update for ``key``, replacing any pending one."""
+        art_hash = None
+        media_info = payload.get("media_info") or {}
+        if album_art and media_info.get("album_art_hash"):
+            art_hash = media_info["album_art_hash"]
+            art_path = self.artwork_dir / f"{art_hash}.bin"
+            if not art_path.exists():
+                self._write(art_path, album_art)
+
+        entry = {
+            "key": key,
+            "payload": payload,
+            "artwork_hash": art_hash,
+            "queued_at": time.time(),
+        }
+        self._write(self._entry_path(key), json.dumps(entry).encode("utf-8"))
+        self._remove_unreferenced_artwork()
+        self._enforce_limit()
+        return entry
+
+    def pending(self, key: Optional[str] = None) -> list[dict]:
+        """Pending updates (only ``key``'s if given), oldest first."""
+        if key is not None:
+            paths = [self._entry_path(key)]
+        else:
+            paths = list(self.directory.glob("*.json"))
+        entries = []
+        for path in paths:
+            try:
+                entries.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                path.unlink(missing_ok=True)
+        return sorted(entries, key=lambda entry: entry["queued_at"])
+
+    def has_pending(self, key: Optional[str] = None) -> bool:
+        if key is not None:
+            return self._entry_path(key).exists()
+        return any(self.directory.glob("*.json"))
+
+    def artwork(self, entry: dict) -> Optional[bytes]:
+        """Artwork bytes saved with an entry, if still on disk."""
+        if not entry.get("artwork_hash"):
+            return None
+        try:
+            return (self.artwork_dir / f"{entry['artwork_hash']}.bin").read_bytes()
+        except OSError:
+            return None
+
+    def remove(self, entry: dict) -> bool:
+        """
+        Remove a delivered entry unless a newer update replaced it meanwhile.
+
+        Returns:
+            True if the entry was removed.
+        """
+        path = self._entry_path(entry["key"])
+        try:
+            current = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if current.get("queued_at") != entry["queued_at"]:
+            return False
+
+        path.unlink(missing_ok=True)
+        self._remove_unreferenced_artwork()
+        return True
+
+    def size(self) -> int:
+        """Total bytes used by the spool."""
+        return sum(path.stat().st_size for path in self._files())
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{quote(key, safe='')}.json"
+
+    def _files(self) -> list[Path]:
+        return [*self.directory.glob("*.json"), *self.artwork_dir.glob("*.bin")]
+
+    def _write(self, path: Path, data: bytes) -> None:
+        """Write atomically so a crash never leaves a torn entry."""
+        temp = path.with_name(path.name + ".tmp")
+        temp.write_bytes(data)
+        os.replace(temp, path)
+
+    def _referenced_artwork(self) -> set[str]:
+        return {entry["artwork_hash"] for entry in self.pending() if entry["artwork_hash"]}
+
+    def _remove_unreferenced_artwork(self) -> None:
+        referenced = self._referenced_artwork()
+        for path in self.artwork_dir.glob("*.bin"):
+            if path.stem not in referenced:
+                path.unlink(missing_ok=True)
+
+    def _enforce_limit(self) -> None:
+        # Drop artwork of the oldest updates first, then the updates themselves.
+        artwork = sorted(self.artwork_dir.glob("*.bin"), key=lambda p: p.stat().st_mtime)
+        for path in artwork:
+            if self.size() <= self.max_bytes:
+                return
+            path.unlink(missing_ok=True)
+
+        for entry in self.pending():
+            if self.size() <= self.max_bytes:
+                return
+            self._entry_path(entry["key"]).unlink(missing_ok=True)
+
+
+def default_spool_dir() -> Path:
+    """Per-user spool location used when none is configured."""
+    return Path.home() / ".now-playing" / "spool"
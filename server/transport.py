@@ -0,0 +1,252 @@
+"""
+Upload transports used by the public client.
+
+``UpdateTransport`` keeps a persistent WebSocket to ``/api/v1/ws`` and sends
+each update as a small JSON frame. When the socket can't be opened (e.g. on
+serverless hosts that don't support WebSockets) it falls back to HTTP POSTs
+to ``/api/v1/update`` over a keep-alive ``requests.Session``, run off the
+event loop so polling never blocks. Reconnects use exponential backoff.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+import requests
+
+try:
+    import websockets
+
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+TRANSPORT_MODES = ("auto", "websocket", "http")
+
+
+class TransportError(Exception):
+    """Raised when an update could not be delivered."""
+
+
+class Backoff:
+    """Exponential backoff schedule with an upper bound."""
+
+    def __init__(self, initial: float = 1.0, maximum: float = 300.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.failures = 0
+        self.ready_at = 0.0
+
+    @property
+    def delay(self) -> float:
+        if not self.failures:
+            return 0.0
+        return min(self.initial * (2 ** (self.failures - 1)), self.maximum)
+
+    def ready(self) -> bool:
+        return time.monotonic() >= self.ready_at
+
+    def failure(self) -> float:
+        self.failures += 1
+        self.ready_at = time.monotonic() + self.delay
+        return self.delay
+
+    def success(self) -> None:
+        self.failures = 0
+        self.ready_at = 0.0
+
+
+class UpdateTransport:
+    """Delivers update payloads over WebSocket with HTTP fallback."""
+
+    def __init__(
+        self,
+        server_url: str,
+        api_key: str,
+        user_id: Optional[str] = None,
+        mode: str = "auto",
+        timeout: float = 10.0,
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            server_url: Base URL of the public server
+            api_key: API key for authentication
+            user_id: Optional user ID the updates are stored under
+            mode: "auto" (WebSocket, falling back to HTTP), "websocket" or "http"
+            timeout: Seconds to wait for a connection or acknowledgement
+        """
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f"Unknown transport mode: {mode}")
+
+        self.server_url = server_url.rstrip("/")
+        self.api_key = api_key
+        self.user_id = user_id
+        self.mode = mode
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.ws_backoff = Backoff()
+        self._ws: Any = None
+        self._seq = 0
+
+    @property
+    def params(self) -> dict[str, str]:
+        params = {"api_key": self.api_key}
+        if self.user_id:
+            params["user_id"] = self.user_id
+        return params
+
+    @property
+    def websocket_url(self) -> str:
+        base = self.server_url.replace("https://", "wss://", 1).replace(
+            "http://", "ws://", 1
+        )
+        return f"{base}/api/v1/ws?{urlencode(self.params)}"
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    def _use_websocket(self) -> bool:
+        return self.mode != "http" and WEBSOCKETS_AVAILABLE
+
+    async def send(self, payload: dict) -> dict:
+        """
+        Deliver an update payload and return the server's response body.
+
+        Raises:
+            TransportError: If neither transport delivered the update.
+        """
+        if self._use_websocket() and (self.connected or self.ws_backoff.ready()):
+            try:
+                return await self._send_websocket(payload)
+            except TransportError:
+                if self.mode == "websocket":
+                    raise
+
+        if self.mode == "websocket":
+            raise TransportError("WebSocket unavailable, retrying later")
+        return await self._send_http(payload)
+
+    async def upload_artwork(self, art_hash: str, data: bytes) -> dict:
+        """
+        Upload raw artwork bytes the server reported as missing.
+
+        Uses a binary frame on an open WebSocket, otherwise an HTTP PUT with
+        an ``application/octet-stream`` body.
+
+        Raises:
+            TransportError: If the upload failed.
+        """
+        if self.connected:
+            try:
+                return await self._upload_websocket(art_hash, data)
+            except TransportError:
+                if self.mode == "websocket":
+                    raise
+
+        if self.mode == "websocket":
+            raise TransportError("WebSocket unavailable, retrying later")
+
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(
+                None, self._put_artwork, art_hash, data
+            )
+        except requests.RequestException as e:
+            raise TransportError(f"Network error: {e}") from e
+
+        if response.status_code != 200:
+            raise TransportError(f"HTTP error: {response.status_code}")
+        return response.json()
+
+    async def close(self) -> None:
+        """Close the WebSocket and the HTTP session."""
+        await self._drop_websocket()
+        self.session.close()
+
+    async def _send_websocket(self, payload: dict) -> dict:
+        if self._ws is None:
+            try:
+                self._ws = await asyncio.wait_for(
+                    websockets.connect(self.websocket_url, max_size=2**20),
+                    self.timeout,
+                )
+            except Exception as e:
+                delay = self.ws_backoff.failure()
+                raise TransportError(
+                    f"WebSocket connect failed ({e}); retrying in {delay:.0f}s"
+                ) from e
+
+        self._seq += 1
+        frame = dict(payload, seq=self._seq)
+        try:
+            await self._ws.send(json.dumps(frame))
+            while True:
+                reply = json.loads(await asyncio.wait_for(self._ws.recv(), self.timeout))
+                if reply.get("seq") == self._seq:
+                    break
+        except Exception as e:
+            await self._drop_websocket()
+            self.ws_backoff.failure()
+            raise TransportError(f"WebSocket send failed: {e}") from e
+
+        self.ws_backoff.success()
+        if reply.get("status") == "error":
+            raise TransportError(f"Server error: {reply.get('detail')}")
+        return reply
+
+    async def _upload_websocket(self, art_hash: str, data: bytes) -> dict:
+        try:
+            await self._ws.send(data)
+            while True:
+                reply = json.loads(await asyncio.wait_for(self._ws.recv(), self.timeout))
+                if reply.get("hash") == art_hash or reply.get("status") == "error":
+                    break
+        except Exception as e:
+            await self._drop_websocket()
+            raise TransportError(f"WebSocket upload failed: {e}") from e
+
+        if reply.get("status") == "error":
+            raise TransportError(f"Server error: {reply.get('detail')}")
+        return reply
+
+    async def _drop_websocket(self) -> None:
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            try:
+                await ws.close()
+            except Exception:
+                pass
+
+    async def _send_http(self, payload: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(None, self._post, payload)
+        except requests.RequestException as e:
+            raise TransportError(f"Network error: {e}") from e
+
+        if response.status_code != 200:
+            raise TransportError(f"HTTP error: {response.status_code}")
+        return response.json()
+
+    def _put_artwork(self, art_hash: str, data: bytes) -> requests.Response:
+        return self.session.put(
+            f"{self.server_url}/api/v1/artwork/{art_hash}",
+            data=data,
+            params={"api_key": self.api_key},
+            headers={"Content-Type": "application/octet-stream"},
+            timeout=self.timeout,
+        )
+
+    def _post(self, payload: dict) -> requests.Response:
+        return self.session.post(
+            f"{self.server_url}/api/v1/update",
+            json=payload,
+            params=self.params,
+            timeout=self.timeout,
+        )
@@ -0,0 +1,5 @@
+import os
+
+# client.main builds its app at import time; build it as a public deployment
+# does, so the ingest routes exist. Local-mode tests switch PUBLIC_MODE back.
+os.environ.setdefault("PUBLIC_MODE", "true")
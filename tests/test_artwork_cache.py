@@ -0,0 +1,83 @@
+import asyncio
+import base64
+import json
+import subprocess
+
+from client.poller import macos
+from client.poller.artwork_cache import ArtworkCache, artwork_key
+
+
+def test_evicts_least_recently_used_by_entry_count() -> None:
+    cache = ArtworkCache(max_entries=2, max_bytes=1024)
+    first = artwork_key("A", "Artist", "Album")
+    second = artwork_key("B", "Artist", "Album")
+    third = artwork_key("C", "Artist", "Album")
+
+    cache.put(first, b"1")
+    cache.put(second, b"2")
+    assert cache.get(first) == b"1"
+    cache.put(third, b"3")
+
+    assert first in cache
+    assert second not in cache
+    assert third in cache
+
+
+def test_evicts_by_total_bytes_and_skips_oversized_art() -> None:
+    cache = ArtworkCache(max_entries=10, max_bytes=10)
+
+    cache.put(artwork_key("A", None, None), b"x" * 6)
+    cache.put(artwork_key("B", None, None), b"y" * 6)
+    cache.put(artwork_key("C", None, None), b"z" * 11)
+
+    assert len(cache) == 1
+    assert cache.total_bytes == 6
+    assert cache.get(artwork_key("B", None, None)) == b"y" * 6
+
+
+def test_source_identity_is_part_of_the_key() -> None:
+    cache = ArtworkCache()
+    cache.put(artwork_key("A", "B", "C", source="spotify"), b"art")
+
+    assert cache.get(artwork_key("A", "B", "C", source="music")) is None
+    assert cache.get(artwork_key("A", "B", "C", source="spotify")) == b"art"
+
+
+def test_missing_artwork_is_not_cached() -> None:
+    cache = ArtworkCache()
+    cache.put(artwork_key("A", "B", "C"), None)
+
+    assert len(cache) == 0
+
+
+def test_macos_poller_decodes_artwork_once_per_track(monkeypatch) -> None:
+    payload = {
+        "title": "Track",
+        "artist": "Artist",
+        "album": "Album",
+        "playing": True,
+        "bundleIdentifier": "com.apple.Music",
+        "artworkData": base64.b64encode(b"\x89PNG artwork").decode(),
+        "artworkMimeType": "image/png",
+    }
+    monkeypatch.setattr(
+        macos.subprocess,
+        "run",
+        lambda *args, **kwargs: subprocess.CompletedProcess(
+            args, 0, stdout=json.dumps(payload)
+        ),
+    )
+    decoded: list[str] = []
+    real_decode = macos.base64.b64decode
+    monkeypatch.setattr(
+        macos.base64,
+        "b64decode",
+        lambda data: decoded.append(data) or real_decode(data),
+    )
+    poller = macos.MacosMediaPoller(artwork=ArtworkCache())
+
+    first = asyncio.run(poller._get_enhanced_media_info())
+    second = asyncio.run(poller._get_enhanced_media_info())
+
+    assert first.album_art == second.album_art == b"\x89PNG artwork"
+    assert len(decoded) == 1
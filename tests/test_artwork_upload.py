@@ -0,0 +1,116 @@
+import base64
+import struct
+
+import pytest
+from fastapi.testclient import TestClient
+
+from client import main
+from client.models import MediaInfo, artwork_hash
+from client.store import InMemoryStore
+
+
+def png_header(width: int, height: int) -> bytes:
+    return b"\x89PNG\r\n\x1a\n" + b"\x00" * 8 + struct.pack(">II", width, height)
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> InMemoryStore:
+    store = InMemoryStore()
+    monkeypatch.setattr(main, "PUBLIC_MODE", True)
+    monkeypatch.setattr(main.app_state, "store", store)
+    main.app_state.artwork_blobs.clear()
+    return store
+
+
+def test_upload_dict_references_artwork_by_hash() -> None:
+    art = png_header(64, 64)
+    data = MediaInfo(title="A", album_art=art).to_dict(include_album_art=False)
+
+    assert "album_art_b64" not in data
+    assert data["album_art_hash"] == artwork_hash(art)
+
+
+def test_missing_artwork_is_requested_then_uploaded_raw(store: InMemoryStore) -> None:
+    api_key = main.config.get("server.api_key")
+    client = TestClient(main.app)
+    art = png_header(64, 64)
+    state = MediaInfo(title="A", is_playing=True, album_art=art)
+    update = {"media_info": state.to_dict(include_album_art=False)}
+
+    first = client.post(f"/api/v1/update?api_key={api_key}", json=update)
+    assert first.json()["artwork"] == "missing"
+
+    uploaded = client.put(
+        f"/api/v1/artwork/{state.album_art_hash}?api_key={api_key}",
+        content=art,
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    assert uploaded.json() == {"status": "stored", "hash": state.album_art_hash}
+
+    main.app_state.artwork_blobs.clear()
+    second = client.post(f"/api/v1/update?api_key={api_key}", json=update)
+    assert second.json()["artwork"] == "present"
+
+    with TestClient(main.app) as client:
+        svg = client.get("/now-playing.svg?template=music-card").text
+    assert base64.b64encode(art).decode() in svg
+
+
+def test_artwork_gone_from_the_store_is_not_reported_present(
+    store: InMemoryStore,
+) -> None:
+    api_key = main.config.get("server.api_key")
+    client = TestClient(main.app)
+    art = png_header(64, 64)
+    state = MediaInfo(title="A", is_playing=True, album_art=art)
+    update = {"media_info": state.to_dict(include_album_art=True)}
+    client.post(f"/api/v1/update?api_key={api_key}", json=update)
+    update = {"media_info": state.to_dict(include_album_art=False)}
+
+    # Expired from the store but still cached here: restored, not re-requested
+    store._artwork.clear()
+    first = client.post(f"/api/v1/update?api_key={api_key}", json=update)
+    assert first.json()["artwork"] == "present"
+    assert store.get_artwork(state.album_art_hash) == art
+
+    # Gone everywhere: the client has to upload it again
+    store._artwork.clear()
+    main.app_state.artwork_blobs.clear()
+    second = client.post(f"/api/v1/update?api_key={api_key}", json=update)
+    assert second.json()["artwork"] == "missing"
+
+
+def test_artwork_must_match_its_hash(store: InMemoryStore) -> None:
+    api_key = main.config.get("server.api_key")
+    client = TestClient(main.app)
+
+    response = client.put(f"/api/v1/artwork/{'0' * 32}?api_key={api_key}", content=b"x")
+
+    assert response.status_code == 400
+
+
+def test_inline_artwork_is_moved_into_the_blob_store(store: InMemoryStore) -> None:
+    api_key = main.config.get("server.api_key")
+    client = TestClient(main.app)
+    art = png_header(32, 32)
+
+    response = client.post(
+        f"/api/v1/update?api_key={api_key}",
+        json={"media_info": MediaInfo(title="A", album_art=art).to_dict()},
+    )
+
+    assert response.json()["artwork"] == "present"
+    assert "album_art_b64" not in store.get("default")
+    assert store.get_artwork(artwork_hash(art)) == art
+
+
+def test_websocket_binary_frames_upload_artwork(store: InMemoryStore) -> None:
+    api_key = main.config.get("server.api_key")
+    client = TestClient(main.app)
+    art = png_header(16, 16)
+
+    with client.websocket_connect(f"/api/v1/ws?api_key={api_key}") as ws:
+        ws.send_bytes(art)
+        assert ws.receive_json() == {"status": "stored", "hash": artwork_hash(art)}
+
+    assert store.has_artwork(artwork_hash(art))
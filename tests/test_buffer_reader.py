@@ -0,0 +1,50 @@
+from client.poller.buffer_reader import read_buffer_bytes
+
+
+class FakeBuffer(bytearray):
+    """Buffer-protocol object shaped like a winsdk ``Buffer``."""
+
+    def __init__(self, data: bytes, length: int) -> None:
+        super().__init__(data)
+        self.length = length
+
+
+class OpaqueBuffer:
+    """Buffer without the buffer protocol, read through a ``DataReader``."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.length = len(data)
+
+
+class FakeReader:
+    def __init__(self, buffer: OpaqueBuffer) -> None:
+        self.buffer = buffer
+        self.calls = 0
+
+    def read_bytes(self, target: bytearray) -> None:
+        self.calls += 1
+        target[:] = self.buffer.data[: len(target)]
+
+
+def test_reads_buffer_protocol_in_one_copy() -> None:
+    buffer = FakeBuffer(b"\x89PNG" + b"\x00" * 60, length=32)
+
+    assert read_buffer_bytes(buffer) == (b"\x89PNG" + b"\x00" * 60)[:32]
+
+
+def test_falls_back_to_single_bulk_reader_call() -> None:
+    buffer = OpaqueBuffer(b"x" * 300_000)
+    readers: list[FakeReader] = []
+
+    def factory(target: OpaqueBuffer) -> FakeReader:
+        readers.append(FakeReader(target))
+        return readers[-1]
+
+    assert read_buffer_bytes(buffer, factory) == b"x" * 300_000
+    assert readers[0].calls == 1
+
+
+def test_empty_or_unreadable_buffers_return_none() -> None:
+    assert read_buffer_bytes(FakeBuffer(b"", length=0)) is None
+    assert read_buffer_bytes(OpaqueBuffer(b"data")) is None
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from typing import Optional
+
+from client import events
+from client.events import StateBroadcaster
+from client.models import MediaInfo
+
+
+def track(title: str, is_playing: bool = True) -> MediaInfo:
+    return MediaInfo(title=title, artist="Artist", is_playing=is_playing)
+
+
+def test_fans_out_changes_and_skips_duplicates() -> None:
+    async def scenario() -> None:
+        broadcaster = StateBroadcaster()
+        first = broadcaster.subscribe("alice")
+        second = broadcaster.subscribe("alice")
+
+        event = broadcaster.publish("alice", track("A"))
+        assert broadcaster.publish("alice", track("A")) is None
+        assert await first.get() is event
+        assert await second.get() is event
+        assert first.empty() and second.empty()
+
+        assert broadcaster.publish("alice", track("A", is_playing=False)) is not None
+        assert broadcaster.publish("bob", track("A")) is None
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscribers_only_see_the_latest_state() -> None:
+    async def scenario() -> None:
+        broadcaster = StateBroadcaster()
+        queue = broadcaster.subscribe("alice")
+
+        broadcaster.publish("alice", track("A"))
+        broadcaster.publish("alice", track("B"))
+        broadcaster.publish("alice", None)
+
+        assert (await queue.get()).media_info is None
+        assert queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_each_template_renders_once_per_event() -> None:
+    renders: list[str] = []
+
+    def render(media_info: Optional[MediaInfo], template: str, css: Optional[str]) -> str:
+        renders.append(template)
+        return f"<svg>{media_info.title}</svg>"
+
+    async def scenario() -> None:
+        broadcaster = StateBroadcaster()
+        queues = [broadcaster.subscribe("alice") for _ in range(5)]
+        broadcaster.publish("alice", track("A"))
+
+        events = [await queue.get() for queue in queues]
+        svgs = await asyncio.gather(*(event.svg(render, "neon") for event in events))
+
+        assert set(svgs) == {"<svg>A</svg>"}
+        assert renders == ["neon"]
+        assert '"svg": "<svg>A</svg>"' in events[0].format(svgs[0])
+
+    asyncio.run(scenario())
+
+
+def test_progress_renders_are_only_shared_briefly(monkeypatch) -> None:
+    renders: list[float] = []
+
+    def render(media_info: Optional[MediaInfo], template: str, css: Optional[str]) -> str:
+        renders.append(media_info.progress()[0])
+        return "<svg/>"
+
+    async def scenario() -> None:
+        broadcaster = StateBroadcaster()
+        queue = broadcaster.subscribe("alice")
+        broadcaster.publish(
+            "alice",
+            MediaInfo(
+                title="A",
+                is_playing=True,
+                position=10.0,
+                duration=200.0,
+                position_timestamp=time.time(),
+            ),
+        )
+        event = await queue.get()
+
+        await event.svg(render, "neon")
+        await event.svg(render, "neon")
+        assert len(renders) == 1
+
+        # A late subscriber gets a card whose bar starts where playback is now
+        monkeypatch.setattr(events, "PROGRESS_RENDER_TTL", 0.0)
+        await asyncio.sleep(0.01)
+        await event.svg(render, "neon")
+        assert len(renders) == 2 and renders[1] > renders[0]
+        assert event.payload()["media_info"]["duration"] == 200.0
+
+    asyncio.run(scenario())
+
+
+def test_watcher_runs_only_while_subscribed() -> None:
+    fetches: list[str] = []
+
+    async def fetch(key: str) -> Optional[MediaInfo]:
+        fetches.append(key)
+        return track("A")
+
+    async def scenario() -> None:
+        broadcaster = StateBroadcaster(fetch=fetch, interval=0.01)
+        queue = broadcaster.subscribe("alice")
+
+        assert (await asyncio.wait_for(queue.get(), 1)).media_info.title == "A"
+        broadcaster.unsubscribe("alice", queue)
+        await asyncio.sleep(0.05)
+        count = len(fetches)
+        await asyncio.sleep(0.05)
+
+        assert len(fetches) == count
+        assert broadcaster.subscriber_count() == 0
+
+    asyncio.run(scenario())
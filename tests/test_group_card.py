@@ -0,0 +1,104 @@
+import struct
+
+import pytest
+from fastapi.testclient import TestClient
+
+from client import main
+from client.models import MediaInfo
+from client.store import InMemoryStore
+
+API_KEY = main.config.get("server.api_key")
+ARTWORK = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8 + struct.pack(">II", 64, 64)
+
+
+class CountingStore(InMemoryStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: list[str] = []
+
+    def get(self, key: str):
+        self.calls.append("get")
+        return super().get(key)
+
+    def get_many(self, keys: list[str]):
+        self.calls.append("get_many")
+        return [self._data.get(key) for key in keys]
+
+    def get_artwork(self, artwork_hash: str):
+        self.calls.append("get_artwork")
+        return super().get_artwork(artwork_hash)
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> CountingStore:
+    store = CountingStore()
+    monkeypatch.setattr(main, "PUBLIC_MODE", True)
+    monkeypatch.setattr(main.app_state, "store", store)
+    monkeypatch.setattr(main.app_state, "last_updates", main.LRUCache())
+    monkeypatch.setattr(main.app_state, "history_heads", main.LRUCache())
+    monkeypatch.setattr(main.app_state, "artwork_blobs", main.LRUCache())
+    monkeypatch.setattr(main.app_state, "group_cards", main.LRUCache())
+    return store
+
+
+@pytest.fixture
+def client(store: CountingStore):
+    with TestClient(main.app) as client:
+        yield client
+
+
+def play(client: TestClient, user_id: str, title: str, **fields) -> None:
+    media = MediaInfo(title=title, artist="Artist", is_playing=True, **fields)
+    response = client.post(
+        "/api/v1/update",
+        params={"api_key": API_KEY, "user_id": user_id},
+        json={"media_info": media.to_dict()},
+    )
+    assert response.status_code == 200
+
+
+def test_group_card_reads_every_member_in_one_call(
+    client: TestClient, store: CountingStore
+) -> None:
+    play(client, "alice", "Song A", album_art=ARTWORK)
+    play(client, "bob", "Song B", album_art=ARTWORK)
+    main.app_state.artwork_blobs.clear()
+    store.calls.clear()
+
+    response = client.get("/group.svg", params={"users": "alice, bob,carol,alice"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("image/svg+xml")
+    body = response.text
+    assert "Song A" in body and "Song B" in body and "Not playing" in body
+    assert body.count("carol") == 1 and body.count(">alice<") == 1
+    # One batched state read, and the shared artwork fetched and embedded once
+    assert store.calls == ["get_many", "get_artwork"]
+    assert body.count("<image") == 1 and body.count("<use") == 2
+
+
+def test_group_card_is_cached_by_member_fingerprints(
+    client: TestClient, store: CountingStore
+) -> None:
+    play(client, "alice", "Song A")
+    play(client, "bob", "Song B")
+
+    first = client.get("/group.svg", params={"users": "alice,bob"})
+    second = client.get("/group.svg", params={"users": "alice,bob"})
+    assert first.headers["x-group-cache"] == "miss"
+    assert second.headers["x-group-cache"] == "hit"
+    assert second.text == first.text
+
+    play(client, "bob", "Song C")
+    third = client.get("/group.svg", params={"users": "alice,bob"})
+    assert third.headers["x-group-cache"] == "miss"
+    assert "Song C" in third.text
+
+
+@pytest.mark.parametrize(
+    "users", ["", " , ", ",".join(f"user{index}" for index in range(13))]
+)
+def test_group_card_rejects_empty_or_oversized_groups(
+    client: TestClient, users: str
+) -> None:
+    assert client.get("/group.svg", params={"users": users}).status_code == 400
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from client import main
+from client.models import MediaInfo
+from client.poller.base import BasePoller
+
+
+class CountingPoller(BasePoller):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def get_media_info(self):
+        self.calls += 1
+        return MediaInfo(title="Probe")
+
+    def is_supported(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def local_client(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(main, "PUBLIC_MODE", False)
+    monkeypatch.setattr(main.app_state, "last_poll", None)
+    with TestClient(main.app) as client:
+        monkeypatch.setattr(main.app_state, "poller", CountingPoller())
+        yield client
+
+
+def test_liveness_is_trivial(local_client: TestClient) -> None:
+    assert local_client.get("/health/live").json() == {"status": "ok"}
+
+
+def test_readiness_reports_cached_poll_without_polling(
+    local_client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    poller = main.app_state.poller
+    renderer = main.app_state.renderer
+    monkeypatch.setattr(renderer, "list_templates", lambda: pytest.fail("scanned"))
+
+    before = local_client.get("/health/ready").json()
+    assert before["status"] == "ready"
+    assert before["components"]["poller"]["last_poll"] is None
+    assert "turntable" in before["components"]["renderer"]["templates"]
+
+    local_client.get("/now-playing.svg")
+    after = local_client.get("/health").json()
+    last_poll = after["components"]["poller"]["last_poll"]
+
+    assert poller.calls == 1
+    assert last_poll["ok"] is True and last_poll["has_media"] is True
+    assert last_poll["age_seconds"] >= 0
+
+
+def test_readiness_fails_without_renderer(
+    local_client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(main.app_state, "renderer", None)
+
+    response = local_client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+
+
+def test_diagnostics_runs_the_deep_check(local_client: TestClient) -> None:
+    body = local_client.get("/health/diagnostics").json()
+
+    assert body["components"]["poller"]["test_successful"] is True
+    assert main.app_state.poller.calls == 1
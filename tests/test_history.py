@@ -0,0 +1,104 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from client import main
+from client.models import MediaInfo
+from client.store import InMemoryStore
+
+KEY = {"api_key": main.config.get("server.api_key"), "user_id": "alice"}
+
+
+class CountingStore(InMemoryStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.history_reads = 0
+
+    def get_history(self, user_id: str, count: int) -> list[dict]:
+        self.history_reads += 1
+        return super().get_history(user_id, count)
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> CountingStore:
+    store = CountingStore()
+    monkeypatch.setattr(main, "PUBLIC_MODE", True)
+    monkeypatch.setattr(main.app_state, "store", store)
+    monkeypatch.setattr(main.app_state, "last_updates", main.LRUCache())
+    monkeypatch.setattr(main.app_state, "history_heads", main.LRUCache())
+    return store
+
+
+@pytest.fixture
+def client(store: CountingStore):
+    with TestClient(main.app) as client:
+        yield client
+
+
+def play(client: TestClient, title: str, is_playing: bool = True) -> None:
+    media = MediaInfo(title=title, artist="Artist", is_playing=is_playing)
+    response = client.post(
+        "/api/v1/update", params=KEY, json={"media_info": media.to_dict()}
+    )
+    assert response.status_code == 200
+
+
+def test_in_memory_history_is_a_ring_buffer() -> None:
+    store = InMemoryStore()
+    for index in range(5):
+        store.append_history("alice", {"title": str(index)}, limit=3)
+
+    assert [entry["title"] for entry in store.get_history("alice", 10)] == [
+        "4", "3", "2"
+    ]
+    assert store.get_history("alice", 1) == [{"title": "4"}]
+    assert store.get_history("bob", 5) == []
+
+    # Shrinking the limit keeps the newest entries
+    store.append_history("alice", {"title": "5"}, limit=2)
+    assert store.get_history("alice", 10) == [{"title": "5"}, {"title": "4"}]
+
+
+def test_track_changes_are_appended_once(
+    client: TestClient, store: CountingStore
+) -> None:
+    play(client, "A")
+    play(client, "A", is_playing=False)
+    play(client, "A")
+    play(client, "B")
+    play(client, "A")
+
+    history = client.get("/api/v1/history", params={"user_id": "alice"}).json()
+    assert [entry["title"] for entry in history["history"]] == ["A", "B", "A"]
+    entry = history["history"][0]
+    assert set(entry) == {"title", "artist", "played_at"}
+    # One head read on the cold instance, then one for the listing
+    assert store.history_reads == 2
+
+
+def test_cold_instance_does_not_repeat_the_last_play(
+    client: TestClient, store: CountingStore
+) -> None:
+    play(client, "A")
+    main.app_state.history_heads.clear()
+    main.app_state.last_updates.clear()
+    play(client, "A")
+
+    assert len(store.get_history("alice", 10)) == 1
+
+
+def test_recent_card_renders_history_in_one_read(
+    client: TestClient, store: CountingStore
+) -> None:
+    play(client, "First <Song>")
+    play(client, "Second")
+    reads = store.history_reads
+
+    card = client.get("/recent.svg", params={"user_id": "alice", "limit": 1})
+
+    assert card.status_code == 200
+    assert card.headers["content-type"].startswith("image/svg+xml")
+    assert "Second" in card.text and "First" not in card.text
+    assert store.history_reads == reads + 1
+
+    empty = client.get("/recent.svg", params={"user_id": "nobody"})
+    assert "No recent plays yet" in empty.text
@@ -0,0 +1,123 @@
+import struct
+import time
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from client.utils.image_metadata import (
+    FTYP_SCAN_LIMIT,
+    JPEG_SCAN_LIMIT,
+    detect_image_mime_type,
+    read_image_dimensions,
+)
+
+KNOWN_TYPES = {
+    None,
+    "image/png",
+    "image/jpeg",
+    "image/gif",
+    "image/webp",
+    "image/bmp",
+    "image/tiff",
+    "image/avif",
+    "image/heic",
+    "image/heif",
+}
+
+# Every example must parse well inside this many milliseconds.
+FUZZ_DEADLINE_MS = 50
+
+
+def segment(marker: int, payload: bytes) -> bytes:
+    return bytes([0xFF, marker]) + struct.pack(">H", len(payload) + 2) + payload
+
+
+def start_of_frame(width: int, height: int, marker: int = 0xC0) -> bytes:
+    return segment(marker, b"\x08" + struct.pack(">HH", height, width) + b"\x03" + b"\x00" * 9)
+
+
+def ftyp(major: bytes, *compatible: bytes) -> bytes:
+    body = major + b"\x00\x00\x00\x00" + b"".join(compatible)
+    return struct.pack(">I", len(body) + 8) + b"ftyp" + body
+
+
+@settings(deadline=FUZZ_DEADLINE_MS, max_examples=300)
+@given(st.binary(max_size=4096))
+def test_arbitrary_bytes_never_raise(data: bytes) -> None:
+    assert detect_image_mime_type(data) in KNOWN_TYPES
+    for prefix in (b"", b"\xff\xd8", b"\x89PNG\r\n\x1a\n", b"RIFF\x00\x00\x00\x00WEBP"):
+        dimensions = read_image_dimensions(prefix + data)
+        assert dimensions is None or len(dimensions) == 2
+
+
+@settings(deadline=FUZZ_DEADLINE_MS, max_examples=200)
+@given(
+    width=st.integers(1, 65535),
+    height=st.integers(1, 65535),
+    sof=st.sampled_from([0xC0, 0xC1, 0xC2, 0xCF]),
+    segments=st.lists(
+        st.tuples(st.integers(0xE0, 0xEF), st.binary(max_size=2048)), max_size=8
+    ),
+    fill=st.integers(0, 64),
+)
+def test_jpeg_dimensions_found_after_metadata_and_fill_bytes(
+    width: int, height: int, sof: int, segments: list, fill: int
+) -> None:
+    data = b"\xff\xd8" + b"".join(segment(marker, payload) for marker, payload in segments)
+    data += b"\xff" * fill + start_of_frame(width, height, sof) + b"\xff\xda"
+
+    assert read_image_dimensions(data) == (width, height)
+
+
+@settings(deadline=FUZZ_DEADLINE_MS)
+@given(st.binary(min_size=1, max_size=64).filter(lambda chunk: 0xFF not in chunk))
+def test_stray_bytes_between_segments_are_skipped(garbage: bytes) -> None:
+    data = b"\xff\xd8" + garbage + start_of_frame(640, 480)
+
+    assert read_image_dimensions(data) == (640, 480)
+
+
+def test_adversarial_jpegs_are_bounded() -> None:
+    cases = [
+        b"\xff\xd8" + b"\xff" * 8_000_000,
+        b"\xff\xd8" + b"\x00" * 8_000_000,
+        b"\xff\xd8" + b"\xff\x00" * 4_000_000,
+        b"\xff\xd8" + b"\xff\xd0" * 4_000_000,
+        b"\xff\xd8" + segment(0xE1, b"\x00" * 65533) * 200 + start_of_frame(1, 1),
+    ]
+    for data in cases:
+        start = time.perf_counter()
+        read_image_dimensions(data)
+        assert time.perf_counter() - start < 0.05
+
+
+def test_frame_header_past_the_scan_limit_is_not_read() -> None:
+    padding = segment(0xE1, b"\x00" * 65533) * (JPEG_SCAN_LIMIT // 65537 + 1)
+
+    assert read_image_dimensions(b"\xff\xd8" + padding + start_of_frame(8, 8)) is None
+
+
+def test_scan_data_is_never_parsed_as_a_frame_header() -> None:
+    data = b"\xff\xd8" + segment(0xDA, b"\x00" * 10) + start_of_frame(8, 8)
+
+    assert read_image_dimensions(data) is None
+
+
+def test_detects_tiff_and_heif_family() -> None:
+    assert detect_image_mime_type(b"II*\x00\x08\x00\x00\x00") == "image/tiff"
+    assert detect_image_mime_type(b"MM\x00*\x00\x00\x00\x08") == "image/tiff"
+    assert detect_image_mime_type(ftyp(b"avif", b"mif1", b"miaf")) == "image/avif"
+    assert detect_image_mime_type(ftyp(b"mif1", b"mif1", b"avif")) == "image/avif"
+    assert detect_image_mime_type(ftyp(b"heic", b"mif1", b"heic")) == "image/heic"
+    assert detect_image_mime_type(ftyp(b"mif1", b"mif1")) == "image/heif"
+    assert detect_image_mime_type(ftyp(b"isom", b"mp41")) is None
+
+
+def test_heif_brand_scan_ignores_an_oversized_ftyp_box() -> None:
+    body = b"isom\x00\x00\x00\x00" + b"mp41" * (FTYP_SCAN_LIMIT // 4) + b"avif"
+    oversized = b"\xff\xff\xff\xff" + b"ftyp" + body + b"\x00" * 2 * 1024 * 1024
+
+    start = time.perf_counter()
+    assert detect_image_mime_type(oversized) is None
+    assert time.perf_counter() - start < 0.005
+    assert detect_image_mime_type(b"\xff\xff\xff\xff" + ftyp(b"avif")[4:]) == "image/avif"
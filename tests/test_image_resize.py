@@ -0,0 +1,68 @@
+import io
+import struct
+
+import pytest
+
+from client.utils.image_metadata import read_image_dimensions
+from client.utils.image_resize import ArtworkPreprocessor
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def encode(size: int, format: str = "PNG", mode: str = "RGB") -> bytes:
+    output = io.BytesIO()
+    color = (200, 30, 60, 255) if mode == "RGBA" else (200, 30, 60)
+    Image.new(mode, (size, size), color).save(output, format=format)
+    return output.getvalue()
+
+
+def noisy_jpeg(size: int) -> bytes:
+    output = io.BytesIO()
+    Image.effect_noise((size, size), 80).convert("RGB").save(
+        output, format="JPEG", quality=95
+    )
+    return output.getvalue()
+
+
+def test_small_artwork_is_returned_without_decoding(monkeypatch) -> None:
+    processor = ArtworkPreprocessor(max_size=512)
+    small = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8 + struct.pack(">II", 300, 300)
+    monkeypatch.setattr(Image, "open", lambda *args: pytest.fail("decoded"))
+
+    assert processor.process(small) is small
+
+
+def test_large_artwork_is_downscaled_and_smaller() -> None:
+    processor = ArtworkPreprocessor(max_size=256)
+    original = noisy_jpeg(1200)
+
+    processed = processor.process(original)
+
+    assert read_image_dimensions(processed) == (256, 256)
+    assert len(processed) < len(original)
+
+
+def test_transparent_artwork_stays_png() -> None:
+    processor = ArtworkPreprocessor(max_size=64)
+
+    processed = processor.process(encode(400, mode="RGBA"))
+
+    assert processed.startswith(b"\x89PNG")
+    assert read_image_dimensions(processed) == (64, 64)
+
+
+def test_repeat_polls_reuse_the_processed_artwork(monkeypatch) -> None:
+    processor = ArtworkPreprocessor(max_size=128)
+    original = noisy_jpeg(600)
+    first = processor.process(original)
+    monkeypatch.setattr(processor, "_resize", lambda data: pytest.fail("resized"))
+
+    assert processor.process(original) is first
+
+
+def test_disabled_or_undecodable_artwork_passes_through() -> None:
+    original = noisy_jpeg(600)
+
+    assert ArtworkPreprocessor(max_size=0).process(original) is original
+    garbage = b"\xff\xd8" + b"\x00" * 100
+    assert ArtworkPreprocessor(max_size=64).process(garbage) is garbage
@@ -0,0 +1,95 @@
+"""Cold-start budget for the serverless entry point, measured with -X importtime."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from client.store import create_store
+
+ROOT = Path(__file__).parent.parent
+
+# Modules public mode never needs; importing any of them is a regression.
+FORBIDDEN = (
+    "requests",
+    "client.poller.factory",
+    "client.poller.linux",
+    "client.poller.macos",
+    "client.poller.windows",
+    "client.poller.replay",
+    "dbus_next",
+    "winsdk",
+    "PIL",
+    "websockets",
+    "client.renderer.raster",
+    "resvg_py",
+    "fastapi.staticfiles",
+)
+
+# A deployment with Vercel KV configured; the store must still import nothing
+# it doesn't need until its first command
+KV_ENV = {"KV_REST_API_URL": "https://kv.example.invalid", "KV_REST_API_TOKEN": "t"}
+
+# Summed self time of our own modules, in microseconds. Third-party import
+# cost depends on installed versions, so it's covered by FORBIDDEN instead.
+FIRST_PARTY_BUDGET_US = 250_000
+
+
+def import_times(module: str) -> dict[str, int]:
+    env = dict(os.environ, PUBLIC_MODE="true", **KV_ENV)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+@pytest.mark.slow
+def test_public_entry_point_stays_within_cold_start_budget() -> None:
+    times = import_times("api.index")
+
+    loaded = [name for name in times if name.split(".")[0] in FORBIDDEN or name in FORBIDDEN]
+    assert loaded == []
+
+    first_party = sum(
+        self_us
+        for name, self_us in times.items()
+        if name.split(".")[0] in ("api", "client", "config")
+    )
+    assert first_party < FIRST_PARTY_BUDGET_US
+
+
+def test_measured_environment_uses_the_redis_store(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    for name, value in KV_ENV.items():
+        monkeypatch.setenv(name, value)
+
+    assert create_store().backend == "redis"
+
+
+def test_app_factory_registers_only_its_modes_routes() -> None:
+    from fastapi.testclient import TestClient
+
+    from client import main
+
+    public = TestClient(main.create_app(public_mode=True))
+    local = TestClient(main.create_app(public_mode=False))
+
+    assert public.get("/web/").status_code == 404
+    assert local.get("/web/").status_code == 200
+    assert public.post("/api/v1/update", json={}).status_code == 401
+    assert local.post("/api/v1/update", json={}).json() == {"detail": "Not Found"}
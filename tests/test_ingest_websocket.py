@@ -0,0 +1,108 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from client import main
+from client.store import InMemoryStore
+
+
+@pytest.fixture
+def public_app(monkeypatch: pytest.MonkeyPatch) -> InMemoryStore:
+    store = InMemoryStore()
+    monkeypatch.setattr(main, "PUBLIC_MODE", True)
+    monkeypatch.setattr(main.app_state, "store", store)
+    return store
+
+
+def test_websocket_updates_are_acknowledged_and_stored(public_app: InMemoryStore) -> None:
+    api_key = main.config.get("server.api_key")
+    client = TestClient(main.app)
+
+    with client.websocket_connect(f"/api/v1/ws?api_key={api_key}&user_id=alice") as ws:
+        ws.send_json({"media_info": {"title": "A", "is_playing": True}, "seq": 1})
+        assert ws.receive_json() == {
+            "status": "updated",
+            "user_id": "alice",
+            "backend": "memory",
+            "seq": 1,
+        }
+        ws.send_text("not json")
+        assert ws.receive_json()["status"] == "error"
+        ws.send_json({"media_info": None, "seq": 2})
+        assert ws.receive_json()["seq"] == 2
+
+    assert public_app.get("alice") is None
+    assert public_app.keys() == ["alice"]
+
+
+def test_websocket_accepts_bearer_authorization(public_app: InMemoryStore) -> None:
+    api_key = main.config.get("server.api_key")
+    client = TestClient(main.app)
+
+    with client.websocket_connect(
+        "/api/v1/ws", headers={"Authorization": f"Bearer {api_key}"}
+    ) as ws:
+        ws.send_json({"media_info": {"title": "B"}})
+        assert ws.receive_json()["user_id"] == "default"
+
+    assert public_app.get("default") == {"title": "B"}
+
+
+def test_websocket_rejects_invalid_key_at_connect(public_app: InMemoryStore) -> None:
+    client = TestClient(main.app)
+
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with client.websocket_connect("/api/v1/ws?api_key=wrong"):
+            pass
+
+    assert excinfo.value.code == 1008
+
+
+BAD_STATE = {"title": "x", "is_playing": True, "duration": "abc", "position": 1}
+
+
+def test_invalid_updates_are_rejected_before_storing(
+    public_app: InMemoryStore,
+) -> None:
+    api_key = main.config.get("server.api_key")
+    client = TestClient(main.app)
+    params = {"api_key": api_key, "user_id": "alice"}
+
+    client.post(
+        "/api/v1/update", params=params, json={"media_info": {"title": "Good"}}
+    )
+    response = client.post(
+        "/api/v1/update", params=params, json={"media_info": BAD_STATE}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["duration"]
+
+    with client.websocket_connect(f"/api/v1/ws?api_key={api_key}&user_id=alice") as ws:
+        ws.send_json({"media_info": BAD_STATE, "seq": 1})
+        reply = ws.receive_json()
+        assert reply["status"] == "error" and reply["seq"] == 1
+        ws.send_json({"media_info": ["not", "an", "object"]})
+        assert ws.receive_json()["status"] == "error"
+
+    # The last good state is kept and still renders
+    assert public_app.get("alice") == {"title": "Good"}
+    card = client.get("/now-playing.svg", params={"user_id": "alice"})
+    assert card.status_code == 200 and "Good" in card.text
+
+
+def test_update_fields_are_coerced_to_the_model_types(
+    public_app: InMemoryStore,
+) -> None:
+    api_key = main.config.get("server.api_key")
+    client = TestClient(main.app)
+
+    response = client.post(
+        "/api/v1/update",
+        params={"api_key": api_key},
+        json={"media_info": {"title": "A", "duration": "200", "position": 5}},
+    )
+
+    assert response.status_code == 200
+    assert public_app.get("default") == {
+        "title": "A", "duration": 200.0, "position": 5.0
+    }
@@ -0,0 +1,204 @@
+import asyncio
+import platform
+import shutil
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("dbus_next")
+
+from dbus_next import Variant  # noqa: E402
+from dbus_next.aio import MessageBus  # noqa: E402
+from dbus_next.service import (  # noqa: E402
+    PropertyAccess,
+    ServiceInterface,
+    dbus_property,
+    signal,
+)
+
+from client.poller.artwork_cache import ArtworkCache  # noqa: E402
+from client.poller.linux import MPRIS_PATH, LinuxMprisPoller  # noqa: E402
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        platform.system() != "Linux" or not shutil.which("dbus-daemon"),
+        reason="requires Linux with dbus-daemon",
+    ),
+]
+
+
+class FakePlayer(ServiceInterface):
+    """Minimal ``org.mpris.MediaPlayer2.Player`` implementation."""
+
+    def __init__(self, art_url: str) -> None:
+        super().__init__("org.mpris.MediaPlayer2.Player")
+        self._status = "Playing"
+        self._position = 30_000_000
+        self._metadata = {
+            "xesam:title": Variant("s", "Track"),
+            "xesam:artist": Variant("as", ["Artist", "Guest"]),
+            "xesam:album": Variant("s", "Album"),
+            "mpris:artUrl": Variant("s", art_url),
+            "mpris:length": Variant("x", 200_000_000),
+        }
+
+    @dbus_property(access=PropertyAccess.READ)
+    def PlaybackStatus(self) -> "s":  # noqa: F821
+        return self._status
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Metadata(self) -> "a{sv}":  # noqa: F722
+        return self._metadata
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Position(self) -> "x":  # noqa: F821
+        return self._position
+
+    @signal()
+    def Seeked(self) -> "x":  # noqa: F821
+        return self._position
+
+    def seek(self, position: int) -> None:
+        self._position = position
+        self.Seeked()
+
+    def pause(self) -> None:
+        self._status = "Paused"
+        self.emit_properties_changed({"PlaybackStatus": "Paused"})
+
+
+@pytest.fixture
+def session_bus() -> Iterator[str]:
+    daemon = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        yield daemon.stdout.readline().strip()
+    finally:
+        daemon.terminate()
+        daemon.wait(timeout=5)
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.02)
+
+
+def test_reads_metadata_and_follows_signals(session_bus: str, tmp_path: Path) -> None:
+    art = tmp_path / "cover art.png"
+    art.write_bytes(b"\x89PNG\r\n\x1a\nartwork")
+
+    async def scenario() -> None:
+        player_bus = await MessageBus(bus_address=session_bus).connect()
+        player = FakePlayer(art.as_uri())
+        player_bus.export(MPRIS_PATH, player)
+        await player_bus.request_name("org.mpris.MediaPlayer2.fake")
+
+        poller = LinuxMprisPoller(bus_address=session_bus, artwork=ArtworkCache())
+        info = await poller.get_media_info()
+
+        assert info.title == "Track"
+        assert info.artist == "Artist, Guest"
+        assert info.album == "Album"
+        assert info.is_playing
+        assert info.album_art == art.read_bytes()
+
+        # Later state arrives via PropertiesChanged, not new property reads.
+        loads: list[str] = []
+        original_load = poller._load_player
+        poller._load_player = lambda name: loads.append(name) or original_load(name)
+        art.unlink()
+        player.pause()
+
+        async def paused() -> bool:
+            info = await poller.get_media_info()
+            return not info.is_playing
+
+        await wait_for(paused)
+        assert loads == []
+        assert (await poller.get_media_info()).album_art is not None
+
+        player_bus.disconnect()
+
+        async def gone() -> bool:
+            return await poller.get_media_info() is None
+
+        await wait_for(gone)
+        await poller.close()
+
+    asyncio.run(scenario())
+
+
+def test_tracks_position_without_polling_it(session_bus: str) -> None:
+    async def scenario() -> None:
+        player_bus = await MessageBus(bus_address=session_bus).connect()
+        player = FakePlayer("https://example.com/a.png")
+        player_bus.export(MPRIS_PATH, player)
+        await player_bus.request_name("org.mpris.MediaPlayer2.fake")
+
+        poller = LinuxMprisPoller(bus_address=session_bus, artwork=ArtworkCache())
+        info = await poller.get_media_info()
+        assert info.duration == 200.0
+        assert info.position == 30.0
+        elapsed, duration = info.progress(now=info.position_timestamp + 5)
+        assert (elapsed, duration) == (35.0, 200.0)
+
+        player.seek(120_000_000)
+
+        async def seeked() -> bool:
+            return (await poller.get_media_info()).position == 120.0
+
+        await wait_for(seeked)
+        assert (await poller.get_media_info()).fingerprint != info.fingerprint
+
+        await poller.close()
+        player_bus.disconnect()
+
+    asyncio.run(scenario())
+
+
+def test_browsers_can_be_excluded(session_bus: str) -> None:
+    async def scenario() -> None:
+        player_bus = await MessageBus(bus_address=session_bus).connect()
+        player_bus.export(MPRIS_PATH, FakePlayer("https://example.com/a.png"))
+        await player_bus.request_name("org.mpris.MediaPlayer2.firefox.instance_1")
+
+        poller = LinuxMprisPoller(bus_address=session_bus, exclude_browsers=True)
+        assert await poller.get_media_info() is None
+
+        included = LinuxMprisPoller(bus_address=session_bus)
+        info = await included.get_media_info()
+        assert info.title == "Track"
+        assert info.album_art is None
+
+        await poller.close()
+        await included.close()
+        player_bus.disconnect()
+
+    asyncio.run(scenario())
+
+
+def test_signal_tasks_are_kept_until_done_and_failures_logged(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    async def scenario() -> None:
+        poller = LinuxMprisPoller()
+
+        async def fail() -> None:
+            raise RuntimeError("boom")
+
+        poller._spawn(fail())
+        assert len(poller._tasks) == 1
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert poller._tasks == set()
+
+    asyncio.run(scenario())
+    assert "Reloading MPRIS player failed: boom" in caplog.text
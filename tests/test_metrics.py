@@ -0,0 +1,87 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from client import main, metrics
+from client.models import MediaInfo
+from client.store import InMemoryStore
+from client.utils.lru import LRUCache
+
+
+def sample(text: str, series: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{series} not exposed")
+
+
+def test_histogram_exposes_cumulative_buckets() -> None:
+    registry = metrics.MetricsRegistry()
+    latency = registry.histogram("op_seconds", "Op latency", ("op",), buckets=(0.1, 1.0))
+
+    latency.labels("get").observe(0.05)
+    latency.labels("get").observe(0.5)
+    latency.labels("get").observe(3)
+
+    text = registry.render()
+    assert "# TYPE op_seconds histogram" in text
+    assert sample(text, 'op_seconds_bucket{op="get",le="0.1"}') == 1
+    assert sample(text, 'op_seconds_bucket{op="get",le="1.0"}') == 2
+    assert sample(text, 'op_seconds_bucket{op="get",le="+Inf"}') == 3
+    assert sample(text, 'op_seconds_count{op="get"}') == 3
+    assert sample(text, 'op_seconds_sum{op="get"}') == pytest.approx(3.55)
+
+
+def test_counters_and_watched_caches_are_exposed() -> None:
+    registry = metrics.MetricsRegistry()
+    served = registry.counter("served_total", "Served", ("endpoint",))
+    cache: LRUCache[bytes] = LRUCache()
+    registry.watch_cache("blobs", cache)
+
+    served.labels('a"b').inc(3)
+    cache.put("k", b"abcd")
+    cache.get("k")
+    cache.get("missing")
+
+    text = registry.render()
+    assert sample(text, r'served_total{endpoint="a\"b"}') == 3
+    assert sample(text, 'nowplaying_cache_hits_total{cache="blobs"}') == 1
+    assert sample(text, 'nowplaying_cache_misses_total{cache="blobs"}') == 1
+    assert sample(text, 'nowplaying_cache_bytes{cache="blobs"}') == 4
+
+
+def test_metrics_endpoint_counts_renders_store_calls_and_repeats(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(main, "PUBLIC_MODE", True)
+    monkeypatch.setattr(main.app_state, "store", InMemoryStore())
+    api_key = main.config.get("server.api_key")
+    update = {"media_info": MediaInfo(title="Metrics").to_dict()}
+
+    with TestClient(main.app) as client:
+        before = client.get("/metrics").text
+        client.post(f"/api/v1/update?api_key={api_key}&user_id=metrics", json=update)
+        repeated = client.post(
+            f"/api/v1/update?api_key={api_key}&user_id=metrics", json=update
+        )
+        svg = client.get("/now-playing.svg?template=turntable&user_id=metrics").text
+        response = client.get("/metrics")
+
+    after = response.text
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert repeated.json()["status"] == "updated"
+
+    def delta(series: str) -> float:
+        try:
+            start = sample(before, series)
+        except AssertionError:
+            start = 0
+        return sample(after, series) - start
+
+    # Repeats are counted but still written, in case another instance has
+    # written a newer state in between
+    assert delta("nowplaying_update_repeats_total") == 1
+    assert delta("nowplaying_updates_total") == 2
+    assert delta('nowplaying_store_seconds_count{backend="memory",operation="set"}') == 2
+    assert delta('nowplaying_store_seconds_count{backend="memory",operation="get"}') == 1
+    assert delta('nowplaying_render_seconds_count{template="turntable"}') == 1
+    assert delta('nowplaying_svg_bytes_total{endpoint="card"}') == len(svg.encode())
@@ -1,6 +1,9 @@
+import pickle
 import struct
 
-from client.models import MediaInfo
+import pytest
+
+from client.models import MediaInfo, MediaSnapshot, as_snapshot
 
 
 def png_header(width: int, height: int) -> bytes:
@@ -63,3 +66,75 @@ def test_data_uri_uses_detected_mime_type() -> None:
 
     assert media.album_art_mime_type == "image/jpeg"
     assert media.album_art_data_uri.startswith("data:image/jpeg;base64,")
+
+
+def test_snapshot_round_trips_through_the_model() -> None:
+    media = MediaInfo(
+        title="Song",
+        artist="Artist",
+        album="Album",
+        is_playing=True,
+        album_art=jpeg_header(100, 50),
+    )
+    snapshot = media.to_snapshot()
+
+    assert snapshot.fingerprint == media.fingerprint
+    assert snapshot.to_dict() == media.to_dict()
+    assert snapshot.to_model() == media
+    assert MediaSnapshot.from_dict(media.to_dict()) == snapshot
+    assert snapshot.album_art_data_uri == media.album_art_data_uri
+    assert snapshot.album_art_fit(80, 80) == media.album_art_fit(80, 80)
+    assert as_snapshot(media) == snapshot and as_snapshot(snapshot) is snapshot
+    assert pickle.loads(pickle.dumps(snapshot)) == snapshot
+
+
+def test_snapshot_is_immutable_and_caches_artwork_fields() -> None:
+    snapshot = MediaSnapshot(title="Song", album_art=png_header(64, 64))
+
+    with pytest.raises(AttributeError):
+        snapshot.title = "Other"
+    with pytest.raises(AttributeError):
+        snapshot.extra = 1
+    assert snapshot.album_art_b64 is snapshot.album_art_b64
+    assert snapshot.album_art_dimensions == (64, 64)
+    assert snapshot.replace(is_playing=True).fingerprint != snapshot.fingerprint
+    assert MediaSnapshot(title="Song").album_art_hash is None
+
+
+def test_progress_extrapolates_and_only_seeks_change_the_fingerprint() -> None:
+    playing = MediaSnapshot(
+        title="Song", is_playing=True, position=30.0, duration=200.0,
+        position_timestamp=1001.0,
+    )
+    later = playing.replace(position=40.5, position_timestamp=1011.0)
+    seeked = playing.replace(position=90.0, position_timestamp=1011.0)
+
+    assert playing.progress(now=1006.0) == (35.0, 200.0)
+    assert playing.progress(now=2001.0) == (200.0, 200.0)
+    assert playing.replace(is_playing=False).progress(now=1006.0) == (30.0, 200.0)
+    assert playing.replace(duration=None).progress() is None
+    assert later.fingerprint == playing.fingerprint
+    assert seeked.fingerprint != playing.fingerprint
+
+    media = playing.to_model()
+    assert media.fingerprint == playing.fingerprint
+    assert media.progress(now=1006.0) == playing.progress(now=1006.0)
+    assert MediaSnapshot.from_dict(playing.to_dict()) == playing
+    # States without a timeline serialize as before
+    assert "position" not in MediaSnapshot(title="Song").to_dict()
+
+
+def test_non_numeric_timeline_fields_are_dropped_or_rejected() -> None:
+    snapshot = MediaSnapshot.from_dict(
+        {"title": "Song", "is_playing": True, "duration": "abc", "position": "12",
+         "position_timestamp": None}
+    )
+    assert (snapshot.position, snapshot.duration) == (12.0, None)
+    assert snapshot.progress() is None
+    assert snapshot.fingerprint == MediaSnapshot(
+        title="Song", is_playing=True, position=12.0
+    ).fingerprint
+    assert MediaSnapshot(duration=float("nan"), position=[1]).duration is None
+
+    with pytest.raises(ValueError):
+        MediaInfo(title="Song", duration="abc")
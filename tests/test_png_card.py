@@ -0,0 +1,232 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from client import main, models
+from client.models import MediaInfo
+from client.renderer import raster
+from client.renderer.raster import Rasterizer
+from client.store import InMemoryStore
+from client.utils.image_metadata import read_image_dimensions
+
+API_KEY = main.config.get("server.api_key")
+
+
+@pytest.fixture
+def rasterized(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Scales passed to the real rasterizer, one per rasterization."""
+    pytest.importorskip("resvg_py")
+    calls = []
+    rasterize = raster.rasterize
+
+    def counting(svg_content: str, scale: float = 1.0) -> bytes:
+        calls.append(scale)
+        return rasterize(svg_content, scale)
+
+    monkeypatch.setattr(raster, "rasterize", counting)
+    return calls
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(main, "PUBLIC_MODE", True)
+    monkeypatch.setattr(main.app_state, "store", InMemoryStore())
+    monkeypatch.setattr(main.app_state, "last_updates", main.LRUCache())
+    monkeypatch.setattr(main.app_state, "history_heads", main.LRUCache())
+    # Threads, so the counting and fake rasterizers below see every call
+    rasterizer = Rasterizer(workers=1, processes=False)
+    monkeypatch.setattr(main.app_state, "rasterizer", rasterizer)
+    with TestClient(main.app) as client:
+        yield client
+
+
+def play(client: TestClient, title: str, **timeline) -> None:
+    media = MediaInfo(title=title, artist="Artist", is_playing=True, **timeline)
+    response = client.post(
+        "/api/v1/update",
+        params={"api_key": API_KEY, "user_id": "alice"},
+        json={"media_info": media.to_dict()},
+    )
+    assert response.status_code == 200
+
+
+def test_png_is_rasterized_once_per_state(
+    client: TestClient, rasterized: list[float]
+) -> None:
+    play(client, "Song A")
+    params = {"user_id": "alice", "template": "neon", "scale": 1.5}
+
+    first = client.get("/now-playing.png", params=params)
+    second = client.get("/now-playing.png", params=params)
+
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "image/png"
+    assert first.headers["x-png-cache"] == "miss"
+    assert second.headers["x-png-cache"] == "hit"
+    assert second.content == first.content
+    template = main.app_state.renderer.catalogue["neon"]
+    assert read_image_dimensions(first.content) == (
+        round(template.width * 1.5),
+        round(template.height * 1.5),
+    )
+
+    # A new track, or another scale, is a new PNG
+    client.get("/now-playing.png", params={**params, "scale": 1})
+    play(client, "Song B")
+    third = client.get("/now-playing.png", params=params)
+    assert third.headers["x-png-cache"] == "miss"
+    assert rasterized == [1.5, 1.0, 1.5]
+
+
+def test_png_progress_bar_advances_while_playing(
+    client: TestClient, rasterized: list[float], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(models, "time", SimpleNamespace(time=lambda: clock.now))
+    play(client, "Song", position=0.0, duration=60.0, position_timestamp=1000.0)
+
+    def fetch(template: str) -> bytes:
+        params = {"user_id": "alice", "template": template, "scale": 1}
+        return client.get("/now-playing.png", params=params)
+
+    first = fetch("turntable")
+    clock.now += 1
+    assert fetch("turntable").headers["x-png-cache"] == "hit"
+
+    # The next progress step is a new PNG with the bar further along
+    clock.now += main.PNG_PROGRESS_STEP * 4
+    later = fetch("turntable")
+    assert later.headers["x-png-cache"] == "miss"
+    assert later.content != first.content
+
+    # Templates without a progress bar don't re-rasterize as the track plays
+    fetch("neon")
+    clock.now += main.PNG_PROGRESS_STEP * 4
+    assert fetch("neon").headers["x-png-cache"] == "hit"
+    assert len(rasterized) == 3
+
+
+def test_concurrent_misses_share_one_rasterization(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls = []
+
+    def fake(svg_content: str, scale: float = 1.0) -> bytes:
+        calls.append(svg_content)
+        return b"png"
+
+    monkeypatch.setattr(raster, "rasterize", fake)
+    rasterizer = Rasterizer(workers=2, processes=False)
+
+    async def scenario() -> None:
+        results = await asyncio.gather(
+            *(rasterizer.render("key", "<svg/>", 1.0) for _ in range(5))
+        )
+        assert results == [b"png"] * 5
+
+    asyncio.run(scenario())
+    rasterizer.shutdown()
+    assert calls == ["<svg/>"]
+    assert rasterizer.get("key") == b"png"
+
+
+def spin_while_rasterizing(rasterizer: Rasterizer) -> float:
+    """Ticks per second a coroutine gets while three PNGs are rasterized."""
+    svg = (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400">'
+        + "".join(
+            f'<circle cx="{i}" cy="{i}" r="{i}" fill="none" stroke="red"/>'
+            for i in range(0, 400, 10)
+        )
+        + "</svg>"
+    )
+
+    async def scenario() -> float:
+        # Warm up the worker so the measurement excludes its start-up
+        await rasterizer.render("warm", svg, 1.0)
+        ticks = 0
+        done = False
+
+        async def spin() -> None:
+            nonlocal ticks
+            while not done:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        spinner = asyncio.ensure_future(spin())
+        started = time.perf_counter()
+        for index in range(3):
+            png = await rasterizer.render(index, svg, 2.0)
+            assert read_image_dimensions(png) == (800, 800)
+        elapsed = time.perf_counter() - started
+        done = True
+        await spinner
+        return ticks / elapsed
+
+    try:
+        return asyncio.run(scenario())
+    finally:
+        rasterizer.shutdown()
+
+
+def test_rasterizing_in_processes_keeps_the_event_loop_running() -> None:
+    pytest.importorskip("resvg_py")
+    processes = Rasterizer(workers=1)
+
+    in_processes = spin_while_rasterizing(processes)
+    in_threads = spin_while_rasterizing(Rasterizer(workers=1, processes=False))
+
+    # resvg holds the GIL, so a thread rasterizing starves the loop
+    assert processes.processes
+    assert in_processes > 5 * in_threads
+
+
+def test_png_of_a_failing_template_is_an_error_card(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not raster.RASTER_AVAILABLE:
+        pytest.skip("resvg-py is not installed")
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("<broken> template")
+
+    monkeypatch.setattr(main.app_state.renderer, "render_svg", broken)
+    response = client.get("/now-playing.png", params={"scale": 1})
+
+    assert response.status_code == 200
+    assert read_image_dimensions(response.content) == (400, 120)
+    assert "&lt;broken&gt;" in client.get("/now-playing.svg").text
+
+
+def test_rasterize_wraps_every_resvg_failure(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def fail(**kwargs):
+        raise OverflowError("zoom out of range")
+
+    monkeypatch.setattr(raster, "RASTER_AVAILABLE", True)
+    monkeypatch.setattr(
+        raster, "resvg_py", SimpleNamespace(svg_to_bytes=fail), raising=False
+    )
+
+    with pytest.raises(raster.RasterError, match="OverflowError"):
+        raster.rasterize("<svg/>")
+
+
+def test_png_rejects_out_of_range_scale(client: TestClient) -> None:
+    if not raster.RASTER_AVAILABLE:
+        pytest.skip("resvg-py is not installed")
+    for scale in (0.1, 10):
+        response = client.get("/now-playing.png", params={"scale": scale})
+        assert response.status_code == 400
+
+
+def test_png_without_resvg_is_not_implemented(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(raster, "RASTER_AVAILABLE", False)
+
+    assert client.get("/now-playing.png").status_code == 501
@@ -0,0 +1,159 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from client import main
+from client.models import MediaSnapshot
+from client.renderer.engine import Renderer
+from client.renderer.preview import PreviewError, PreviewLimitExceeded, PreviewRenderer
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(main, "PUBLIC_MODE", True)
+    monkeypatch.setattr(main.app_state, "previews", PreviewRenderer())
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_preview_matches_renderer_output() -> None:
+    renderer = Renderer()
+    media = MediaSnapshot(title="Song & Co", artist="Artist", is_playing=True)
+    source = (renderer.template_dir / "turntable.svg").read_text(encoding="utf-8")
+
+    output, _ = PreviewRenderer().render(
+        source, renderer.template_context(media, ".x { }")
+    )
+
+    assert output == renderer.render_svg(media, "turntable", ".x { }")
+
+
+def test_compiled_templates_are_cached_by_source() -> None:
+    previews = PreviewRenderer(max_templates=1)
+
+    assert previews.render("{{ a }}", {"a": 1}) == ("1", False)
+    assert previews.render("{{ a }}", {"a": 2}) == ("2", True)
+    previews.render("{{ b }}", {})
+    assert previews.render("{{ a }}", {"a": 3}) == ("3", False)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "{% for i in range(100000) %}{% for j in range(100000) %}"
+        "{% endfor %}{% endfor %}",
+        "{% set s = 'x' * 100000 %}{% for a in s %}{% for b in s %}"
+        "{% endfor %}{% endfor %}",
+        "{% for i in range(100000) %}{{ 'padding' * 10 }}{% endfor %}",
+        "{{ 'x' * 1000000000 }}",
+        "{{ 'x'|center(1000000000) }}",
+        "{{ 9 ** 999999999 }}",
+        "{{ 'x'.center(300000000)|length }}",
+        "{% set s = 'x'.ljust(100000000) %}",
+        "{{ 'x'.zfill(300000000) }}",
+        "{{ '%0300000000d' % 1 }}",
+        "{{ '%*d' % (300000000, 1) }}",
+        "{{ '%.300000000f'|format(1) }}",
+        "{{ '{:0300000000d}'.format(1) }}",
+        "{{ '{:>{w}}'.format('x', w=300000000) }}",
+        "{{ '{a:>{w}}'.format_map({'a': 'x', 'w': 300000000}) }}",
+        "{{ ('\t' * 1000).expandtabs(1000000)|length }}",
+        "{{ ('x' * 50000).replace('x', 'y' * 50000)|length }}",
+        "{{ ('x' * 50000).join(['a'] * 50000)|length }}",
+    ],
+)
+def test_runaway_templates_hit_the_caps(source: str) -> None:
+    previews = PreviewRenderer(timeout=0.2, max_output_bytes=64 * 1024)
+
+    with pytest.raises(PreviewLimitExceeded):
+        previews.render(source, {})
+
+
+NESTED = (
+    "{% set a = range(100000)|list %}{% set b = [a, a, a, a, a, a, a, a, a, a] %}"
+    "{% set c = [b, b, b, b, b, b, b, b, b, b] %}"
+)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "{{ ([[range(100000)|list]*30]*30)|string|length }}",
+        "{{ ([range(100000)|list]*100)|sum(start=[]) }}",
+        "{{ ([[1]]*500000)|sum(start=[])|length }}",
+        NESTED + "{{ c }}",
+        NESTED + "{{ c ~ '' }}",
+        NESTED + "{{ c|length }}",
+        NESTED + "{{ '%s' % (c,) }}",
+        NESTED + "{{ '{}'.format(c) }}",
+        "{% set a = range(100000)|list %}{% set b = [] %}"
+        "{% for i in range(100000) %}{{ b.extend(a) }}{% endfor %}",
+        "{% set a = range(100000)|list %}"
+        + "{% set a = a + a %}" * 4,
+    ],
+)
+def test_nested_sequences_are_bounded_before_they_are_built(source: str) -> None:
+    previews = PreviewRenderer()
+    started = time.perf_counter()
+
+    with pytest.raises(PreviewLimitExceeded, match="too large"):
+        previews.render(source, {})
+    assert time.perf_counter() - started < 2 * previews.timeout
+
+
+def test_bounded_string_operations_still_render() -> None:
+    source = (
+        "{{ 'ab'.center(6, '-') }}|{{ '%05.1f' % 3.14159 }}|{{ '%s-%s'|format(1, 2) }}"
+        "|{{ '{:>4}'.format(7) }}|{{ 'a b'.replace(' ', '_') }}|{{ 7 % 3 }}"
+        "|{{ [[1], [2]]|sum(start=[]) }}|{{ [1] * 2 + [3] }}|{{ 'a' ~ (1, 2) }}"
+    )
+
+    assert PreviewRenderer().render(source, {})[0] == (
+        "--ab--|003.1|1-2|   7|a_b|1|[1, 2]|[1, 1, 3]|a(1, 2)"
+    )
+
+
+def test_sandbox_blocks_unsafe_attributes() -> None:
+    with pytest.raises(PreviewError, match="unsafe|access"):
+        PreviewRenderer().render("{{ ''.__class__.__mro__ }}", {})
+
+
+def test_preview_endpoint_renders_jinja_and_placeholders(client: TestClient) -> None:
+    source = "<svg>{{ title }}|{{ media_info.artist }}|{{ is_playing }}</svg>"
+    body = {"svg_content": source, "mock_data": {"title": "<A>", "artist": "B"}}
+
+    first = client.post("/api/v1/preview", json=body)
+    second = client.post("/api/v1/preview", json=body)
+
+    assert first.status_code == 200
+    assert first.text == "<svg>&lt;A&gt;|B|True</svg>"
+    assert first.headers["x-preview-cache"] == "miss"
+    assert second.headers["x-preview-cache"] == "hit"
+
+
+def test_preview_endpoint_reports_errors(client: TestClient) -> None:
+    broken = client.post("/api/v1/preview", json={"svg_content": "{% for %}"})
+    runaway = client.post(
+        "/api/v1/preview", json={"svg_content": "{{ 'x' * 1000000000 }}"}
+    )
+    oversized = client.post(
+        "/api/v1/preview",
+        json={"svg_content": "x" * (main.MAX_TEMPLATE_SOURCE_BYTES + 1)},
+    )
+
+    assert broken.status_code == 400 and "Preview Error" in broken.text
+    assert runaway.status_code == 422
+    assert oversized.status_code == 413
+
+
+def test_preview_endpoint_validates_mock_data(client: TestClient) -> None:
+    def preview(mock_data):
+        return client.post(
+            "/api/v1/preview",
+            json={"svg_content": "<svg/>", "mock_data": mock_data},
+        )
+
+    assert preview([1]).status_code == 422
+    assert preview({"duration": "abc", "position": 1}).status_code == 422
+    assert preview({"title": "A", "duration": "200"}).status_code == 200
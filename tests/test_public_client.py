@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from server import transport as transport_module
+from server.transport import Backoff, TransportError, UpdateTransport
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: dict) -> None:
+        self.status_code = status_code
+        self._body = body
+
+    def json(self) -> dict:
+        return self._body
+
+
+def test_backoff_grows_exponentially_up_to_the_cap() -> None:
+    backoff = Backoff(initial=1, maximum=5)
+
+    assert [backoff.failure() for _ in range(5)] == [1, 2, 4, 5, 5]
+    backoff.success()
+    assert backoff.delay == 0 and backoff.ready()
+
+
+def test_websocket_urls_follow_the_server_scheme() -> None:
+    secure = UpdateTransport("https://example.com/", "key", user_id="alice")
+    plain = UpdateTransport("http://localhost:8000", "key")
+
+    assert secure.websocket_url == "wss://example.com/api/v1/ws?api_key=key&user_id=alice"
+    assert plain.websocket_url == "ws://localhost:8000/api/v1/ws?api_key=key"
+
+
+def test_auto_mode_falls_back_to_http_and_backs_off(monkeypatch: pytest.MonkeyPatch) -> None:
+    attempts: list[str] = []
+
+    async def refuse(url: str, **kwargs):
+        attempts.append(url)
+        raise OSError("websockets unsupported")
+
+    monkeypatch.setattr(transport_module, "WEBSOCKETS_AVAILABLE", True)
+    monkeypatch.setattr(
+        transport_module, "websockets", type("ws", (), {"connect": refuse}), raising=False
+    )
+    transport = UpdateTransport("https://example.com", "key")
+    posts: list[dict] = []
+    monkeypatch.setattr(
+        transport,
+        "_post",
+        lambda payload: posts.append(payload) or FakeResponse(200, {"status": "updated"}),
+    )
+
+    async def scenario() -> None:
+        assert (await transport.send({"media_info": None}))["status"] == "updated"
+        assert (await transport.send({"media_info": None}))["status"] == "updated"
+
+    asyncio.run(scenario())
+
+    assert len(posts) == 2
+    assert len(attempts) == 1  # the second send waits out the backoff
+
+
+def test_http_errors_raise_transport_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    transport = UpdateTransport("https://example.com", "key", mode="http")
+    monkeypatch.setattr(transport, "_post", lambda payload: FakeResponse(401, {}))
+
+    with pytest.raises(TransportError, match="401"):
+        asyncio.run(transport.send({"media_info": None}))
+
+
+def test_artwork_only_changes_are_detected() -> None:
+    from client.models import MediaInfo
+    from server.public_client import PublicClient
+
+    client = PublicClient.__new__(PublicClient)
+    old = MediaInfo(title="A", is_playing=True, album_art=b"one")
+
+    assert client._media_info_changed(old, old.model_copy(update={"album_art": b"two"}))
+    assert not client._media_info_changed(old, old.model_copy())
+
+
+def test_seeks_are_changes_but_playing_on_is_not() -> None:
+    from client.models import MediaSnapshot
+    from server.public_client import PublicClient
+
+    client = PublicClient.__new__(PublicClient)
+    old = MediaSnapshot(
+        "A", is_playing=True, position=11.0, duration=180.0, position_timestamp=1001.0
+    )
+
+    assert not client._media_info_changed(
+        old, old.replace(position=41.0, position_timestamp=1031.0)
+    )
+    assert client._media_info_changed(old, old.replace(position=100.0))
@@ -0,0 +1,32 @@
+from benchmarks import render
+
+
+def test_benchmark_reports_every_metric() -> None:
+    results = render.run(["minimalist"], ["no-media", "paused"], iterations=3)
+
+    assert [(r["template"], r["case"]) for r in results] == [
+        ("minimalist", "no-media"),
+        ("minimalist", "paused"),
+    ]
+    for entry in results:
+        assert entry["ops_per_sec"] > 0
+        assert entry["p99_ms"] >= entry["p50_ms"] > 0
+        assert entry["peak_memory_bytes"] > 0
+        assert entry["output_bytes"] > 0
+
+
+def test_compare_flags_slower_or_larger_renders() -> None:
+    baseline = [
+        {"template": "t", "case": "a", "ops_per_sec": 100.0, "output_bytes": 1000},
+        {"template": "t", "case": "b", "ops_per_sec": 100.0, "output_bytes": 1000},
+    ]
+    current = [
+        {"template": "t", "case": "a", "ops_per_sec": 95.0, "output_bytes": 1000},
+        {"template": "t", "case": "b", "ops_per_sec": 50.0, "output_bytes": 2000},
+        {"template": "t", "case": "new", "ops_per_sec": 1.0, "output_bytes": 1},
+    ]
+
+    regressions = render.compare(current, baseline, tolerance=0.2)
+
+    assert len(regressions) == 2
+    assert all(line.startswith("t/b:") for line in regressions)
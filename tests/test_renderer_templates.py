@@ -1,4 +1,5 @@
 import struct
+import time
 from xml.etree import ElementTree
 
 import pytest
@@ -7,11 +8,13 @@ from client.models import MediaInfo
 from client.renderer.engine import Renderer
 
 TEMPLATES = {
+    "group",
     "minimalist",
     "music-card",
     "neon",
     "polaroid",
     "poster",
+    "recent",
     "terminal",
     "ticket",
     "turntable",
@@ -50,3 +53,27 @@ def test_templates_render_valid_svg_in_all_artwork_states(template: str) -> None
 
         assert "Template error:" not in svg
         assert ElementTree.fromstring(svg).tag.endswith("svg")
+
+
+@pytest.mark.parametrize("template", sorted(TEMPLATES))
+def test_templates_render_playback_progress(template: str) -> None:
+    def timed(is_playing: bool) -> MediaInfo:
+        return MediaInfo(
+            title="Track",
+            artist="Artist",
+            is_playing=is_playing,
+            position=50.0,
+            duration=200.0,
+            position_timestamp=time.time() - 10,
+        )
+
+    playing = Renderer().render_svg(timed(True), template)
+    paused = Renderer().render_svg(timed(False), template)
+
+    for svg in (playing, paused):
+        assert "Template error:" not in svg
+        ElementTree.fromstring(svg)
+    # The bar advances in the viewer from a single render, only while playing
+    assert "<animate" not in paused
+    if 'class="progress"' in playing:
+        assert 'dur="140.0s"' in playing
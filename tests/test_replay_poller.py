@@ -0,0 +1,139 @@
+import asyncio
+import json
+import struct
+import time
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from client.models import MediaInfo
+from client.poller.base import BasePoller
+from client.poller.factory import create_poller
+from client.poller.replay import RecordingPoller, ReplayPoller, TraceRecorder
+
+
+def png_header(width: int, height: int) -> bytes:
+    return b"\x89PNG\r\n\x1a\n" + b"\x00" * 8 + struct.pack(">II", width, height)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScriptedPoller(BasePoller):
+    def __init__(self, states: list[Optional[MediaInfo]]) -> None:
+        self.states = states
+
+    async def get_media_info(self) -> Optional[MediaInfo]:
+        return self.states.pop(0)
+
+
+def record_trace(path: Path, clock: FakeClock) -> None:
+    art = png_header(64, 64)
+    track = MediaInfo(title="A", artist="X", album="L", is_playing=True, album_art=art)
+    states = [
+        None,
+        track,
+        track,
+        MediaInfo(title="A", artist="X", album="L", is_playing=False, album_art=art),
+        MediaInfo(title="B", artist="Y", album="M", is_playing=True),
+    ]
+    poller = RecordingPoller(ScriptedPoller(states), TraceRecorder(path, clock=clock))
+
+    for _ in range(5):
+        asyncio.run(poller.get_media_info())
+        clock.now += 10
+
+
+def test_recorder_writes_changes_and_artwork_once(tmp_path: Path) -> None:
+    trace = tmp_path / "trace.jsonl"
+    record_trace(trace, FakeClock())
+
+    entries = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert [entry["t"] for entry in entries] == [0, 10, 30, 40]
+    assert entries[0]["media_info"] is None
+    assert entries[1]["media_info"]["album_art_file"].endswith(".png")
+    assert len(list((tmp_path / "trace.jsonl.artwork").iterdir())) == 1
+
+
+def test_replays_states_at_accelerated_speed(tmp_path: Path) -> None:
+    trace = tmp_path / "trace.jsonl"
+    record_trace(trace, FakeClock())
+    clock = FakeClock()
+    poller = ReplayPoller(trace, speed=10.0, clock=clock)
+
+    assert asyncio.run(poller.get_media_info()) is None
+    clock.now += 1.5
+    playing = asyncio.run(poller.get_media_info())
+    assert playing.title == "A" and playing.is_playing
+    assert playing.album_art_dimensions == (64, 64)
+    clock.now += 2
+    assert not asyncio.run(poller.get_media_info()).is_playing
+    clock.now += 1
+    assert asyncio.run(poller.get_media_info()).title == "B"
+    clock.now += 1
+    assert poller.finished
+
+
+def test_looping_replay_wraps_around(tmp_path: Path) -> None:
+    trace = tmp_path / "trace.jsonl"
+    record_trace(trace, FakeClock())
+    clock = FakeClock()
+    poller = ReplayPoller(trace, speed=1.0, loop=True, clock=clock)
+
+    asyncio.run(poller.get_media_info())
+    clock.now += poller.duration + 15
+
+    assert asyncio.run(poller.get_media_info()).title == "A"
+    assert not poller.finished
+
+
+def test_recorder_keeps_position_and_records_seeks(tmp_path: Path) -> None:
+    trace = tmp_path / "trace.jsonl"
+    clock = FakeClock()
+    now = time.time()
+
+    def at(position: float, sampled_at: float) -> MediaInfo:
+        return MediaInfo(
+            title="A",
+            is_playing=True,
+            position=position,
+            duration=200.0,
+            position_timestamp=sampled_at,
+        )
+
+    # Playing through the track, then seeking ahead
+    states = [at(30.0, now), at(40.0, now + 10), at(150.0, now + 20)]
+    poller = RecordingPoller(ScriptedPoller(states), TraceRecorder(trace, clock=clock))
+    for _ in range(3):
+        asyncio.run(poller.get_media_info())
+        clock.now += 10
+
+    entries = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert [entry["t"] for entry in entries] == [0, 20]
+    assert entries[0]["media_info"]["duration"] == 200.0
+    assert entries[1]["media_info"]["position"] == pytest.approx(130.0, abs=1)
+
+    replay_clock = FakeClock()
+    replay = ReplayPoller(trace, clock=replay_clock)
+    first = asyncio.run(replay.get_media_info())
+    assert first.position == pytest.approx(30.0, abs=1)
+    assert first.progress(now=first.position_timestamp + 5)[0] == pytest.approx(
+        first.position + 5
+    )
+    replay_clock.now += 5
+    assert asyncio.run(replay.get_media_info()).fingerprint == first.fingerprint
+    replay_clock.now += 15
+    assert asyncio.run(replay.get_media_info()).fingerprint != first.fingerprint
+
+
+def test_factory_prefers_replay_trace(tmp_path: Path) -> None:
+    trace = tmp_path / "trace.jsonl"
+    record_trace(trace, FakeClock())
+
+    assert isinstance(create_poller(replay_trace=str(trace)), ReplayPoller)
@@ -0,0 +1,133 @@
+import asyncio
+from pathlib import Path
+
+from client.models import MediaInfo
+from server.public_client import PublicClient
+from server.spool import UpdateSpool
+from server.transport import TransportError
+
+
+def payload(title: str, art_hash=None) -> dict:
+    return {"media_info": {"title": title, "album_art_hash": art_hash}}
+
+
+def test_updates_coalesce_to_the_latest_state_per_user(tmp_path: Path) -> None:
+    spool = UpdateSpool(tmp_path)
+
+    spool.put("alice", payload("A", "h1"), b"art-1")
+    spool.put("alice", payload("B", "h2"), b"art-2")
+    spool.put("bob", payload("C"))
+
+    pending = spool.pending()
+    assert [entry["payload"]["media_info"]["title"] for entry in pending] == ["B", "C"]
+    assert spool.artwork(pending[0]) == b"art-2"
+    assert [path.name for path in spool.artwork_dir.iterdir()] == ["h2.bin"]
+
+
+def test_remove_keeps_entries_replaced_during_delivery(tmp_path: Path) -> None:
+    spool = UpdateSpool(tmp_path)
+    delivered = spool.put("alice", payload("A", "h1"), b"art")
+    spool.put("alice", payload("B"))
+
+    assert not spool.remove(delivered)
+    assert spool.has_pending()
+    assert spool.remove(spool.pending()[0])
+    assert not spool.has_pending()
+    assert not any(spool.artwork_dir.iterdir())
+
+
+def test_disk_budget_drops_artwork_before_states(tmp_path: Path) -> None:
+    spool = UpdateSpool(tmp_path, max_bytes=600)
+
+    spool.put("alice", payload("A", "h1"), b"x" * 400)
+    spool.put("bob", payload("B", "h2"), b"y" * 400)
+
+    assert spool.size() <= 600
+    assert {entry["key"] for entry in spool.pending()} == {"alice", "bob"}
+    assert spool.artwork(spool.pending()[0]) is None
+
+
+def test_spool_survives_restarts(tmp_path: Path) -> None:
+    UpdateSpool(tmp_path).put("alice", payload("A", "h1"), b"art")
+
+    entry = UpdateSpool(tmp_path).pending()[0]
+
+    assert entry["payload"] == payload("A", "h1")
+    assert UpdateSpool(tmp_path).artwork(entry) == b"art"
+
+
+class FlakyTransport:
+    def __init__(self) -> None:
+        self.online = False
+        self.sent: list[dict] = []
+        self.artwork: list[str] = []
+
+    async def send(self, payload: dict) -> dict:
+        if not self.online:
+            raise TransportError("offline")
+        self.sent.append(payload)
+        return {"status": "updated", "artwork": "missing"}
+
+    async def upload_artwork(self, art_hash: str, data: bytes) -> dict:
+        self.artwork.append(art_hash)
+        return {"status": "stored", "hash": art_hash}
+
+
+def test_client_spools_offline_updates_and_drains_latest(tmp_path: Path) -> None:
+    client = PublicClient("http://example.com", "key", spool_dir=str(tmp_path))
+    transport = FlakyTransport()
+    [target] = client.targets
+    target.transport = transport
+
+    async def scenario() -> None:
+        assert not await client.send_media_info(MediaInfo(title="A", album_art=b"a"))
+        target.backoff.ready_at = 0
+        assert not await client.send_media_info(MediaInfo(title="B", album_art=b"b"))
+        assert target.backoff.failures == 2
+
+        transport.online = True
+        assert not await client.drain_spool()  # still backing off
+        target.backoff.ready_at = 0
+        assert await client.drain_spool()
+
+    asyncio.run(scenario())
+
+    assert [p["media_info"]["title"] for p in transport.sent] == ["B"]
+    assert transport.artwork == [MediaInfo(album_art=b"b").album_art_hash]
+    assert target.backoff.failures == 0
+
+
+def test_client_fans_out_and_queues_only_for_failing_targets(tmp_path: Path) -> None:
+    client = PublicClient(
+        "http://unused.example.com",
+        "unused",
+        spool_dir=str(tmp_path),
+        targets=[
+            {"server_url": "https://public.example.com", "api_key": "a"},
+            {
+                "server_url": "http://internal.example.com",
+                "api_key": "b",
+                "user_id": "alice",
+                "template": "poster",
+            },
+        ],
+    )
+    public, internal = client.targets
+    public.transport, internal.transport = FlakyTransport(), FlakyTransport()
+    public.transport.online = True
+
+    async def scenario() -> None:
+        assert not await client.send_media_info(MediaInfo(title="A"))
+        assert not await client.send_media_info(MediaInfo(title="B"))
+        internal.transport.online = True
+        internal.backoff.ready_at = 0
+        assert await client.drain_spool()
+
+    asyncio.run(scenario())
+
+    assert [p["media_info"]["title"] for p in public.transport.sent] == ["A", "B"]
+    assert [p["media_info"]["title"] for p in internal.transport.sent] == ["B"]
+    assert public.backoff.failures == 0
+    assert internal.card_url == (
+        "http://internal.example.com/now-playing.svg?user_id=alice&template=poster"
+    )
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from client import main
+from client.models import MediaSnapshot
+from client.renderer import catalogue
+from client.renderer.engine import Renderer
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "client" / "renderer" / "templates"
+
+
+@pytest.fixture
+def template_dir(tmp_path: Path) -> Path:
+    for name in ("turntable.svg", "minimalist.svg"):
+        shutil.copy(TEMPLATE_DIR / name, tmp_path / name)
+    return tmp_path
+
+
+def test_catalogue_holds_source_and_metadata() -> None:
+    templates = catalogue.TemplateCatalogue.load(TEMPLATE_DIR)
+
+    turntable = templates["turntable"]
+    assert turntable.source == (TEMPLATE_DIR / "turntable.svg").read_text("utf-8")
+    assert (turntable.width, turntable.height) == (400, 160)
+    assert turntable.uses_artwork
+    assert not templates["minimalist"].uses_artwork
+    assert turntable.uses_progress and not templates["neon"].uses_progress
+    with pytest.raises(TypeError):
+        templates["extra"] = turntable
+
+
+def test_rendering_never_touches_the_template_directory(template_dir: Path) -> None:
+    renderer = Renderer(template_dir=str(template_dir))
+    shutil.rmtree(template_dir)
+
+    svg = renderer.render_svg(MediaSnapshot(title="Offline"), "turntable")
+
+    assert "Offline" in svg
+    assert renderer.list_templates() == ["minimalist", "turntable"]
+    missing = renderer.render_svg(None, "<nope>")
+    assert "Template not found: &lt;nope&gt;" in missing
+
+
+def test_polling_watcher_reloads_changed_templates(
+    template_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(sys.modules, "watchfiles", None)
+    renderer = Renderer(template_dir=str(template_dir))
+    reloaded = asyncio.Event()
+
+    def on_change() -> None:
+        renderer.reload()
+        reloaded.set()
+
+    async def edit_and_wait() -> None:
+        watcher = asyncio.create_task(
+            catalogue.watch(template_dir, on_change, poll_interval=0.01)
+        )
+        await asyncio.sleep(0.05)
+        path = template_dir / "minimalist.svg"
+        path.write_text('<svg width="10" height="20">{{ is_playing }}</svg>')
+        os.utime(path, (1, 1))
+        await asyncio.wait_for(reloaded.wait(), 5)
+        watcher.cancel()
+
+    asyncio.run(edit_and_wait())
+
+    svg = renderer.render_svg(None, "minimalist")
+    assert svg == '<svg width="10" height="20">False</svg>'
+    assert renderer.catalogue["minimalist"].height == 20
+
+
+def test_template_api_serves_the_catalogue(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(main, "PUBLIC_MODE", True)
+    with TestClient(main.app) as client:
+        listing = client.get("/api/v1/templates").json()
+        content = client.get("/api/v1/templates/neon").json()
+        missing = client.get("/api/v1/templates/nope")
+
+    assert listing["metadata"]["turntable"]["uses_artwork"] is True
+    assert content["content"] == (TEMPLATE_DIR / "neon.svg").read_text("utf-8")
+    assert content["metadata"]["width"] == 400
+    assert missing.status_code == 404
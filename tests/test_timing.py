@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from client import main
+from client.models import MediaInfo
+from client.store import InMemoryStore
+from client.utils import timing
+
+
+def test_spans_accumulate_only_inside_collect() -> None:
+    with timing.span("ignored"):
+        pass
+
+    with timing.collect() as timings:
+        with timing.span("store"):
+            pass
+        with timing.span("render"):
+            pass
+        with timing.span("store"):
+            pass
+
+    assert list(timings.spans) == ["store", "render"]
+    header = timings.server_timing()
+    assert header.startswith("store;dur=")
+    assert header.split(", ")[-1].startswith("total;dur=")
+
+
+@pytest.fixture
+def public_store(monkeypatch: pytest.MonkeyPatch) -> InMemoryStore:
+    store = InMemoryStore()
+    store.set("timing", MediaInfo(title="Slow card").to_dict())
+    monkeypatch.setattr(main, "PUBLIC_MODE", True)
+    monkeypatch.setattr(main.app_state, "store", store)
+    return store
+
+
+def test_card_reports_server_timing(public_store: InMemoryStore) -> None:
+    with TestClient(main.app) as client:
+        response = client.get("/now-playing.svg?user_id=timing")
+
+    names = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert names == ["store", "decode", "render", "total"]
+
+
+def test_profiling_requires_opt_in_and_api_key(
+    public_store: InMemoryStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    api_key = main.config.get("server.api_key")
+    client = TestClient(main.app)
+
+    disabled = client.get(f"/now-playing.svg?user_id=timing&profile=true&api_key={api_key}")
+    assert disabled.status_code == 404
+
+    monkeypatch.setitem(main.config.get_server_config(), "profiling", True)
+    assert client.get("/now-playing.svg?profile=true&api_key=wrong").status_code == 401
+
+    with TestClient(main.app) as client:
+        profiled = client.get(
+            f"/now-playing.svg?user_id=timing&profile=true&api_key={api_key}"
+        )
+    assert profiled.status_code == 200
+    assert "function calls" in profiled.text
+    assert "render_svg" in profiled.text
+    assert "render;dur=" in profiled.headers["server-timing"]
@@ -0,0 +1,144 @@
+import socket
+import threading
+import time
+from collections import Counter
+
+import pytest
+import requests
+import uvicorn
+from fastapi.testclient import TestClient
+
+from benchmarks import loadgen
+from benchmarks.upstash_emulator import UpstashEmulator
+from client.store import RedisStore
+
+
+@pytest.fixture
+def served():
+    emulator = UpstashEmulator(token="secret")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(
+        uvicorn.Config(emulator.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield emulator, f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join()
+
+
+def test_redis_store_round_trips_through_the_emulator(served) -> None:
+    emulator, url = served
+    store = RedisStore(url, "secret")
+
+    store.set("alice", {"title": "Song"})
+    store.set_artwork("abc", b"\x89PNG")
+
+    assert store.get("alice") == {"title": "Song"}
+    assert store.get("bob") is None
+    assert store.keys() == ["alice"]
+    assert store.has_artwork("abc") and store.get_artwork("abc") == b"\x89PNG"
+    assert emulator.stats()["commands"] == {
+        "SET": 2, "GET": 3, "KEYS": 1, "EXISTS": 1
+    }
+
+
+def test_redis_store_reads_many_states_with_one_command(served) -> None:
+    emulator, url = served
+    store = RedisStore(url, "secret")
+
+    store.set("alice", {"title": "A"})
+    store.set("carol", {"title": "C"})
+
+    assert store.get_many(["alice", "bob", "carol"]) == [
+        {"title": "A"}, None, {"title": "C"}
+    ]
+    assert store.get_many([]) == []
+    assert emulator.stats()["commands"] == {"SET": 2, "MGET": 1}
+
+
+def test_redis_store_keeps_templates_in_a_hash_per_user(served) -> None:
+    emulator, url = served
+    store = RedisStore(url, "secret")
+
+    store.set_template("alice", "card", {"source": "<svg/>", "hash": "h1"})
+    store.set_template("alice", "alt", {"source": "<g/>", "hash": "h2"})
+
+    assert store.get_template("alice", "card") == {"source": "<svg/>", "hash": "h1"}
+    assert store.get_template("bob", "card") is None
+    assert store.list_templates("alice") == ["alt", "card"]
+    assert store.delete_template("alice", "card")
+    assert not store.delete_template("alice", "card")
+    assert store.list_templates("alice") == ["alt"]
+    assert store.keys() == []
+
+
+def test_redis_store_history_is_trimmed_in_one_round_trip(served) -> None:
+    emulator, url = served
+    store = RedisStore(url, "secret")
+
+    for index in range(4):
+        store.append_history("alice", {"title": str(index)}, limit=3)
+
+    assert store.get_history("alice", 2) == [{"title": "3"}, {"title": "2"}]
+    assert [entry["title"] for entry in store.get_history("alice", 10)] == [
+        "3", "2", "1"
+    ]
+    stats = emulator.stats()
+    assert stats["requests"] == 6
+    assert stats["commands"] == {"LPUSH": 4, "LTRIM": 4, "LRANGE": 2}
+
+
+def test_wrong_token_and_injected_errors_fail_requests(served) -> None:
+    emulator, url = served
+
+    with pytest.raises(requests.HTTPError, match="401"):
+        RedisStore(url, "wrong").get("alice")
+
+    emulator.error_rate = 1.0
+    with pytest.raises(requests.HTTPError, match="500"):
+        RedisStore(url, "secret").get("alice")
+    assert emulator.injected_errors == 1
+
+
+def test_set_options_expiry_and_pipeline() -> None:
+    emulator = UpstashEmulator(token="t")
+    client = TestClient(emulator.app)
+    headers = {"Authorization": "Bearer t"}
+
+    def command(*args):
+        return client.post("/", json=list(args), headers=headers).json()
+
+    assert command("SET", "k", "v", "NX") == {"result": "OK"}
+    assert command("SET", "k", "w", "NX") == {"result": None}
+    assert command("SET", "gone", "v", "PX", "1") == {"result": "OK"}
+    time.sleep(0.01)
+    assert command("MGET", "k", "gone") == {"result": ["v", None]}
+    assert command("BOGUS")["error"].startswith("ERR unknown command")
+
+    replies = client.post(
+        "/pipeline", json=[["EXISTS", "k"], ["DEL", "k"], ["TTL", "k"]], headers=headers
+    ).json()
+    assert replies == [{"result": 1}, {"result": 1}, {"result": -2}]
+
+
+def test_loadgen_summary_reports_percentiles_and_throughput() -> None:
+    latencies = {"svg": [i / 1000 for i in range(1, 101)]}
+    errors = Counter({"svg": 2, "update": 1})
+
+    report = loadgen.summarize(latencies, errors, elapsed=2.0)
+
+    assert report["svg"] == {
+        "requests": 102,
+        "errors": 2,
+        "throughput_rps": 50.0,
+        "p50_ms": 50.0,
+        "p95_ms": 95.0,
+        "p99_ms": 99.0,
+    }
+    assert report["update"]["requests"] == 1
@@ -0,0 +1,101 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from client import main
+from client.models import MediaInfo
+from client.store import InMemoryStore
+
+KEY = {"api_key": main.config.get("server.api_key"), "user_id": "alice"}
+
+
+class CountingStore(InMemoryStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.template_reads = 0
+
+    def get_template(self, user_id: str, name: str):
+        self.template_reads += 1
+        return super().get_template(user_id, name)
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> CountingStore:
+    store = CountingStore()
+    monkeypatch.setattr(main, "PUBLIC_MODE", True)
+    monkeypatch.setattr(main.app_state, "store", store)
+    monkeypatch.setattr(main.app_state, "user_templates", main.LRUCache())
+    store.set("alice", MediaInfo(title="Song", artist="Artist").to_dict())
+    return store
+
+
+@pytest.fixture
+def client(store: CountingStore):
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_saved_template_renders_by_short_reference(
+    client: TestClient, store: CountingStore
+) -> None:
+    source = "<svg>{{ media_info.title }} by {{ media_info.artist }}</svg>"
+    saved = client.put(
+        "/api/v1/user-templates/card", params=KEY, json={"source": source}
+    )
+
+    assert saved.status_code == 200
+    assert saved.json()["template"] == "user:card"
+
+    for _ in range(3):
+        card = client.get(
+            "/now-playing.svg", params={"user_id": "alice", "template": "user:card"}
+        )
+        assert card.text == "<svg>Song by Artist</svg>"
+    # Saving primed this instance's copy, so no card needed a store read
+    assert store.template_reads == 0
+
+    listing = client.get("/api/v1/user-templates", params=KEY).json()
+    assert listing["templates"] == ["card"]
+    reopened = client.get("/api/v1/user-templates/card", params=KEY).json()
+    assert reopened["source"] == source
+
+
+def test_other_instances_read_the_store_once_per_ttl(
+    client: TestClient, store: CountingStore
+) -> None:
+    store.set_template("alice", "card", {"source": "<svg>{{ is_playing }}</svg>"})
+
+    for _ in range(3):
+        card = client.get(
+            "/now-playing.svg", params={"user_id": "alice", "template": "user:card"}
+        )
+        assert card.text == "<svg>False</svg>"
+    assert store.template_reads == 1
+
+
+def test_missing_and_deleted_templates_render_an_error_card(
+    client: TestClient,
+) -> None:
+    params = {"user_id": "alice", "template": "user:gone"}
+    client.put(
+        "/api/v1/user-templates/gone", params=KEY, json={"source": "<svg/>"}
+    )
+
+    deleted = client.delete("/api/v1/user-templates/gone", params=KEY)
+    assert deleted.status_code == 200
+    card = client.get("/now-playing.svg", params=params)
+    assert "Template not found: gone" in card.text
+    assert client.delete("/api/v1/user-templates/gone", params=KEY).status_code == 404
+
+
+def test_save_validates_key_name_and_source(client: TestClient) -> None:
+    def save(name: str, source: str, **params):
+        return client.put(
+            f"/api/v1/user-templates/{name}",
+            params={**KEY, **params},
+            json={"source": source},
+        )
+
+    assert save("card", "<svg/>", api_key="wrong").status_code == 401
+    assert save("bad:name", "<svg/>").status_code == 400
+    assert save("card", "{% for %}").status_code == 400
+    assert save("card", "x" * (main.MAX_TEMPLATE_SOURCE_BYTES + 1)).status_code == 413
@@ -4,6 +4,7 @@ class NowPlayingEditor {
         this.currentTemplate = 'default';
         this.templates = [];
         this.autoRefreshInterval = null;
+        this.eventSource = null;
         this.settings = {
             autoRefresh: true,
             refreshInterval: 5,
@@ -162,6 +163,11 @@ class NowPlayingEditor {
         
         // 更新预览
         this.updatePreview();
+
+        // 重新订阅当前模板的实时推送
+        if (this.eventSource) {
+            this.startLiveUpdates();
+        }
     }
 
     async loadTemplateContent(template) {
@@ -191,19 +197,7 @@ class NowPlayingEditor {
             const response = await fetch(`${this.apiEndpoint}/now-playing.svg?${params}`);
             const svgContent = await response.text();
             
-            // 清空容器并插入SVG
-            previewContainer.innerHTML = '';
-            
-            // 创建一个临时容器来解析SVG
-            const tempDiv = document.createElement('div');
-            tempDiv.innerHTML = svgContent;
-            const svgElement = tempDiv.querySelector('svg');
-            
-            if (svgElement) {
-                previewContainer.appendChild(svgElement);
-            } else {
-                previewContainer.innerHTML = svgContent;
-            }
+            this.renderPreview(svgContent);
             
             this.updateStatus(window.i18n ? 'Preview updated' : 'Preview updated');
             
@@ -232,6 +226,75 @@ class NowPlayingEditor {
         }
     }
 
+    renderPreview(svgContent) {
+        const previewContainer = document.getElementById('svgPreview');
+
+        // 清空容器并插入SVG
+        previewContainer.innerHTML = '';
+
+        // 创建一个临时容器来解析SVG
+        const tempDiv = document.createElement('div');
+        tempDiv.innerHTML = svgContent;
+        const svgElement = tempDiv.querySelector('svg');
+
+        if (svgElement) {
+            previewContainer.appendChild(svgElement);
+        } else {
+            previewContainer.innerHTML = svgContent;
+        }
+    }
+
+    startLiveUpdates() {
+        this.stopLiveUpdates();
+
+        // 不支持 EventSource 时退回定时刷新
+        if (!window.EventSource) {
+            this.startPolling();
+            return;
+        }
+
+        const params = new URLSearchParams({
+            template: this.currentTemplate
+        });
+        const source = new EventSource(`${this.apiEndpoint}/api/v1/stream?${params}`);
+
+        source.addEventListener('state', (event) => {
+            const data = JSON.parse(event.data);
+            if (data.svg) {
+                this.renderPreview(data.svg);
+            }
+        });
+
+        source.onerror = () => {
+            // 服务器不支持推送（如旧版本或 serverless 部署）时退回定时刷新
+            if (source.readyState === EventSource.CLOSED) {
+                console.warn('Live updates unavailable, falling back to polling');
+                this.eventSource = null;
+                this.startPolling();
+            }
+        };
+
+        this.eventSource = source;
+    }
+
+    startPolling() {
+        this.autoRefreshInterval = setInterval(() => {
+            this.updatePreview();
+        }, this.settings.refreshInterval * 1000);
+    }
+
+    stopLiveUpdates() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+
+        if (this.autoRefreshInterval) {
+            clearInterval(this.autoRefreshInterval);
+            this.autoRefreshInterval = null;
+        }
+    }
+
     resetTemplate() {
         this.loadTemplateContent(this.currentTemplate);
         this.updateStatus(window.i18n ? window.i18n.t('templateReset') : 'Template reset');
@@ -327,15 +390,11 @@ class NowPlayingEditor {
             previewContainer.classList.remove('grid-overlay');
         }
 
-        // 应用自动刷新
-        if (this.autoRefreshInterval) {
-            clearInterval(this.autoRefreshInterval);
-        }
+        // 应用自动刷新：优先使用服务器推送
+        this.stopLiveUpdates();
 
         if (this.settings.autoRefresh) {
-            this.autoRefreshInterval = setInterval(() => {
-                this.updatePreview();
-            }, this.settings.refreshInterval * 1000);
+            this.startLiveUpdates();
         }
     }
 